@@ -1,35 +1,81 @@
+import csv
+import io
+import json
 import logging
+import time
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
 from math import ceil
+from typing import Any, Literal
+
+import orjson
 
 from dishka.integrations.fastapi import FromDishka, inject
-from fastapi import APIRouter, Query, status, HTTPException
+from fastapi import APIRouter, Path, Query, Request, Response, status, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import RowMapping
+from pydantic import ValidationError
 
-from app.core.config import settings
+from app.core.admission import AdmissionController, AdmissionTicket
+from app.core.cache import ResponseCache
+from app.core.conditional import (
+    body_etag,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    validator_headers,
+)
+from app.core.config import Settings
+from app.core.pagination import InvalidCursorError
+from app.database.coalescer import ApplicationWriteCoalescer
+from app.database.counting import CountStrategy
+from app.database.replica import LAST_WRITE_COOKIE
 from app.database.repository import ApplicationRepository
-from app.kafka.applications.publisher import KafkaPublisher
+from app.schemas.applications.serialization import (
+    dump_application_list,
+    dump_application_rows,
+)
 from app.schemas.applications.schemas import (
     ApplicationListResponse,
     ApplicationFilter,
     ApplicationResponse,
     ApplicationCreate,
-    KafkaApplicationMessage,
+    ApplicationBulkItemResult,
+    ApplicationBulkResponse,
+    UserNameMatch,
 )
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/applications", tags=["applications"])
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
 
 @router.get(
     "/",
     response_model=ApplicationListResponse,
+    response_class=ORJSONResponse,
     summary="ПОЛУЧИТЬ ВСЕ ЗАЯВКИ",
     description="""
                 Возвращает список заявок с возможностью фильтрации по имени пользователя и пагинации.
 
                 **Особенности:**
-                - Поддерживает фильтрацию по `user_name`
+                - Поддерживает фильтрацию по `user_name`: подстрока (`contains`, по умолчанию),
+                  начало имени (`prefix`) или точное совпадение (`exact`)
                 - Пагинация: `page` и `size` (максимум 100 записей на страницу)
                 - Возвращает общее количество заявок, число страниц и текущую страницу
+                - Ответы кэшируются на `RESPONSE_CACHE_TTL` секунд и сбрасываются
+                  при создании заявок; заголовок `X-Cache` показывает `HIT` или `MISS`
+                - Способ подсчёта `total` задаётся настройкой `APPLICATIONS_COUNT_STRATEGY`
+                  (`exact`, `cached`, `estimate`, `none`); приблизительные значения
+                  помечаются флагом `total_estimated`
+                - Режим курсора (`pagination=cursor` или `cursor=...`): страницы
+                  читаются по `next_cursor` за постоянное время на любой глубине,
+                  `total`, `page` и `pages` в этом режиме не заполняются
+                - При перегрузке запрос отклоняется с `503` и заголовком `Retry-After`;
+                  поиск по `user_name` ограничивается отдельным бюджетом `ADMISSION_FILTERED_*`
+                - Ответ содержит `ETag` и `Last-Modified`; на `If-None-Match` или
+                  `If-Modified-Since` без изменений в заявках возвращается `304` без тела
 
                 **Пример ответа:**
                 ```json
@@ -45,14 +91,20 @@ router = APIRouter(prefix="/applications", tags=["applications"])
                   "total": 42,
                   "page": 1,
                   "size": 10,
-                  "pages": 5
+                  "pages": 5,
+                  "total_estimated": false,
+                  "next_cursor": null
                 }
                 ```
                 """,
 )
 @inject
 async def get_applications(
+    request: Request,
+    settings: FromDishka[Settings],
     app_repo: FromDishka[ApplicationRepository],
+    response_cache: FromDishka[ResponseCache],
+    admission: FromDishka[AdmissionController],
     user_name: str | None = Query(
         None,
         min_length=1,
@@ -60,6 +112,10 @@ async def get_applications(
         description="Фильтр по имени пользователя (частичное совпадение)",
         example="ivanov",
     ),
+    user_name_match: UserNameMatch = Query(
+        "contains",
+        description="Способ сравнения `user_name`: `contains`, `prefix` или `exact`",
+    ),
     page: int = Query(
         1,
         ge=1,
@@ -73,10 +129,109 @@ async def get_applications(
         description="Количество записей на странице (максимум 100)",
         example=10,
     ),
+    pagination: Literal["offset", "cursor"] = Query(
+        "offset",
+        description="Режим пагинации: `offset` (по номеру страницы) или `cursor` (по курсору)",
+    ),
+    cursor: str | None = Query(
+        None,
+        min_length=1,
+        description="Курсор из поля `next_cursor` предыдущего ответа",
+    ),
 ):
-    filters = ApplicationFilter(user_name=user_name, page=page, size=size)
+    filters = ApplicationFilter(
+        user_name=user_name,
+        user_name_match=user_name_match,
+        page=page,
+        size=size,
+        cursor=cursor,
+    )
+    cursor_mode = cursor is not None or pagination == "cursor"
+
+    cache_key = (
+        f"list:{'cursor' if cursor_mode else 'offset'}:{filters.model_dump_json()}"
+    )
+    # Кэш мог быть заполнен с отстающей реплики: недавно писавший клиент
+    # читает мимо кэша, а репозиторий отправляет его запрос в основную БД.
+    wrote_recently = LAST_WRITE_COOKIE in request.cookies
+    cached = None if wrote_recently else await response_cache.get(cache_key)
+    if cached is not None:
+        etag, body = _unpack_cached(cached)
+        headers = {"X-Cache": "HIT", **validator_headers(etag)}
+        if is_not_modified(request, etag):
+            return not_modified_response(headers)
+        return Response(
+            content=body, media_type=ORJSONResponse.media_type, headers=headers
+        )
+
+    # Поиск по имени дороже, поэтому у него отдельный, меньший бюджет.
+    async with admission.slot("list_filtered" if filters.user_name else "list"):
+        # Версия читается до страницы: если между запросами появится
+        # заявка, ETag окажется старше тела и следующий опрос его обновит.
+        etag = await _get_list_etag(app_repo, response_cache, cache_key)
+        headers = {"X-Cache": "MISS", **validator_headers(etag)}
+        if is_not_modified(request, etag):
+            return not_modified_response(headers)
+        if cursor_mode:
+            body = await _get_applications_by_cursor(app_repo, filters)
+        else:
+            body = await _get_applications_by_page(
+                app_repo, filters, settings.applications_count_strategy
+            )
+
+    await response_cache.set(cache_key, _pack_cached(etag, body))
+    return Response(content=body, media_type=ORJSONResponse.media_type, headers=headers)
+
+
+async def _get_list_etag(
+    app_repo: ApplicationRepository, response_cache: ResponseCache, cache_key: str
+) -> str:
+    """
+    Слабый ETag списка: поколение кэша ответов вместе с параметрами запроса.
+
+    Поколение увеличивается после каждой записи заявок и читается без
+    обращения к БД. Если кэш отключён, версия таблицы читается из БД.
+    ETag слабый, потому что тело читается отдельным запросом и может
+    содержать приблизительный ``total``. ``Last-Modified`` списки не отдают:
+    с точностью до секунды он не различает заявки, созданные в одну секунду,
+    и ответ ``304`` по нему мог бы скрыть новую заявку.
+    """
+    generation = await response_cache.generation()
+    if generation is not None:
+        return make_etag(cache_key, generation, weak=True)
+    try:
+        version = await app_repo.get_applications_version()
+    except Exception:
+        logger.exception("ОШИБКА ПРИ ПОЛУЧЕНИИ ВЕРСИИ ЗАЯВОК")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="ОШИБКА ПРИ ПОЛУЧЕНИИ ЗАЯВОК",
+        )
+    return make_etag(cache_key, *version, weak=True)
+
+
+def _pack_cached(etag: str, body: bytes) -> bytes:
+    """
+    Кэш хранит ETag вместе с телом, чтобы попадание обходилось без БД.
+    """
+    return f"{etag}\n".encode() + body
+
+
+def _unpack_cached(value: bytes) -> tuple[str, bytes]:
+    etag, body = value.split(b"\n", 1)
+    return etag.decode(), body
+
+
+async def _get_applications_by_cursor(
+    app_repo: ApplicationRepository, filters: ApplicationFilter
+) -> bytes:
     try:
-        applications, total = await app_repo.get_applications(filters)
+        applications, next_cursor = await app_repo.get_applications_by_cursor(filters)
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="НЕКОРРЕКТНЫЙ КУРСОР ПАГИНАЦИИ",
+        )
     except Exception:
         logger.exception("ОШИБКА ПРИ ПОЛУЧЕНИИ ЗАЯВОК")
         raise HTTPException(
@@ -84,14 +239,229 @@ async def get_applications(
             detail="ОШИБКА ПРИ ПОЛУЧЕНИИ ЗАЯВОК",
         )
 
-    pages = ceil(total / size)
-    items = [ApplicationResponse.model_validate(app) for app in applications]
-    logger.info(f"ПОЛУЧЕНО {len(items)} ЗАЯВОК (ВСЕГО={total}, СТРАНИЦА={page})")
+    logger.info("ПОЛУЧЕНО %d ЗАЯВОК ПО КУРСОРУ", len(applications))
+
+    return dump_application_list(
+        applications,
+        total=None,
+        pages=None,
+        size=filters.size,
+        page=None,
+        next_cursor=next_cursor,
+    )
+
+
+async def _get_applications_by_page(
+    app_repo: ApplicationRepository,
+    filters: ApplicationFilter,
+    count_strategy: CountStrategy,
+) -> bytes:
+    try:
+        applications, total = await app_repo.get_applications(
+            filters, count_strategy=count_strategy
+        )
+    except Exception:
+        logger.exception("ОШИБКА ПРИ ПОЛУЧЕНИИ ЗАЯВОК")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="ОШИБКА ПРИ ПОЛУЧЕНИИ ЗАЯВОК",
+        )
+
+    pages = ceil(total.value / filters.size) if total.value is not None else None
+    logger.info(
+        "ПОЛУЧЕНО %d ЗАЯВОК (ВСЕГО=%s, СТРАНИЦА=%d)",
+        len(applications),
+        total.value,
+        filters.page,
+    )
+
+    return dump_application_list(
+        applications,
+        total=total.value,
+        pages=pages,
+        size=filters.size,
+        page=filters.page,
+        total_estimated=total.estimated,
+    )
+
+
+EXPORT_COLUMNS = ("id", "user_name", "description", "created_at")
+
+
+async def _ndjson_chunks(
+    partitions: AsyncIterator[Sequence[RowMapping]],
+) -> AsyncIterator[bytes]:
+    async for rows in partitions:
+        yield b"".join(
+            orjson.dumps(item) + b"\n" for item in dump_application_rows(rows)
+        )
+
+
+async def _csv_chunks(
+    partitions: AsyncIterator[Sequence[RowMapping]],
+) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    async for rows in partitions:
+        writer.writerows(dump_application_rows(rows))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def _logged_export(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    exported = 0
+    try:
+        async for chunk in chunks:
+            exported += 1
+            yield chunk
+    except Exception:
+        # Заголовки уже отправлены: остаётся только оборвать поток.
+        logger.exception("ОШИБКА ПРИ ВЫГРУЗКЕ ЗАЯВОК")
+        raise
+    logger.info("ВЫГРУЗКА ЗАЯВОК ЗАВЕРШЕНА, ОТПРАВЛЕНО ПАЧЕК: %d", exported)
+
+
+class _AdmittedStreamingResponse(StreamingResponse):
+    """
+    Потоковый ответ, освобождающий место в бюджете допуска после отправки,
+    в том числе при обрыве соединения клиентом.
+    """
+
+    def __init__(self, *args, ticket: AdmissionTicket | None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ticket = ticket
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if self.ticket is not None:
+                self.ticket.release()
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="ВЫГРУЗИТЬ ЗАЯВКИ",
+    description="""
+    Потоково выгружает все заявки под фильтр в формате NDJSON или CSV.
 
-    return ApplicationListResponse(
-        items=items, total=total, pages=pages, size=size, page=page
+    **Особенности:**
+    - Фильтры: `user_name` (как в списке заявок), `created_from` и `created_to`
+    - Строки читаются серверным курсором пачками по `EXPORT_CHUNK_SIZE`, поэтому
+      потребление памяти не зависит от объёма выгрузки
+    - Следующая пачка читается из БД только после того, как клиент принял предыдущую
+    """,
+    responses={
+        200: {
+            "content": {
+                NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}},
+            }
+        }
+    },
+)
+@inject
+async def export_applications(
+    settings: FromDishka[Settings],
+    app_repo: FromDishka[ApplicationRepository],
+    admission: FromDishka[AdmissionController],
+    user_name: str | None = Query(
+        None,
+        min_length=1,
+        max_length=100,
+        description="Фильтр по имени пользователя",
+    ),
+    user_name_match: UserNameMatch = Query(
+        "contains",
+        description="Способ сравнения `user_name`: `contains`, `prefix` или `exact`",
+    ),
+    created_from: datetime | None = Query(
+        None, description="Нижняя граница даты создания (включительно), ISO 8601"
+    ),
+    created_to: datetime | None = Query(
+        None, description="Верхняя граница даты создания (не включительно), ISO 8601"
+    ),
+    export_format: Literal["ndjson", "csv"] = Query(
+        "ndjson", alias="format", description="Формат выгрузки: `ndjson` или `csv`"
+    ),
+):
+    filters = ApplicationFilter(
+        user_name=user_name,
+        user_name_match=user_name_match,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    ticket = await admission.acquire("export")
+    partitions = app_repo.stream_applications(
+        filters, chunk_size=settings.export_chunk_size
     )
 
+    if export_format == "csv":
+        chunks, media_type = _csv_chunks(partitions), "text/csv; charset=utf-8"
+    else:
+        chunks, media_type = _ndjson_chunks(partitions), NDJSON_MEDIA_TYPE
+
+    return _AdmittedStreamingResponse(
+        _logged_export(chunks),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="applications.{export_format}"'
+        },
+        ticket=ticket,
+    )
+
+
+@router.get(
+    "/{application_id}",
+    response_model=ApplicationResponse,
+    response_class=ORJSONResponse,
+    summary="ПОЛУЧИТЬ ЗАЯВКУ",
+    description="""
+    Возвращает заявку по идентификатору.
+
+    **Особенности:**
+    - Заявки не изменяются после создания, поэтому ответ содержит сильный `ETag`
+      (хэш тела) и `Last-Modified` — время создания заявки
+    - На `If-None-Match` с тем же `ETag` или `If-Modified-Since` не раньше
+      создания заявки возвращается `304` без тела
+    """,
+    responses={404: {"description": "Заявка не найдена"}},
+)
+@inject
+async def get_application(
+    request: Request,
+    app_repo: FromDishka[ApplicationRepository],
+    admission: FromDishka[AdmissionController],
+    application_id: int = Path(
+        ge=1, le=2**31 - 1, description="Идентификатор заявки", example=1
+    ),
+):
+    async with admission.slot("list"):
+        try:
+            row = await app_repo.get_application(application_id)
+        except Exception:
+            logger.exception("ОШИБКА ПРИ ПОЛУЧЕНИИ ЗАЯВКИ %d", application_id)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="ОШИБКА ПРИ ПОЛУЧЕНИИ ЗАЯВКИ",
+            )
+
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="ЗАЯВКА НЕ НАЙДЕНА"
+        )
+
+    body = orjson.dumps(dump_application_rows([row])[0])
+    headers = validator_headers(body_etag(body), row["created_at"])
+    if is_not_modified(request, headers["ETag"], row["created_at"]):
+        return not_modified_response(headers)
+    return Response(content=body, media_type=ORJSONResponse.media_type, headers=headers)
+
 
 @router.post(
     "/",
@@ -102,8 +472,11 @@ async def get_applications(
     Создаёт новую заявку и асинхронно публикует её в Kafka для дальнейшей обработки.
 
     **Важно:**
-    - После успешного создания заявка отправляется в топик Kafka для аудита или внешней обработки
-    - В случае ошибки публикации в Kafka — заявка всё равно сохраняется в БД, но в логах будет предупреждение
+    - Событие для Kafka записывается в таблицу outbox в одной транзакции с заявкой
+    - Публикацию выполняет фоновое реле, поэтому время ответа не зависит от Kafka
+    - Если Kafka недоступна, событие остаётся в outbox и будет отправлено позже
+    - При `WRITE_COALESCING_ENABLED=true` заявки, пришедшие в течение нескольких
+      миллисекунд, сохраняются одной многострочной вставкой
 
     **Пример запроса:**
     ```json
@@ -117,27 +490,149 @@ async def get_applications(
 @inject
 async def create_application(
     application: ApplicationCreate,
+    response: Response,
+    settings: FromDishka[Settings],
     app_repo: FromDishka[ApplicationRepository],
-    kafka_publisher: FromDishka[KafkaPublisher],
+    write_coalescer: FromDishka[ApplicationWriteCoalescer],
+    response_cache: FromDishka[ResponseCache],
+    admission: FromDishka[AdmissionController],
 ):
-    new_application = await app_repo.create_application(
-        user_name=application.user_name, description=application.description
+    async with admission.slot("write"):
+        if settings.write_coalescing_enabled:
+            new_application = await write_coalescer.submit(application)
+        else:
+            new_application = await app_repo.create_application(
+                user_name=application.user_name,
+                description=application.description,
+                outbox_topic=settings.kafka_topic,
+            )
+    await response_cache.invalidate()
+    _remember_write(response, settings)
+
+    return ApplicationResponse.model_validate(new_application)
+
+
+def _remember_write(response: Response, settings: Settings) -> None:
+    """
+    Ставит клиенту отметку о записи, чтобы его следующие чтения шли
+    в основную БД, пока реплика может не содержать новых заявок.
+    """
+    if settings.db_replica_host is None:
+        return
+    response.set_cookie(
+        LAST_WRITE_COOKIE,
+        f"{time.time():.6f}",
+        max_age=ceil(
+            settings.db_replica_max_lag_seconds + settings.db_replica_lag_check_interval
+        ),
+        httponly=True,
+        samesite="lax",
     )
 
-    kafka_message = KafkaApplicationMessage(
-        id=new_application.id,
-        user_name=new_application.user_name,
-        description=new_application.description,
-        created_at=new_application.created_at,
+
+async def _read_bulk_items(request: Request) -> list[Any]:
+    body = await request.body()
+    if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+
+    items = json.loads(body)
+    if not isinstance(items, list):
+        raise ValueError("ОЖИДАЛСЯ СПИСОК ЗАЯВОК")
+    return items
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, err['loc'])) or 'item'}: {err['msg']}"
+        for err in error.errors()
     )
+
+
+@router.post(
+    "/bulk",
+    response_model=ApplicationBulkResponse,
+    summary="ПАКЕТНО СОЗДАТЬ ЗАЯВКИ",
+    description="""
+    Создаёт много заявок за один запрос.
+
+    **Особенности:**
+    - Тело — JSON-массив объектов `ApplicationCreate` или NDJSON
+      (`Content-Type: application/x-ndjson`, по объекту на строку)
+    - Все корректные элементы сохраняются одним многострочным `INSERT ... RETURNING`
+      в одной транзакции вместе с событиями outbox для Kafka
+    - Некорректные элементы не мешают сохранению остальных: для каждого элемента
+      возвращается `id` созданной заявки или текст ошибки
+    - Не более `BULK_MAX_ITEMS` элементов за запрос
+    """,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/ApplicationCreate"},
+                    }
+                },
+                NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+@inject
+async def create_applications_bulk(
+    request: Request,
+    response: Response,
+    settings: FromDishka[Settings],
+    app_repo: FromDishka[ApplicationRepository],
+    response_cache: FromDishka[ResponseCache],
+    admission: FromDishka[AdmissionController],
+):
     try:
-        await kafka_publisher.publish(
-            topic=settings.kafka_topic, kafka_message=kafka_message
+        raw_items = await _read_bulk_items(request)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="НЕКОРРЕКТНОЕ ТЕЛО ПАКЕТНОГО ЗАПРОСА",
+        )
+
+    if len(raw_items) > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"НЕ БОЛЕЕ {settings.bulk_max_items} ЗАЯВОК ЗА ЗАПРОС",
         )
-        logger.info(f"ЗАЯВКА {new_application.id} ОПУБЛИКОВАНА В KAFKA")
-    except Exception as e:
-        logger.error(
-            f"НЕ УДАЛОСЬ ОПУБЛИКОВАТЬ ЗАЯВКУ {new_application.id} В KAFKA: {e}"
+
+    results: list[ApplicationBulkItemResult] = []
+    valid: list[tuple[int, ApplicationCreate]] = []
+    for index, raw_item in enumerate(raw_items):
+        try:
+            valid.append((index, ApplicationCreate.model_validate(raw_item)))
+        except ValidationError as e:
+            results.append(
+                ApplicationBulkItemResult(
+                    index=index, error=_format_validation_error(e)
+                )
+            )
+
+    if valid:
+        async with admission.slot("write"):
+            created = await app_repo.create_applications(
+                [item for _, item in valid], outbox_topic=settings.kafka_topic
+            )
+        results.extend(
+            ApplicationBulkItemResult(index=index, id=application.id)
+            for (index, _), application in zip(valid, created, strict=True)
         )
+        results.sort(key=lambda result: result.index)
+        await response_cache.invalidate()
+        _remember_write(response, settings)
 
-    return ApplicationResponse.model_validate(new_application)
+    logger.info(
+        "ПАКЕТНАЯ ЗАГРУЗКА: СОЗДАНО %d, ОТКЛОНЕНО %d",
+        len(valid),
+        len(raw_items) - len(valid),
+    )
+
+    return ApplicationBulkResponse(
+        created=len(valid), failed=len(raw_items) - len(valid), items=results
+    )
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+
+from dishka.integrations.fastapi import FromDishka, inject
+from fastapi import APIRouter, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import Settings
+from app.kafka.applications.connection import KafkaConnection
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+async def check_database(engine: AsyncEngine, timeout: float) -> dict:
+    try:
+        async with asyncio.timeout(timeout):
+            async with engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning("БАЗА ДАННЫХ НЕ ГОТОВА: %s", e)
+        return {"ready": False, "error": str(e) or e.__class__.__name__}
+    return {"ready": True}
+
+
+def check_kafka(connection: KafkaConnection) -> dict:
+    if connection.ready:
+        return {"ready": True}
+    return {
+        "ready": False,
+        "error": connection.last_error or "подключение не завершено",
+    }
+
+
+@router.get("/live", summary="ПРОЦЕСС РАБОТАЕТ")
+async def live():
+    return {"status": "ok"}
+
+
+@router.get(
+    "/ready",
+    summary="ГОТОВНОСТЬ К ОБРАБОТКЕ ЗАПРОСОВ",
+    description="""
+                Проверяет базу данных и подключение к Kafka по отдельности.
+
+                Код 503 возвращается, если недоступна база данных, а при
+                `HEALTH_READY_REQUIRES_KAFKA=true` — и если нет подключения к Kafka.
+                Без Kafka заявки принимаются и ждут отправки в outbox.
+                """,
+)
+@inject
+async def ready(
+    settings: FromDishka[Settings],
+    engine: FromDishka[AsyncEngine],
+    kafka: FromDishka[KafkaConnection],
+):
+    checks = {
+        "database": await check_database(engine, settings.health_check_timeout),
+        "kafka": check_kafka(kafka),
+    }
+    required = (
+        ["database", "kafka"] if settings.health_ready_requires_kafka else ["database"]
+    )
+    is_ready = all(checks[name]["ready"] for name in required)
+    return ORJSONResponse(
+        {"status": "ready" if is_ready else "not_ready", "checks": checks},
+        status_code=status.HTTP_200_OK
+        if is_ready
+        else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
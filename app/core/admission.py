@@ -0,0 +1,225 @@
+"""
+Контроль допуска запросов к API при перегрузке.
+
+Каждый бюджет ограничивает число одновременно обрабатываемых запросов
+и длину очереди ожидающих. Запрос отклоняется с 503 и ``Retry-After``
+сразу, если очередь заполнена или по средней длительности обработки
+видно, что он не дождётся своей очереди за ``queue_timeout``, а также
+если время ожидания истекло. Так при медленной БД часть запросов
+получает быстрый отказ, а остальные — обычное время ответа.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Literal
+
+from fastapi import Request, status
+from fastapi.responses import ORJSONResponse
+
+from app.core.config import Settings
+from app.core.metrics import ADMISSION_QUEUE_WAIT_SECONDS, ADMISSION_SHED
+
+logger = logging.getLogger(__name__)
+
+Budget = Literal["list", "list_filtered", "export", "write"]
+ShedReason = Literal["queue_full", "deadline", "timeout"]
+
+# Вес нового замера в скользящем среднем длительности обработки.
+SERVICE_TIME_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, budget: str, reason: ShedReason, retry_after: int):
+        super().__init__(budget, reason, retry_after)
+        self.budget = budget
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def __str__(self) -> str:
+        return f"{self.budget}: {self.reason}"
+
+
+class AdmissionTicket:
+    """
+    Занятое место в бюджете; повторный ``release()`` ничего не делает.
+    """
+
+    def __init__(self, limiter: "AdmissionLimiter"):
+        self.limiter = limiter
+        self.started = time.perf_counter()
+        self.released = False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.limiter._release(time.perf_counter() - self.started)
+
+
+class AdmissionLimiter:
+    """
+    Ограничение параллелизма с очередью FIFO и сроком ожидания.
+
+    Освободившееся место передаётся первому ожидающему напрямую, поэтому
+    новые запросы не обгоняют очередь.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.admitted_total = 0
+        self.service_seconds = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def estimated_wait(self) -> float:
+        """
+        Оценка ожидания нового запроса: число «волн» впереди на среднее время.
+        """
+        waves = len(self._waiters) // max(self.max_concurrency, 1) + 1
+        return waves * self.service_seconds
+
+    async def acquire(self) -> AdmissionTicket:
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            return self._admit(0.0)
+        if len(self._waiters) >= self.max_queue:
+            raise self._shed("queue_full")
+        if self.estimated_wait() > self.queue_timeout:
+            raise self._shed("deadline")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait((waiter,), timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # Клиент ушёл: место, если его уже передали, отдаём дальше.
+            if waiter.done() and not waiter.cancelled():
+                self._release(None)
+            else:
+                self._discard(waiter)
+            raise
+        if not waiter.done():
+            self._discard(waiter)
+            raise self._shed("timeout")
+        # Место передано из _release, in_flight уже учтён.
+        return self._admit(time.perf_counter() - started)
+
+    def _admit(self, waited: float) -> AdmissionTicket:
+        self.admitted_total += 1
+        ADMISSION_QUEUE_WAIT_SECONDS.observe(waited, budget=self.name)
+        return AdmissionTicket(self)
+
+    def _release(self, service_seconds: float | None) -> None:
+        if service_seconds is not None:
+            self.service_seconds += SERVICE_TIME_ALPHA * (
+                service_seconds - self.service_seconds
+            )
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Место переходит ожидающему, in_flight не уменьшается.
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _shed(self, reason: ShedReason) -> AdmissionRejected:
+        ADMISSION_SHED.inc(budget=self.name, reason=reason)
+        retry_after = max(1, math.ceil(self.estimated_wait() or self.queue_timeout))
+        logger.warning(
+            "ЗАПРОС ОТКЛОНЁН КОНТРОЛЕМ ДОПУСКА: БЮДЖЕТ=%s, ПРИЧИНА=%s, "
+            "В РАБОТЕ=%d, В ОЧЕРЕДИ=%d",
+            self.name,
+            reason,
+            self.in_flight,
+            len(self._waiters),
+        )
+        return AdmissionRejected(self.name, reason, retry_after)
+
+
+class AdmissionController:
+    """
+    Набор бюджетов API; при ``enabled=False`` запросы пропускаются без учёта.
+    """
+
+    def __init__(self, limiters: dict[str, AdmissionLimiter], enabled: bool = True):
+        self.limiters = limiters
+        self.enabled = enabled
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "AdmissionController":
+        budgets = {
+            "list": (
+                settings.admission_list_concurrency,
+                settings.admission_list_queue,
+            ),
+            "list_filtered": (
+                settings.admission_filtered_concurrency,
+                settings.admission_filtered_queue,
+            ),
+            "export": (
+                settings.admission_export_concurrency,
+                settings.admission_export_queue,
+            ),
+            "write": (
+                settings.admission_write_concurrency,
+                settings.admission_write_queue,
+            ),
+        }
+        return cls(
+            {
+                name: AdmissionLimiter(
+                    name, concurrency, queue, settings.admission_queue_timeout
+                )
+                for name, (concurrency, queue) in budgets.items()
+            },
+            enabled=settings.admission_enabled,
+        )
+
+    async def acquire(self, budget: Budget) -> AdmissionTicket | None:
+        if not self.enabled:
+            return None
+        return await self.limiters[budget].acquire()
+
+    @asynccontextmanager
+    async def slot(self, budget: Budget) -> AsyncIterator[None]:
+        ticket = await self.acquire(budget)
+        try:
+            yield
+        finally:
+            if ticket is not None:
+                ticket.release()
+
+
+async def admission_rejected_handler(
+    request: Request, exc: AdmissionRejected
+) -> ORJSONResponse:
+    return ORJSONResponse(
+        {"detail": "СЕРВИС ПЕРЕГРУЖЕН, ПОВТОРИТЕ ЗАПРОС ПОЗЖЕ"},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
@@ -0,0 +1,218 @@
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+
+def _counter_start() -> int:
+    # Новый счётчик начинается с текущего времени в микросекундах, поэтому
+    # после перезапуска или очистки хранилища поколения не повторяются.
+    return time.time_ns() // 1000
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CacheBackend(Protocol):
+    """
+    Хранилище сериализованных ответов: байты по строковому ключу
+    и целочисленные счётчики для поколений.
+    """
+
+    async def get(self, key: str) -> bytes | None:
+        """
+        Значение по ключу или ``None``, если его нет или истёк срок.
+        """
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """
+        Сохраняет значение на ``ttl`` секунд.
+        """
+
+    async def get_counter(self, key: str) -> int:
+        """
+        Текущее значение счётчика; отсутствующий начинается с ``_counter_start()``.
+        """
+
+    async def incr(self, key: str) -> int:
+        """
+        Увеличивает счётчик на единицу и возвращает новое значение.
+        """
+
+    async def close(self) -> None:
+        """
+        Освобождает соединения хранилища.
+        """
+
+
+class InMemoryCacheBackend:
+    """
+    LRU-кэш внутри процесса с временем жизни записей.
+
+    Используется по умолчанию, а в тестах — как локальная замена общему
+    хранилищу: несколько ``ResponseCache`` с одним экземпляром ведут себя
+    как несколько воркеров с общим Redis.
+    """
+
+    def __init__(self, max_entries: int, stats: CacheStats | None = None):
+        self.max_entries = max_entries
+        self.stats = stats or CacheStats()
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._counters: dict[str, int] = {}
+        self._counter_start = _counter_start()
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, self._counter_start)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, self._counter_start) + 1
+        return self._counters[key]
+
+    async def close(self) -> None:
+        self._entries.clear()
+
+
+class RedisCacheBackend:
+    """
+    Общий для всех воркеров кэш в Redis.
+
+    Требует установленного пакета ``redis``; LRU-вытеснение выполняет сам Redis
+    (``maxmemory-policy allkeys-lru``).
+    """
+
+    def __init__(self, url: str):
+        try:
+            from redis.asyncio import Redis
+        except ImportError as e:
+            raise RuntimeError(
+                "ДЛЯ RESPONSE_CACHE_BACKEND=redis НУЖЕН ПАКЕТ redis"
+            ) from e
+        self._redis = Redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._redis.set(key, value, px=int(ttl * 1000))
+
+    async def get_counter(self, key: str) -> int:
+        value = await self._redis.get(key)
+        if value is None:
+            await self._redis.set(key, _counter_start(), nx=True)
+            value = await self._redis.get(key)
+        return int(value)
+
+    async def incr(self, key: str) -> int:
+        async with self._redis.pipeline(transaction=True) as pipeline:
+            pipeline.set(key, _counter_start(), nx=True)
+            pipeline.incr(key)
+            _, value = await pipeline.execute()
+        return value
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class ResponseCache:
+    """
+    Кэш сериализованных ответов с инвалидацией по поколению.
+
+    Ключ записи включает текущее поколение пространства имён, поэтому
+    ``invalidate`` не удаляет записи, а только увеличивает поколение:
+    старые записи перестают читаться и вытесняются по LRU или TTL.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl: float,
+        namespace: str = "applications",
+        stats: CacheStats | None = None,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.namespace = namespace
+        self.stats = stats or CacheStats()
+
+    def _generation_key(self) -> str:
+        return f"{self.namespace}:generation"
+
+    async def _key(self, key: str) -> str:
+        generation = await self.backend.get_counter(self._generation_key())
+        return f"{self.namespace}:{generation}:{key}"
+
+    async def generation(self) -> int | None:
+        """
+        Поколение меняется при каждом ``invalidate``, то есть после любой
+        записи заявок; ``None`` — кэш отключён и общего поколения нет.
+        """
+        return await self.backend.get_counter(self._generation_key())
+
+    async def get(self, key: str) -> bytes | None:
+        value = await self.backend.get(await self._key(key))
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.backend.set(await self._key(key), value, self.ttl)
+
+    async def invalidate(self) -> None:
+        generation = await self.backend.incr(self._generation_key())
+        self.stats.invalidations += 1
+        logger.info("КЭШ '%s' СБРОШЕН, ПОКОЛЕНИЕ %d", self.namespace, generation)
+
+
+class NullResponseCache(ResponseCache):
+    """
+    Отключённый кэш: ничего не хранит, ``get`` всегда промахивается.
+    """
+
+    def __init__(self):
+        super().__init__(InMemoryCacheBackend(max_entries=0), ttl=0)
+
+    async def generation(self) -> int | None:
+        return None
+
+    async def get(self, key: str) -> bytes | None:
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: bytes) -> None:
+        return None
+
+    async def invalidate(self) -> None:
+        return None
@@ -0,0 +1,145 @@
+"""
+Сжатие ответов API в gzip или brotli по заголовку ``Accept-Encoding``.
+
+Сжимаются только JSON, NDJSON и CSV не меньше ``minimum_size`` байт:
+короткие ответы и 304 уходят как есть, а потоковая выгрузка сжимается
+пачками по мере отправки. Сильный ETag сжатого ответа получает суффикс
+кодировки (``"…-gzip"``), чтобы кэши не путали представления;
+``etag_matches`` этот суффикс игнорирует.
+"""
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен: без него остаётся только gzip
+    brotli = None
+
+COMPRESSIBLE_CONTENT_TYPES = ("application/json", "application/x-ndjson", "text/csv")
+
+
+def parse_accept_encoding(value: str) -> dict[str, float]:
+    codings: dict[str, float] = {}
+    for item in value.split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, raw = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(raw)
+                except ValueError:
+                    quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+def choose_encoding(accept_encoding: str, available: tuple[str, ...]) -> str | None:
+    """
+    Кодировка с наибольшим q; при равенстве — первая в ``available``.
+    """
+    codings = parse_accept_encoding(accept_encoding)
+    chosen, chosen_quality = None, 0.0
+    for coding in available:
+        quality = codings.get(coding, codings.get("*", 0.0))
+        if quality > chosen_quality:
+            chosen, chosen_quality = coding, quality
+    return chosen
+
+
+class _SelectiveCompression:
+    """
+    Ограничивает сжатие типами ``COMPRESSIBLE_CONTENT_TYPES`` и помечает
+    сильный ETag сжатого ответа кодировкой.
+    """
+
+    content_encoding: str
+    content_encoding_set: bool
+    content_type_is_excluded: bool
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async def send_with_etag(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self._tag_encoding(message)
+            await send(message)
+
+        await super().__call__(scope, receive, send_with_etag)
+
+    async def send_with_compression(self, message: Message) -> None:
+        await super().send_with_compression(message)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            self.content_type_is_excluded = not content_type.startswith(
+                COMPRESSIBLE_CONTENT_TYPES
+            )
+
+    def _tag_encoding(self, message: Message) -> None:
+        if self.content_encoding_set:
+            return
+        headers = MutableHeaders(raw=message["headers"])
+        etag = headers.get("etag")
+        if (
+            headers.get("content-encoding") == self.content_encoding
+            and etag
+            and not etag.startswith("W/")
+        ):
+            headers["etag"] = f'{etag[:-1]}-{self.content_encoding}"'
+
+
+class GZipCompressionResponder(_SelectiveCompression, GZipResponder):
+    pass
+
+
+class BrotliResponder(_SelectiveCompression, IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        data = self.compressor.process(body)
+        # Каждая пачка выгрузки отправляется клиенту сразу, а не копится в буфере.
+        if more_body:
+            return data + self.compressor.flush()
+        return data + self.compressor.finish()
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        if encoding == "br":
+            responder = BrotliResponder(
+                self.app, self.minimum_size, quality=self.brotli_quality
+            )
+        elif encoding == "gzip":
+            responder = GZipCompressionResponder(
+                self.app, self.minimum_size, compresslevel=self.gzip_level
+            )
+        else:
+            responder = self.app
+        await responder(scope, receive, send)
@@ -0,0 +1,99 @@
+"""
+Условные запросы: ETag, Last-Modified и ответ 304 Not Modified.
+
+Валидатор сравнивается до построения тела ответа. Для списков это
+поколение кэша ответов, поэтому повторный опрос неизменившегося списка
+обходится без запросов к БД.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+# Суффиксы, которые CompressionMiddleware добавляет к сильному ETag сжатого ответа.
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def make_etag(*parts: object, weak: bool = False) -> str:
+    digest = hashlib.blake2b(
+        "|".join(map(str, parts)).encode(), digest_size=12
+    ).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def body_etag(body: bytes) -> str:
+    """
+    Сильный ETag: меняется при изменении любого байта тела.
+    """
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    tag = etag.strip().removeprefix("W/").strip('"')
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag.removesuffix(suffix)
+    return tag
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Слабое сравнение для ``If-None-Match`` (RFC 9110, 13.1.2).
+
+    Суффикс кодировки не учитывается: сжатое и несжатое представления
+    одного ответа совпадают для условного запроса.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    expected = _opaque_tag(etag)
+    return any(_opaque_tag(tag) == expected for tag in if_none_match.split(","))
+
+
+def _utc_seconds(value: datetime) -> datetime:
+    # HTTP-даты имеют точность в секунду; время без зоны считается UTC.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_utc_seconds(value), usegmt=True)
+
+
+def not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return _utc_seconds(last_modified) <= since
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: datetime | None = None
+) -> bool:
+    """
+    ``If-None-Match`` имеет приоритет: при его наличии ``If-Modified-Since``
+    не проверяется.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        return not_modified_since(if_modified_since, last_modified)
+    return False
+
+
+def validator_headers(etag: str, last_modified: datetime | None = None) -> dict:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified_response(headers: dict) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
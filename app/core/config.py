@@ -1,3 +1,6 @@
+from functools import lru_cache
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,21 +10,149 @@ class Settings(BaseSettings):
     db_user: str
     db_password: str
     db_name: str
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+    db_pgbouncer_mode: bool = False
+    db_replica_host: str | None = None
+    db_replica_port: int | None = None
+    db_replica_max_lag_seconds: float = 5.0
+    db_replica_lag_check_interval: float = 1.0
+
+    partition_maintenance_enabled: bool = True
+    partition_maintenance_interval: float = 3600.0
+    partition_premake_months: int = 3
+    partition_retention_months: int | None = None
+    partition_retention_action: Literal["drop", "archive"] = "archive"
+
+    sql_trace_enabled: bool = False
+    sql_slow_query_ms: float = 200.0
+    sql_explain_sample_rate: float = 0.0
+    sql_trace_log_parameters: bool = True
+
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int | None = None
+    server_backlog: int = 2048
+    server_keep_alive_timeout: int = 5
+    server_graceful_shutdown_timeout: int = 30
+    server_access_log: bool = True
+    server_forwarded_allow_ips: str = "127.0.0.1"
+
+    metrics_multiproc_dir: str | None = None
+    metrics_write_interval: float = 5.0
+
+    admission_enabled: bool = True
+    admission_queue_timeout: float = 1.0
+    admission_list_concurrency: int = 16
+    admission_list_queue: int = 64
+    admission_filtered_concurrency: int = 4
+    admission_filtered_queue: int = 16
+    admission_export_concurrency: int = 2
+    admission_export_queue: int = 4
+    admission_write_concurrency: int = 16
+    admission_write_queue: int = 64
+
+    health_check_timeout: float = 2.0
+    health_ready_requires_kafka: bool = False
+
+    log_level: str = "INFO"
+    log_format: Literal["text", "json"] = "text"
+    log_queue_size: int = 10000
+    log_sample_rates: dict[str, float] = {}
+    log_rate_limits: dict[str, float] = {}
 
     kafka_bootstrap_servers: str
     kafka_topic: str
+    kafka_acks: Literal["0", "1", "-1", "all"] = "1"
+    kafka_linger_ms: int = 5
+    kafka_max_batch_size: int = 65536
+    kafka_compression_type: Literal["gzip", "snappy", "lz4", "zstd"] | None = None
+    kafka_consumer_batch: bool = False
+    kafka_consumer_max_records: int = 100
+    kafka_consumer_batch_timeout_ms: int = 200
+    kafka_consumer_concurrency: int = 10
+    kafka_consumer_send_attempts: int = 5
+    kafka_consumer_retry_backoff: float = 0.5
+    kafka_dead_letter_topic: str | None = None
+    kafka_connect_retry_initial: float = 0.5
+    kafka_connect_retry_max: float = 30.0
+
+    smtp_host: str = "maildev"
+    smtp_port: int = 1025
+    smtp_sender: str = "test@example.com"
+    smtp_timeout: float = 10.0
+    smtp_pool_size: int = 5
+    smtp_idle_check_seconds: float = 30.0
+    smtp_max_messages_per_connection: int = 100
+
+    notification_recipient: str = "recipient@example.com"
+    notification_digest_enabled: bool = False
+    notification_digest_window_seconds: float = 10.0
+    notification_digest_max_items: int = 50
+
+    bulk_max_items: int = 5000
+    export_chunk_size: int = 1000
+
+    write_coalescing_enabled: bool = False
+    write_coalescing_window_ms: float = 5.0
+    write_coalescing_max_batch: int = 100
+    write_coalescing_max_inflight: int = 4
+
+    outbox_batch_size: int = 100
+    outbox_poll_interval: float = 1.0
+    outbox_retention_seconds: float = 86400.0
+    outbox_cleanup_interval: float = 300.0
+
+    applications_count_strategy: Literal["exact", "cached", "estimate", "none"] = (
+        "exact"
+    )
+    applications_count_cache_ttl: float = 30.0
+    applications_count_cache_max_entries: int = 1024
+
+    response_cache_backend: Literal["memory", "redis", "none"] = "memory"
+    response_cache_ttl: float = 5.0
+    response_cache_max_entries: int = 1024
+    response_cache_redis_url: str = "redis://localhost:6379/0"
+
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
 
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=False
     )
 
+    @property
+    def kafka_producer_acks(self) -> int | str:
+        return self.kafka_acks if self.kafka_acks == "all" else int(self.kafka_acks)
+
     @property
     def async_database_url(self) -> str:
         return f"postgresql+asyncpg://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
 
+    @property
+    def async_replica_database_url(self) -> str | None:
+        if self.db_replica_host is None:
+            return None
+        port = self.db_replica_port or self.db_port
+        return f"postgresql+asyncpg://{self.db_user}:{self.db_password}@{self.db_replica_host}:{port}/{self.db_name}"
+
     @property
     def sync_database_url(self) -> str:
         return f"postgresql://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Настройки из окружения; читаются при первом вызове, а не при импорте.
+
+    Веб-приложение получает ``Settings`` через ``create_app`` и контейнер,
+    эта функция — для точек входа: CLI, миграций и воркера Kafka.
+    """
+    return Settings()
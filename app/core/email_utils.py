@@ -1,13 +1,163 @@
+import asyncio
+import logging
+import time
 from email.message import EmailMessage
 
 import aiosmtplib
 
+from app.core.config import Settings, get_settings
+from app.core.metrics import EMAIL_SEND_ERRORS, EMAIL_SEND_SECONDS
 
-async def send_email(to_email: str, subject: str, body: str):
+logger = logging.getLogger(__name__)
+
+
+class _PooledConnection:
+    def __init__(self, client: aiosmtplib.SMTP):
+        self.client = client
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """
+    Пул постоянных SMTP-соединений.
+
+    Соединение открывается один раз и используется для многих писем.
+    Перед выдачей долго простаивавшее соединение проверяется командой NOOP,
+    разорванное соединение пересоздаётся. Одновременно открыто не более
+    ``size`` соединений; после ``max_messages_per_connection`` писем
+    соединение закрывается и открывается заново.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        size: int,
+        timeout: float,
+        idle_check_seconds: float,
+        max_messages_per_connection: int,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.timeout = timeout
+        self.idle_check_seconds = idle_check_seconds
+        self.max_messages_per_connection = max_messages_per_connection
+        self._slots = asyncio.Semaphore(size)
+        self._idle: list[_PooledConnection] = []
+        self._closed = False
+
+    async def _connect(self) -> _PooledConnection:
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname, port=self.port, timeout=self.timeout
+        )
+        await client.connect()
+        logger.info("ОТКРЫТО SMTP-СОЕДИНЕНИЕ С %s:%s", self.hostname, self.port)
+        return _PooledConnection(client)
+
+    async def _is_healthy(self, connection: _PooledConnection) -> bool:
+        if not connection.client.is_connected:
+            return False
+        if time.monotonic() - connection.last_used < self.idle_check_seconds:
+            return True
+        try:
+            await connection.client.noop()
+            return True
+        except Exception:
+            return False
+
+    async def _acquire(self) -> _PooledConnection:
+        while self._idle:
+            connection = self._idle.pop()
+            if await self._is_healthy(connection):
+                return connection
+            await self._discard(connection)
+        return await self._connect()
+
+    async def _release(self, connection: _PooledConnection) -> None:
+        connection.last_used = time.monotonic()
+        if self._closed or connection.messages_sent >= self.max_messages_per_connection:
+            await self._discard(connection)
+        else:
+            self._idle.append(connection)
+
+    @staticmethod
+    async def _discard(connection: _PooledConnection) -> None:
+        try:
+            if connection.client.is_connected:
+                await connection.client.quit()
+        except Exception:
+            connection.client.close()
+
+    async def send(self, message: EmailMessage) -> None:
+        async with self._slots:
+            connection = await self._acquire()
+            try:
+                try:
+                    await connection.client.send_message(message)
+                except aiosmtplib.SMTPServerDisconnected:
+                    # Сервер мог закрыть соединение между проверкой и отправкой.
+                    await self._discard(connection)
+                    connection = await self._connect()
+                    await connection.client.send_message(message)
+            except Exception:
+                await self._discard(connection)
+                raise
+            connection.messages_sent += 1
+            await self._release(connection)
+
+    async def close(self) -> None:
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await self._discard(connection)
+        logger.info("SMTP-ПУЛ ЗАКРЫТ")
+
+
+smtp_pool: SMTPConnectionPool | None = None
+
+
+def init_smtp_pool(settings: Settings) -> SMTPConnectionPool:
+    global smtp_pool
+    smtp_pool = SMTPConnectionPool(
+        hostname=settings.smtp_host,
+        port=settings.smtp_port,
+        size=settings.smtp_pool_size,
+        timeout=settings.smtp_timeout,
+        idle_check_seconds=settings.smtp_idle_check_seconds,
+        max_messages_per_connection=settings.smtp_max_messages_per_connection,
+    )
+    return smtp_pool
+
+
+async def close_smtp_pool() -> None:
+    global smtp_pool
+    if smtp_pool is not None:
+        await smtp_pool.close()
+        smtp_pool = None
+
+
+async def send_email(
+    to_email: str, subject: str, body: str, settings: Settings | None = None
+):
+    settings = settings or get_settings()
     message = EmailMessage()
-    message["From"] = "test@example.com"
+    message["From"] = settings.smtp_sender
     message["To"] = to_email
     message["Subject"] = subject
     message.set_content(body)
 
-    await aiosmtplib.send(message, hostname="maildev", port=1025)
+    try:
+        with EMAIL_SEND_SECONDS.time():
+            if smtp_pool is not None:
+                await smtp_pool.send(message)
+            else:
+                await aiosmtplib.send(
+                    message,
+                    hostname=settings.smtp_host,
+                    port=settings.smtp_port,
+                    timeout=settings.smtp_timeout,
+                )
+    except Exception:
+        EMAIL_SEND_ERRORS.inc()
+        raise
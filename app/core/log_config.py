@@ -0,0 +1,208 @@
+"""
+Настройка логирования веб-приложения и потребителя FastStream.
+
+Записи из event loop только кладутся в очередь: форматирование и вывод
+выполняет поток ``QueueListener``. Для записей ниже WARNING можно задать
+выборку (``log_sample_rates``) и ограничение частоты в секунду
+(``log_rate_limits``) по префиксу имени логгера, например
+``{"app.api.applications": 0.1}``.
+"""
+
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Literal
+
+import orjson
+
+from app.core.config import Settings, get_settings
+from app.core.request_context import request_id_var
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+# Логгеры uvicorn по умолчанию пишут в поток синхронно и не доходят до root.
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+LogFormat = Literal["text", "json"]
+
+_handler: "NonBlockingQueueHandler | None" = None
+_listener: QueueListener | None = None
+
+
+def _match_prefix(name: str, limits: dict[str, float]) -> str | None:
+    """
+    Возвращает самый длинный ключ ``limits``, являющийся префиксом логгера.
+    """
+    best = None
+    for prefix in limits:
+        if (name == prefix or name.startswith(prefix + ".")) and (
+            best is None or len(prefix) > len(best)
+        ):
+            best = prefix
+    return best
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускает долю ``rate`` записей ниже WARNING от указанных логгеров.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        prefix = _match_prefix(record.name, self.rates)
+        return prefix is None or random.random() < self.rates[prefix]
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Пропускает не больше ``limit`` записей ниже WARNING в секунду на префикс.
+    """
+
+    def __init__(self, limits: dict[str, float]):
+        super().__init__()
+        self.limits = limits
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        prefix = _match_prefix(record.name, self.limits)
+        if prefix is None:
+            return True
+        limit = self.limits[prefix]
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(prefix, (limit, now))
+            tokens = min(limit, tokens + (now - updated) * limit)
+            allowed = tokens >= 1
+            self._buckets[prefix] = (tokens - allowed, now)
+        return allowed
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id is not None:
+            entry["request_id"] = request_id
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Кладёт запись в очередь без форматирования; при переполнении отбрасывает.
+
+    Сообщение собирается из ``msg`` и ``args`` уже в потоке слушателя.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped_total = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped_total += 1
+
+
+def setup_logging(
+    settings: Settings | None = None,
+    *,
+    level: str | None = None,
+    log_format: LogFormat | None = None,
+    queue_size: int | None = None,
+    sample_rates: dict[str, float] | None = None,
+    rate_limits: dict[str, float] | None = None,
+    stream=None,
+) -> None:
+    """
+    Подключает к root-логгеру очередь и запускает поток вывода.
+
+    Не указанные параметры берутся из ``settings`` (по умолчанию —
+    ``get_settings()``). Повторный вызов при запущенном слушателе ничего
+    не делает.
+    """
+    global _handler, _listener
+    if _listener is not None:
+        return
+
+    settings = settings or get_settings()
+    level = level or settings.log_level
+    log_format = log_format or settings.log_format
+    queue_size = settings.log_queue_size if queue_size is None else queue_size
+    sample_rates = settings.log_sample_rates if sample_rates is None else sample_rates
+    rate_limits = settings.log_rate_limits if rate_limits is None else rate_limits
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(
+        JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+    )
+
+    handler = NonBlockingQueueHandler(queue.Queue(queue_size))
+    handler.addFilter(RequestIdFilter())
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+    if rate_limits:
+        handler.addFilter(RateLimitFilter(rate_limits))
+
+    root = logging.getLogger()
+    root.setLevel(level.upper())
+    root.addHandler(handler)
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        # Без обработчиков логгер либо уже пишет в root, либо отключён uvicorn.
+        if uvicorn_logger.handlers:
+            uvicorn_logger.handlers.clear()
+            uvicorn_logger.propagate = True
+
+    _handler = handler
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """
+    Дописывает оставшиеся в очереди записи и останавливает поток вывода.
+    """
+    global _handler, _listener
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.flush()
+    _handler = None
+    _listener = None
+
+
+def dropped_records() -> int:
+    return _handler.dropped_total if _handler is not None else 0
@@ -0,0 +1,451 @@
+import asyncio
+import logging
+import os
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(
+    names: tuple[str, ...], values: tuple[str, ...], **extra: str
+) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return (
+        "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+    )
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(labels[name] for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(labels[name] for name in self.labelnames), 0)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for key, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram:
+    """
+    Гистограмма значений; корзины по умолчанию рассчитаны на длительности.
+
+    ``observe`` увеличивает один счётчик корзины; накопленные значения
+    ``_bucket`` считаются только при выдаче метрик.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Значения по набору меток: [счётчики корзин..., +Inf], сумма.
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(labels[name] for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(tuple(labels[name] for name in self.labelnames))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for key, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, le=_format_value(bound))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total[0])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class CallbackMetric:
+    """
+    Метрика, значение которой читается из существующего объекта статистики
+    в момент выдачи метрик.
+
+    При заданных ``labelnames`` callback возвращает словарь
+    ``{значения меток: значение}``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], float] | Callable[[], dict[tuple[str, ...], float]],
+        kind: str,
+        labelnames: tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.kind = kind
+        self.labelnames = labelnames
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        if not self.labelnames:
+            yield f"{self.name} {_format_value(self.callback())}"
+            return
+        for key, value in self.callback().items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram | CallbackMetric] = {}
+
+    def counter(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge_callback(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable,
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
+        self._metrics[name] = CallbackMetric(
+            name, documentation, callback, "gauge", labelnames
+        )
+
+    def counter_callback(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable,
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
+        self._metrics[name] = CallbackMetric(
+            name, documentation, callback, "counter", labelnames
+        )
+
+    def _register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _parse_value(value: str) -> float:
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def _with_pid(sample: str, pid: int) -> str:
+    if sample.endswith("}"):
+        return f'{sample[:-1]},pid="{pid}"}}'
+    return f'{sample}{{pid="{pid}"}}'
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MultiprocessMetrics:
+    """
+    Общие метрики нескольких процессов-worker.
+
+    Каждый процесс раз в ``interval`` секунд записывает свои метрики в
+    ``<directory>/<pid>.prom``. ``/metrics`` отдаёт их сумму: счётчики и
+    гистограммы складываются (в том числе завершившихся процессов, чтобы
+    сумма не уменьшалась), а gauge выдаются по каждому живому процессу
+    с меткой ``pid``. Значения других процессов отстают не более чем на
+    ``interval``.
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: str, interval: float):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self.path = os.path.join(directory, f"{os.getpid()}.prom")
+        self._stopped = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopped.clear()
+            self._task = asyncio.create_task(self._run(), name="metrics-writer")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopped.set()
+        await self._task
+        self._task = None
+        self.write()
+
+    async def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.write()
+            except OSError:
+                logger.exception("НЕ УДАЛОСЬ ЗАПИСАТЬ МЕТРИКИ В %s", self.path)
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=self.interval)
+            except TimeoutError:
+                pass
+
+    def write(self) -> None:
+        # Запись через временный файл: читатель не увидит файл наполовину.
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            file.write(self.registry.render())
+        os.replace(tmp, self.path)
+
+    def render(self) -> str:
+        self.write()
+        # Имя метрики -> (HELP, TYPE, {образец: значение}).
+        families: dict[str, tuple[str, str, dict[str, float]]] = {}
+        for name in sorted(os.listdir(self.directory)):
+            pid_text, ext = os.path.splitext(name)
+            if ext != ".prom" or not pid_text.isdigit():
+                continue
+            pid = int(pid_text)
+            alive = _pid_alive(pid)
+            with open(os.path.join(self.directory, name), encoding="utf-8") as file:
+                lines = file.read().splitlines()
+            help_line = ""
+            samples: dict[str, float] = {}
+            kind = "untyped"
+            for line in lines:
+                if line.startswith("# HELP "):
+                    help_line = line
+                elif line.startswith("# TYPE "):
+                    _, _, family, kind = line.split(" ", 3)
+                    samples = families.setdefault(family, (help_line, kind, {}))[2]
+                elif line:
+                    sample, value = line.rsplit(" ", 1)
+                    if kind == "gauge":
+                        if alive:
+                            samples[_with_pid(sample, pid)] = _parse_value(value)
+                    else:
+                        samples[sample] = samples.get(sample, 0) + _parse_value(value)
+
+        output: list[str] = []
+        for family, (help_line, kind, samples) in families.items():
+            output.append(help_line)
+            output.append(f"# TYPE {family} {kind}")
+            output.extend(
+                f"{sample} {_format_value(value)}" for sample, value in samples.items()
+            )
+        return "\n".join(output) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds",
+    "Длительность HTTP-запросов по маршрутам",
+    ("method", "route", "status"),
+)
+DB_STATEMENT_SECONDS = registry.histogram(
+    "db_statement_duration_seconds",
+    "Длительность SQL-выражений по типу",
+    ("operation",),
+)
+KAFKA_PUBLISH_SECONDS = registry.histogram(
+    "kafka_publish_duration_seconds",
+    "Длительность публикации в Kafka до подтверждения",
+    ("topic", "mode"),
+)
+KAFKA_PUBLISH_ERRORS = registry.counter(
+    "kafka_publish_errors_total",
+    "Неудачные публикации в Kafka",
+    ("topic", "mode"),
+)
+EMAIL_SEND_SECONDS = registry.histogram(
+    "email_send_duration_seconds",
+    "Длительность отправки писем",
+)
+EMAIL_SEND_ERRORS = registry.counter(
+    "email_send_errors_total",
+    "Неудачные отправки писем",
+)
+ADMISSION_QUEUE_WAIT_SECONDS = registry.histogram(
+    "admission_queue_wait_seconds",
+    "Ожидание в очереди допуска до начала обработки запроса",
+    ("budget",),
+)
+WRITE_COALESCER_QUEUE_WAIT_SECONDS = registry.histogram(
+    "write_coalescer_queue_wait_seconds",
+    "Ожидание заявки в очереди объединения до начала вставки",
+)
+WRITE_COALESCER_BATCH_SIZE = registry.histogram(
+    "write_coalescer_batch_size",
+    "Число заявок в пачке объединённой вставки",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+ADMISSION_SHED = registry.counter(
+    "admission_shed_total",
+    "Запросы, отклонённые контролем допуска с кодом 503",
+    ("budget", "reason"),
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware, измеряющее длительность HTTP-запросов.
+
+    В метку ``route`` попадает шаблон пути (``/applications/{id}``),
+    а не сам путь, чтобы число временных рядов не росло с данными.
+    Для потоковых ответов учитывается время до отправки последнего чанка.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code),
+            )
+
+
+def _statement_operation(statement: str) -> str:
+    operation = statement.lstrip().split(None, 1)
+    return operation[0].upper() if operation else "UNKNOWN"
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Подключает замер длительности каждого SQL-выражения к движку.
+
+    Для ``AsyncEngine`` передаётся ``engine.sync_engine``.
+    """
+    if getattr(engine, "_metrics_instrumented", False):
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started_at"].pop()
+        DB_STATEMENT_SECONDS.observe(
+            time.perf_counter() - started, operation=_statement_operation(statement)
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started_at"):
+            connection.info["query_started_at"].pop()
+
+    engine._metrics_instrumented = True
@@ -0,0 +1,38 @@
+import base64
+import json
+from datetime import datetime
+
+
+class InvalidCursorError(ValueError):
+    """
+    Курсор пагинации повреждён или сформирован не этим сервисом.
+    """
+
+
+def encode_cursor(created_at: datetime, application_id: int) -> str:
+    """
+    Кодирует позицию последней заявки страницы в непрозрачный курсор.
+
+    Курсор хранит пару ``(created_at, id)`` в полной точности, поэтому
+    его нельзя строить из отформатированного ответа API.
+    """
+    raw = json.dumps([created_at.isoformat(), application_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Восстанавливает пару ``(created_at, id)`` из курсора.
+
+    Raises
+    ------
+    InvalidCursorError
+        Если курсор не удаётся разобрать.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, application_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(application_id)
+    # binascii.Error, UnicodeDecodeError и JSONDecodeError — подклассы ValueError.
+    except (TypeError, ValueError) as e:
+        raise InvalidCursorError("НЕКОРРЕКТНЫЙ КУРСОР ПАГИНАЦИИ") from e
@@ -0,0 +1,78 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from uuid import uuid4
+
+REQUEST_ID_HEADER = "x-request-id"
+
+
+@dataclass
+class RequestSqlStats:
+    queries: int = 0
+    seconds: float = 0.0
+
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+sql_stats_var: ContextVar[RequestSqlStats | None] = ContextVar(
+    "sql_stats", default=None
+)
+
+
+class RequestContextMiddleware:
+    """
+    Присваивает запросу идентификатор и собирает по нему статистику SQL.
+
+    Идентификатор берётся из заголовка ``X-Request-ID`` или генерируется
+    и возвращается клиенту в том же заголовке. При ``server_timing=True``
+    число запросов к БД и их суммарное время отдаются в ``Server-Timing``;
+    для потоковых ответов учитываются запросы до отправки заголовков.
+    """
+
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = (
+            next(
+                (
+                    value.decode("latin-1")
+                    for name, value in scope["headers"]
+                    if name == REQUEST_ID_HEADER.encode()
+                ),
+                None,
+            )
+            or uuid4().hex
+        )
+        stats = RequestSqlStats()
+        request_id_token = request_id_var.set(request_id)
+        stats_token = sql_stats_var.set(stats)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER.encode(), request_id.encode()))
+                if self.server_timing:
+                    total_ms = (time.perf_counter() - started) * 1000
+                    headers.append(
+                        (
+                            b"server-timing",
+                            (
+                                f'db;dur={stats.seconds * 1000:.2f};desc="{stats.queries} queries", '
+                                f"app;dur={total_ms:.2f}"
+                            ).encode(),
+                        )
+                    )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(request_id_token)
+            sql_stats_var.reset(stats_token)
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.metrics import (
+    WRITE_COALESCER_BATCH_SIZE,
+    WRITE_COALESCER_QUEUE_WAIT_SECONDS,
+)
+from app.database.counting import ApplicationCountCache
+from app.database.repository import ApplicationRepository
+from app.models.applications.models import Application
+from app.schemas.applications.schemas import ApplicationCreate
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingInsert:
+    item: ApplicationCreate
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class CoalescerStats:
+    """
+    Счётчики работы ``ApplicationWriteCoalescer``.
+    """
+
+    batches_total: int = 0
+    items_total: int = 0
+    last_batch_size: int = 0
+    max_batch_size: int = 0
+    queue_wait_seconds_total: float = 0.0
+    queue_wait_seconds_max: float = 0.0
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.items_total / self.batches_total if self.batches_total else 0.0
+
+    @property
+    def avg_queue_wait_seconds(self) -> float:
+        return (
+            self.queue_wait_seconds_total / self.items_total
+            if self.items_total
+            else 0.0
+        )
+
+
+class ApplicationWriteCoalescer:
+    """
+    Объединяет одиночные вставки заявок, пришедшие почти одновременно,
+    в один многострочный ``INSERT ... RETURNING``.
+
+    Пачка закрывается через ``window`` секунд после первой заявки в ней
+    или по достижении ``max_batch_size``. Каждый ожидающий запрос получает
+    свою строку. Если пачка не сохранилась целиком, заявки повторяются
+    по одной, чтобы ошибка досталась только виновному запросу.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        window: float,
+        max_batch_size: int,
+        max_inflight: int,
+        outbox_topic: str | None = None,
+        count_cache: ApplicationCountCache | None = None,
+    ):
+        self.session_maker = session_maker
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.outbox_topic = outbox_topic
+        self.count_cache = count_cache
+        self.stats = CoalescerStats()
+        self._inflight = asyncio.Semaphore(max_inflight)
+        self._queue: asyncio.Queue[_PendingInsert] = asyncio.Queue()
+        self._flushes: set[asyncio.Task] = set()
+        self._collecting: list[_PendingInsert] = []
+        self._task: asyncio.Task | None = None
+
+    async def submit(self, item: ApplicationCreate) -> Application:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="write-coalescer")
+
+        pending = _PendingInsert(item, asyncio.get_running_loop().create_future())
+        self._queue.put_nowait(pending)
+        return await pending.future
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        batch, self._collecting = self._collecting, []
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        if batch:
+            await self._flush(batch)
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            self._collecting = batch = [await self._queue.get()]
+            deadline = batch[0].enqueued_at + self.window
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+
+            await self._inflight.acquire()
+            self._collecting = []
+            task = asyncio.create_task(self._flush_and_release(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush_and_release(self, batch: list[_PendingInsert]) -> None:
+        try:
+            await self._flush(batch)
+        finally:
+            self._inflight.release()
+
+    async def _flush(self, batch: list[_PendingInsert]) -> None:
+        batch = [pending for pending in batch if not pending.future.done()]
+        if not batch:
+            return
+
+        now = time.monotonic()
+        waits = [now - pending.enqueued_at for pending in batch]
+        self.stats.batches_total += 1
+        self.stats.items_total += len(batch)
+        self.stats.last_batch_size = len(batch)
+        self.stats.max_batch_size = max(self.stats.max_batch_size, len(batch))
+        self.stats.queue_wait_seconds_total += sum(waits)
+        self.stats.queue_wait_seconds_max = max(
+            self.stats.queue_wait_seconds_max, max(waits)
+        )
+        WRITE_COALESCER_BATCH_SIZE.observe(len(batch))
+        for wait in waits:
+            WRITE_COALESCER_QUEUE_WAIT_SECONDS.observe(wait)
+
+        try:
+            applications = await self._insert([pending.item for pending in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                _set_exception(batch[0].future, e)
+                return
+            logger.warning(
+                "ПАЧКА ИЗ %d ЗАЯВОК НЕ СОХРАНЕНА, ПОВТОР ПО ОДНОЙ: %s", len(batch), e
+            )
+            for pending in batch:
+                try:
+                    (application,) = await self._insert([pending.item])
+                except Exception as item_error:
+                    _set_exception(pending.future, item_error)
+                else:
+                    _set_result(pending.future, application)
+            return
+
+        for pending, application in zip(batch, applications, strict=True):
+            _set_result(pending.future, application)
+
+    async def _insert(self, items: list[ApplicationCreate]) -> list[Application]:
+        async with self.session_maker() as session:
+            repository = ApplicationRepository(session, self.count_cache)
+            return list(
+                await repository.create_applications(
+                    items, outbox_topic=self.outbox_topic
+                )
+            )
+
+
+def _set_result(future: asyncio.Future, value: Application) -> None:
+    if not future.done():
+        future.set_result(value)
+
+
+def _set_exception(future: asyncio.Future, error: Exception) -> None:
+    if not future.done():
+        future.set_exception(error)
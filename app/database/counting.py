@@ -0,0 +1,89 @@
+import time
+from collections import OrderedDict
+from typing import Literal, NamedTuple
+
+from app.schemas.applications.schemas import ApplicationFilter
+
+CountStrategy = Literal["exact", "cached", "estimate", "none"]
+
+UNFILTERED_KEY = ("", "")
+
+
+class TotalCount(NamedTuple):
+    """
+    Общее количество заявок, подходящих под фильтр.
+
+    ``value`` равен ``None``, если количество не вычислялось,
+    ``estimated`` — если значение приблизительное (кэш или оценка планировщика).
+    """
+
+    value: int | None
+    estimated: bool = False
+
+
+class ApplicationCountCache:
+    """
+    LRU-кэш результатов COUNT(*) по фильтру ``user_name`` с ограниченным
+    временем жизни и не более чем ``max_entries`` записями.
+
+    Живёт всё время работы приложения. ``record_insert`` вызывается
+    после каждой успешной вставки и стоит O(длины имени), а не O(записей):
+    общий счётчик увеличивается на единицу, записи ``exact`` и ``prefix``,
+    под которые попадает новая заявка, удаляются по ключу, а все записи
+    ``contains`` устаревают разом через смену поколения — перебирать
+    подстроки имени дороже, чем пересчитать такой фильтр.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], tuple[int, float, int]] = (
+            OrderedDict()
+        )
+        self._contains_generation = 0
+
+    @staticmethod
+    def _key(filters: ApplicationFilter) -> tuple[str, str]:
+        if not filters.user_name:
+            return UNFILTERED_KEY
+        return filters.user_name_match, filters.user_name
+
+    def get(self, filters: ApplicationFilter) -> int | None:
+        key = self._key(filters)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, generation = entry
+        stale = key[0] == "contains" and generation != self._contains_generation
+        if stale or expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, filters: ApplicationFilter, value: int) -> None:
+        key = self._key(filters)
+        self._entries[key] = (
+            value,
+            time.monotonic() + self.ttl,
+            self._contains_generation,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def record_insert(self, user_name: str) -> None:
+        total = self._entries.get(UNFILTERED_KEY)
+        if total is not None:
+            value, expires_at, generation = total
+            self._entries[UNFILTERED_KEY] = (value + 1, expires_at, generation)
+        self._entries.pop(("exact", user_name), None)
+        for end in range(1, len(user_name) + 1):
+            self._entries.pop(("prefix", user_name[:end]), None)
+        self._contains_generation += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
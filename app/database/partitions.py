@@ -0,0 +1,261 @@
+"""
+Обслуживание помесячных партиций таблицы ``applications``.
+
+Запуск одного прохода вручную::
+
+    python -m app.database.partitions
+"""
+
+import asyncio
+import logging
+import re
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Literal
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "applications"
+# Принимает заявки, для месяца которых ещё нет партиции.
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+ARCHIVE_SCHEMA = "archive"
+# Ключ pg_advisory_xact_lock: один проход обслуживания на всю базу.
+MAINTENANCE_LOCK_ID = 7_320_114
+
+RetentionAction = Literal["drop", "archive"]
+
+_PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month:%Y%m}"
+
+
+def parse_partition_name(name: str) -> date | None:
+    match = _PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return date(int(match[1]), int(match[2]), 1)
+
+
+def month_bounds(month: date) -> tuple[str, str]:
+    # Границы в UTC, чтобы не зависеть от TimeZone сессии.
+    return (
+        f"{month:%Y-%m-%d} 00:00:00+00",
+        f"{add_months(month, 1):%Y-%m-%d} 00:00:00+00",
+    )
+
+
+def create_partition_sql(month: date) -> str:
+    lower, upper = month_bounds(month)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+        f"PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    )
+
+
+def attach_month_sql(month: date) -> list[str]:
+    """
+    Создание партиции месяца, строки которого уже могли попасть в
+    ``applications_default``.
+
+    PostgreSQL не создаёт партицию, пока в DEFAULT-партиции есть строки
+    её диапазона, поэтому они переносятся во временную таблицу и после
+    создания партиции вставляются обратно.
+    """
+    lower, upper = month_bounds(month)
+    pending = f"{partition_name(month)}_pending"
+    return [
+        f"CREATE TEMP TABLE {pending} (LIKE {PARENT_TABLE}) ON COMMIT DROP",
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+        f"WHERE created_at >= '{lower}' AND created_at < '{upper}' RETURNING *) "
+        f"INSERT INTO {pending} SELECT * FROM moved",
+        create_partition_sql(month),
+        f"INSERT INTO {PARENT_TABLE} SELECT * FROM {pending}",
+    ]
+
+
+@dataclass
+class PartitionPlan:
+    create: list[date] = field(default_factory=list)
+    retire: list[date] = field(default_factory=list)
+
+
+def plan_partitions(
+    existing: list[date],
+    today: date,
+    premake_months: int,
+    retention_months: int | None,
+) -> PartitionPlan:
+    """
+    Решает, какие партиции создать и какие вывести из таблицы.
+
+    Создаются текущий месяц и ``premake_months`` следующих. Выводятся
+    месяцы, целиком старше ``retention_months`` полных месяцев до текущего.
+    """
+    current = month_start(today)
+    wanted = [add_months(current, offset) for offset in range(premake_months + 1)]
+    plan = PartitionPlan(create=[month for month in wanted if month not in existing])
+    if retention_months is not None:
+        oldest_kept = add_months(current, -retention_months)
+        plan.retire = sorted(month for month in existing if month < oldest_kept)
+    return plan
+
+
+class PartitionMaintenance:
+    """
+    Создаёт будущие партиции и выводит старые из ``applications``.
+
+    Заявки месяца без партиции (если обслуживание долго не запускалось)
+    сохраняются в ``applications_default`` и переносятся в партицию при
+    её создании.
+    Старые партиции отсоединяются и либо удаляются (``drop``), либо
+    переносятся в схему ``archive`` (``archive``), откуда их можно
+    выгрузить и удалить отдельно. Проход выполняется под
+    ``pg_advisory_xact_lock``, поэтому несколько экземпляров сервиса
+    не мешают друг другу. После вывода партиций вызывается ``on_retire``:
+    заявки исчезли из списков без записи через API.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        premake_months: int,
+        retention_months: int | None,
+        retention_action: RetentionAction,
+        interval: float,
+        on_retire: Callable[[], Awaitable[None]] | None = None,
+    ):
+        self.engine = engine
+        self.premake_months = premake_months
+        self.retention_months = retention_months
+        self.retention_action = retention_action
+        self.interval = interval
+        self.on_retire = on_retire
+        self._stopped = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopped.clear()
+            self._task = asyncio.create_task(self._run(), name="partition-maintenance")
+            logger.info("ЗАПУСК ОБСЛУЖИВАНИЯ ПАРТИЦИЙ...")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopped.set()
+        await self._task
+        self._task = None
+        logger.info("ОСТАНОВКА ОБСЛУЖИВАНИЯ ПАРТИЦИЙ...")
+
+    async def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("ОШИБКА ОБСЛУЖИВАНИЯ ПАРТИЦИЙ")
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=self.interval)
+            except TimeoutError:
+                pass
+
+    async def run_once(self, today: date | None = None) -> PartitionPlan:
+        today = today or datetime.now(timezone.utc).date()
+        async with self.engine.begin() as connection:
+            await connection.execute(
+                text("SELECT pg_advisory_xact_lock(:lock_id)"),
+                {"lock_id": MAINTENANCE_LOCK_ID},
+            )
+            plan = plan_partitions(
+                await self._existing_partitions(connection),
+                today,
+                self.premake_months,
+                self.retention_months,
+            )
+            for month in plan.create:
+                for statement in attach_month_sql(month):
+                    await connection.exec_driver_sql(statement)
+                logger.info("СОЗДАНА ПАРТИЦИЯ %s", partition_name(month))
+            for month in plan.retire:
+                await self._retire(connection, month)
+        if plan.retire and self.on_retire is not None:
+            await self.on_retire()
+        return plan
+
+    @staticmethod
+    async def _existing_partitions(connection: AsyncConnection) -> list[date]:
+        rows = await connection.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:table AS regclass)"
+            ),
+            {"table": PARENT_TABLE},
+        )
+        months = (parse_partition_name(name) for name in rows.scalars())
+        return sorted(month for month in months if month is not None)
+
+    async def _retire(self, connection: AsyncConnection, month: date) -> None:
+        name = partition_name(month)
+        await connection.exec_driver_sql(
+            f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"
+        )
+        if self.retention_action == "drop":
+            await connection.exec_driver_sql(f"DROP TABLE {name}")
+            logger.info("ПАРТИЦИЯ %s ОТСОЕДИНЕНА И УДАЛЕНА", name)
+        else:
+            await connection.exec_driver_sql(
+                f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"
+            )
+            await connection.exec_driver_sql(
+                f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"
+            )
+            logger.info(
+                "ПАРТИЦИЯ %s ОТСОЕДИНЕНА И ПЕРЕНЕСЕНА В %s", name, ARCHIVE_SCHEMA
+            )
+
+
+async def _main() -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    engine = create_async_engine(settings.async_database_url)
+    try:
+        plan = await PartitionMaintenance(
+            engine,
+            premake_months=settings.partition_premake_months,
+            retention_months=settings.partition_retention_months,
+            retention_action=settings.partition_retention_action,
+            interval=settings.partition_maintenance_interval,
+        ).run_once()
+        logger.info(
+            "ОБСЛУЖИВАНИЕ ПАРТИЦИЙ: СОЗДАНО %d, ВЫВЕДЕНО %d",
+            len(plan.create),
+            len(plan.retire),
+        )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+    )
+    asyncio.run(_main())
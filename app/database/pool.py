@@ -0,0 +1,100 @@
+import time
+from dataclasses import dataclass
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import Settings
+
+
+@dataclass
+class PoolStats:
+    """
+    Счётчики ожидания соединения из пула.
+
+    Время ожидания — это время внутри ``_do_get``: выдача свободного
+    соединения, открытие нового в пределах overflow или ожидание
+    освобождения, если пул исчерпан.
+    """
+
+    checkouts_total: int = 0
+    timeouts_total: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    @property
+    def avg_wait_seconds(self) -> float:
+        return (
+            self.wait_seconds_total / self.checkouts_total
+            if self.checkouts_total
+            else 0.0
+        )
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    ``AsyncAdaptedQueuePool``, замеряющий время получения соединения.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts_total += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.stats.checkouts_total += 1
+            self.stats.wait_seconds_total += waited
+            self.stats.wait_seconds_max = max(self.stats.wait_seconds_max, waited)
+
+    def snapshot(self) -> dict[str, int | float]:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts_total": self.stats.checkouts_total,
+            "timeouts_total": self.stats.timeouts_total,
+            "avg_wait_seconds": self.stats.avg_wait_seconds,
+            "max_wait_seconds": self.stats.wait_seconds_max,
+        }
+
+
+def engine_options(settings: Settings) -> dict[str, Any]:
+    """
+    Параметры ``create_async_engine`` для пула и кэша подготовленных выражений.
+
+    В режиме PgBouncer (pool_mode=transaction) подготовленные выражения
+    не переживают смену серверного соединения, поэтому оба кэша —
+    asyncpg и SQLAlchemy — отключаются, а имена выражений делаются уникальными.
+    """
+    if settings.db_pgbouncer_mode:
+        connect_args: dict[str, Any] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    else:
+        connect_args = {
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        }
+
+    return {
+        "poolclass": InstrumentedAsyncPool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": connect_args,
+    }
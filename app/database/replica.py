@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+LAST_WRITE_COOKIE = "applications_last_write"
+
+# Пока основная БД простаивает, время последней воспроизведённой транзакции
+# не меняется, поэтому реплика, воспроизведшая весь полученный WAL, считается
+# не отставшей.
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class ReplicaRouter:
+    """
+    Выбирает, откуда читать: с реплики или с основной БД.
+
+    Отставание реплики измеряется не чаще раза в ``check_interval`` секунд.
+    Реплика не используется, если отставание больше ``max_lag`` или его
+    не удалось измерить, а также если клиент записывал данные позже,
+    чем реплика успела догнать основную БД (read your writes).
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine | None,
+        max_lag: float,
+        check_interval: float,
+    ):
+        self.engine = engine
+        self.session_maker = (
+            async_sessionmaker(engine, expire_on_commit=False) if engine else None
+        )
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag_seconds: float | None = None
+        self.replica_reads_total = 0
+        self.primary_fallbacks_total = 0
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def measure_lag(self) -> float:
+        async with self.engine.connect() as connection:
+            return float((await connection.execute(REPLICA_LAG_QUERY)).scalar_one())
+
+    async def current_lag(self) -> float | None:
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return self.lag_seconds
+        async with self._lock:
+            if time.monotonic() - self._checked_at >= self.check_interval:
+                try:
+                    self.lag_seconds = await self.measure_lag()
+                except Exception as e:
+                    logger.warning("НЕ УДАЛОСЬ ИЗМЕРИТЬ ОТСТАВАНИЕ РЕПЛИКИ: %s", e)
+                    self.lag_seconds = None
+                self._checked_at = time.monotonic()
+        return self.lag_seconds
+
+    async def use_replica(self, last_write_at: float | None = None) -> bool:
+        """
+        Parameters
+        ----------
+        last_write_at : float | None
+            Unix-время последней записи клиента, если она известна.
+        """
+        if self.session_maker is None:
+            return False
+
+        lag = await self.current_lag()
+        usable = lag is not None and lag <= self.max_lag
+        if usable and last_write_at is not None:
+            usable = time.time() - last_write_at > lag
+        if usable:
+            self.replica_reads_total += 1
+        else:
+            self.primary_fallbacks_total += 1
+        return usable
+
+    async def close(self) -> None:
+        if self.engine is not None:
+            await self.engine.dispose()
+
+
+class ReadSession:
+    """
+    Сессия чтения запроса, выбираемая при первом запросе к БД.
+
+    Запросы без чтения (запись, ответ из кэша) не обращаются к
+    ``ReplicaRouter`` и не попадают в счётчики чтений с реплики.
+    """
+
+    def __init__(
+        self,
+        router: ReplicaRouter,
+        primary: AsyncSession,
+        last_write_at: float | None = None,
+    ):
+        self.router = router
+        self.primary = primary
+        self.last_write_at = last_write_at
+        self._session: AsyncSession | None = None
+        self._replica: AsyncSession | None = None
+
+    async def get(self) -> AsyncSession:
+        if self._session is None:
+            if await self.router.use_replica(self.last_write_at):
+                self._replica = self.router.session_maker()
+                self._session = self._replica
+            else:
+                self._session = self.primary
+        return self._session
+
+    async def execute(self, *args, **kwargs):
+        return await (await self.get()).execute(*args, **kwargs)
+
+    async def stream(self, *args, **kwargs):
+        return await (await self.get()).stream(*args, **kwargs)
+
+    async def close(self) -> None:
+        if self._replica is not None:
+            await self._replica.close()
+
+
+def parse_last_write(value: str | None) -> float | None:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
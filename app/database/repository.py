@@ -1,55 +1,336 @@
+import json
 import logging
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import NamedTuple
 
-from sqlalchemy import select, func
+from sqlalchemy import RowMapping, Select, insert, select, func, text, tuple_
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.applications.models import Application
-from app.schemas.applications.schemas import ApplicationFilter
+from app.core.pagination import decode_cursor, encode_cursor
+from app.database.counting import ApplicationCountCache, CountStrategy, TotalCount
+from app.database.replica import ReadSession
+from app.models.applications.models import Application, ApplicationOutbox
+from app.schemas.applications.schemas import (
+    ApplicationCreate,
+    ApplicationFilter,
+    KafkaApplicationMessage,
+)
 
 logger = logging.getLogger(__name__)
 
+# Колонки, нужные для ответа API: списки читаются как строки Core без ORM-сущностей.
+APPLICATION_COLUMNS = (
+    Application.id,
+    Application.user_name,
+    Application.description,
+    Application.created_at,
+)
+
+
+# Сколько последних id пересчитывается для версии списка: вставки, чьи
+# транзакции завершились не по порядку id, попадают в это окно.
+VERSION_RECENT_WINDOW = 10_000
+
+
+class ApplicationsVersion(NamedTuple):
+    """
+    Дешёвый валидатор содержимого таблицы заявок для ETag списков.
+
+    ``max_id`` и ``recent_count`` меняются при любой вставке, в том числе
+    если транзакция с меньшим id завершилась позже; ``oldest_created_at`` —
+    при удалении партиций по сроку хранения. ``last_modified`` — время
+    создания самой новой заявки.
+    """
+
+    max_id: int | None
+    recent_count: int
+    oldest_created_at: datetime | None
+    last_modified: datetime | None
+
+
+class ExplainJson(Executable, ClauseElement):
+    """
+    ``EXPLAIN (FORMAT JSON)`` для запроса Core с обычной привязкой параметров.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(ExplainJson)
+def _compile_explain_json(element: ExplainJson, compiler, **kw) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
 
 class ApplicationRepository:
-    def __init__(self, session: AsyncSession):
+    """
+    Запись идёт через ``session``; списки, подсчёт и выгрузка читаются
+    через ``read_session`` (сессию реплики), если она передана.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        count_cache: ApplicationCountCache | None = None,
+        read_session: AsyncSession | ReadSession | None = None,
+    ):
         self.session = session
+        self.count_cache = count_cache
+        self.read_session = read_session or session
 
-    async def get_applications(
-        self, filters: ApplicationFilter
-    ) -> tuple[Sequence[Application], int]:
+    @staticmethod
+    def _filter_conditions(filters: ApplicationFilter) -> list:
+        """
+        Строит условия фильтрации в форме, которую может обслужить индекс:
+
+        - ``exact`` — ``user_name = :name``, B-tree ``ix_applications_user_name``;
+        - ``prefix`` — ``user_name LIKE 'name%'``, B-tree ``ix_applications_user_name_pattern``;
+        - ``contains`` — ``user_name ILIKE '%name%'``, GIN ``ix_applications_user_name_trgm``.
+        """
         conditions = []
 
         if filters.user_name:
-            conditions.append(Application.user_name.ilike(f"%{filters.user_name}%"))
+            if filters.user_name_match == "exact":
+                conditions.append(Application.user_name == filters.user_name)
+            elif filters.user_name_match == "prefix":
+                pattern = f"{_escape_like(filters.user_name)}%"
+                conditions.append(Application.user_name.like(pattern, escape="\\"))
+            else:
+                pattern = f"%{_escape_like(filters.user_name)}%"
+                conditions.append(Application.user_name.ilike(pattern, escape="\\"))
 
-        count_query = select(func.count()).select_from(Application).filter(*conditions)
-        total = (await self.session.execute(count_query)).scalar()
+        if filters.created_from is not None:
+            conditions.append(Application.created_at >= filters.created_from)
+        if filters.created_to is not None:
+            conditions.append(Application.created_at < filters.created_to)
+
+        return conditions
+
+    async def get_applications(
+        self, filters: ApplicationFilter, count_strategy: CountStrategy = "exact"
+    ) -> tuple[Sequence[RowMapping], TotalCount]:
+        conditions = self._filter_conditions(filters)
 
         offset = (filters.page - 1) * filters.size
         query = (
-            select(Application)
+            select(*APPLICATION_COLUMNS)
             .filter(*conditions)
-            .order_by(Application.created_at.desc())
+            .order_by(Application.created_at.desc(), Application.id.desc())
             .offset(offset)
             .limit(filters.size)
         )
 
-        result = await self.session.execute(query)
-        applications = result.scalars().all()
+        result = await self.read_session.execute(query)
+        applications = result.mappings().all()
 
-        logger.info(f"ПОЛУЧЕНО {len(applications)} ЗАЯВОК (ВСЕГО: {total})")
+        # Неполная страница сама даёт точное количество — COUNT(*) не нужен.
+        if len(applications) < filters.size and (applications or offset == 0):
+            total = TotalCount(offset + len(applications))
+        else:
+            total = await self.count_applications(filters, count_strategy)
+
+        logger.info("ПОЛУЧЕНО %d ЗАЯВОК (ВСЕГО: %s)", len(applications), total.value)
 
         return applications, total
 
-    async def create_application(self, user_name: str, description: str) -> Application:
+    async def count_applications(
+        self, filters: ApplicationFilter, count_strategy: CountStrategy = "exact"
+    ) -> TotalCount:
+        """
+        Считает заявки под фильтр выбранной стратегией.
+
+        - ``exact`` — точный COUNT(*);
+        - ``cached`` — COUNT(*) из ``ApplicationCountCache``, при промахе точный подсчёт;
+        - ``estimate`` — оценка планировщика без сканирования таблицы;
+        - ``none`` — количество не вычисляется.
+        """
+        if count_strategy == "none":
+            return TotalCount(None)
+
+        conditions = self._filter_conditions(filters)
+
+        if count_strategy == "estimate":
+            estimate = await self._estimate_count(conditions)
+            if estimate is not None:
+                return TotalCount(estimate, estimated=True)
+
+        # Кэш ведётся только по фильтру user_name.
+        use_cache = (
+            count_strategy == "cached"
+            and self.count_cache is not None
+            and filters.created_from is None
+            and filters.created_to is None
+        )
+        if use_cache:
+            cached = self.count_cache.get(filters)
+            if cached is not None:
+                return TotalCount(cached, estimated=True)
+
+        count_query = select(func.count()).select_from(Application).filter(*conditions)
+        total = (await self.read_session.execute(count_query)).scalar()
+
+        if use_cache:
+            self.count_cache.set(filters, total)
+
+        return TotalCount(total)
+
+    async def _estimate_count(self, conditions: list) -> int | None:
+        if not conditions:
+            # У партиционированной таблицы статистика ведётся по партициям.
+            query = text(
+                "SELECT COALESCE("
+                "(SELECT sum(c.reltuples) FILTER (WHERE c.reltuples >= 0)::bigint"
+                " FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid"
+                " WHERE i.inhparent = CAST(:table AS regclass)),"
+                " (SELECT reltuples::bigint FROM pg_class"
+                " WHERE oid = CAST(:table AS regclass)))"
+            )
+            estimate = (
+                await self.read_session.execute(
+                    query, {"table": Application.__tablename__}
+                )
+            ).scalar()
+        else:
+            # Значение фильтра передаётся параметром, а не подставляется в текст SQL.
+            plan = (
+                await self.read_session.execute(
+                    ExplainJson(select(Application.id).filter(*conditions))
+                )
+            ).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = plan[0]["Plan"]["Plan Rows"]
+
+        # reltuples = -1, пока таблица ни разу не анализировалась.
+        if estimate is None or estimate < 0:
+            return None
+        return int(estimate)
+
+    async def get_applications_version(self) -> ApplicationsVersion:
+        """
+        Одним запросом читает ``ApplicationsVersion``: максимум id и минимум
+        ``created_at`` берутся по индексам, а подсчёт ограничен окном
+        последних ``VERSION_RECENT_WINDOW`` id.
+        """
+        latest_id = select(func.max(Application.id)).correlate(None).scalar_subquery()
+        oldest = (
+            select(func.min(Application.created_at)).correlate(None).scalar_subquery()
+        )
+        query = select(
+            func.max(Application.id),
+            func.count(),
+            oldest,
+            func.max(Application.created_at),
+        ).where(Application.id > latest_id - VERSION_RECENT_WINDOW)
+
+        row = (await self.read_session.execute(query)).one()
+        return ApplicationsVersion(*row)
+
+    async def get_application(self, application_id: int) -> RowMapping | None:
+        """
+        Ищет заявку по id. Ключ партиционирования неизвестен, поэтому
+        проверяется первичный ключ ``(id, created_at)`` каждой партиции.
+        """
+        query = select(*APPLICATION_COLUMNS).where(Application.id == application_id)
+        result = await self.read_session.execute(query)
+        return result.mappings().first()
+
+    async def get_applications_by_cursor(
+        self, filters: ApplicationFilter
+    ) -> tuple[Sequence[RowMapping], str | None]:
+        """
+        Keyset-пагинация: вместо OFFSET используется условие
+        ``(created_at, id) < (:created_at, :id)``, поэтому стоимость
+        запроса не зависит от глубины страницы.
+        """
+        conditions = self._filter_conditions(filters)
+
+        if filters.cursor:
+            created_at, application_id = decode_cursor(filters.cursor)
+            conditions.append(
+                tuple_(Application.created_at, Application.id)
+                < tuple_(created_at, application_id)
+            )
+            # Сравнение кортежей не отсекает партиции, а это условие — отсекает.
+            conditions.append(Application.created_at <= created_at)
+
+        query = (
+            select(*APPLICATION_COLUMNS)
+            .filter(*conditions)
+            .order_by(Application.created_at.desc(), Application.id.desc())
+            .limit(filters.size + 1)
+        )
+
+        result = await self.read_session.execute(query)
+        applications = result.mappings().all()
+
+        next_cursor = None
+        if len(applications) > filters.size:
+            applications = applications[: filters.size]
+            last = applications[-1]
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+
+        logger.info("ПОЛУЧЕНО %d ЗАЯВОК ПО КУРСОРУ", len(applications))
+
+        return applications, next_cursor
+
+    async def stream_applications(
+        self, filters: ApplicationFilter, chunk_size: int
+    ) -> AsyncIterator[Sequence[RowMapping]]:
+        """
+        Отдаёт все заявки под фильтр пачками по ``chunk_size`` строк.
+
+        Запрос читается серверным курсором (``session.stream`` + ``yield_per``),
+        поэтому в памяти одновременно находится не больше одной пачки.
+        Следующая пачка запрашивается, только когда потребитель забрал предыдущую.
+        """
+        query = (
+            select(*APPLICATION_COLUMNS)
+            .filter(*self._filter_conditions(filters))
+            .order_by(Application.created_at.desc(), Application.id.desc())
+            .execution_options(yield_per=chunk_size)
+        )
+
+        result = await self.read_session.stream(query)
+        async for partition in result.mappings().partitions():
+            yield partition
+
+    async def create_application(
+        self, user_name: str, description: str, outbox_topic: str | None = None
+    ) -> Application:
+        """
+        Сохраняет заявку. Если задан ``outbox_topic``, в той же транзакции
+        пишется событие в ``applications_outbox`` для последующей публикации в Kafka.
+        """
         try:
             async with self.session.begin():
                 application = Application(user_name=user_name, description=description)
                 self.session.add(application)
                 await self.session.flush()
                 await self.session.refresh(application)
-            logger.info(f"ЗАЯВКА СОЗДАНА С ID: {application.id}")
+                if outbox_topic is not None:
+                    self.session.add(
+                        ApplicationOutbox(
+                            topic=outbox_topic,
+                            payload=KafkaApplicationMessage.model_validate(
+                                application, from_attributes=True
+                            ).model_dump(mode="json"),
+                        )
+                    )
+            logger.info("ЗАЯВКА СОЗДАНА С ID: %d", application.id)
+            if self.count_cache is not None:
+                self.count_cache.record_insert(application.user_name)
             return application
 
         except SQLAlchemyError:
@@ -58,3 +339,50 @@ class ApplicationRepository:
         except Exception:
             logger.exception("НЕОЖИДАННАЯ ОШИБКА ПРИ СОЗДАНИИ ЗАЯВКИ")
             raise
+
+    async def create_applications(
+        self, items: Sequence[ApplicationCreate], outbox_topic: str | None = None
+    ) -> Sequence[Application]:
+        """
+        Сохраняет пачку заявок одним многострочным ``INSERT ... RETURNING``.
+
+        Заявки возвращаются в порядке ``items``. Если задан ``outbox_topic``,
+        события для Kafka пишутся в outbox той же транзакцией и тоже одной вставкой.
+        """
+        try:
+            async with self.session.begin():
+                result = await self.session.scalars(
+                    insert(Application).returning(
+                        Application, sort_by_parameter_order=True
+                    ),
+                    [
+                        {"user_name": item.user_name, "description": item.description}
+                        for item in items
+                    ],
+                )
+                applications = result.all()
+                if outbox_topic is not None:
+                    await self.session.execute(
+                        insert(ApplicationOutbox),
+                        [
+                            {
+                                "topic": outbox_topic,
+                                "payload": KafkaApplicationMessage.model_validate(
+                                    application, from_attributes=True
+                                ).model_dump(mode="json"),
+                            }
+                            for application in applications
+                        ],
+                    )
+            logger.info("СОЗДАНО %d ЗАЯВОК ОДНОЙ ПАЧКОЙ", len(applications))
+            if self.count_cache is not None:
+                for application in applications:
+                    self.count_cache.record_insert(application.user_name)
+            return applications
+
+        except SQLAlchemyError:
+            logger.exception("ОШИБКА БАЗЫ ДАННЫХ ПРИ ПАКЕТНОМ СОЗДАНИИ ЗАЯВОК")
+            raise
+        except Exception:
+            logger.exception("НЕОЖИДАННАЯ ОШИБКА ПРИ ПАКЕТНОМ СОЗДАНИИ ЗАЯВОК")
+            raise
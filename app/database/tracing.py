@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import random
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.request_context import request_id_var, sql_stats_var
+
+logger = logging.getLogger(__name__)
+
+
+class SqlTracer:
+    """
+    Трассировка SQL-выражений движка.
+
+    Каждое выражение учитывается в статистике текущего HTTP-запроса
+    (``Server-Timing``). Выражения дольше ``slow_threshold`` секунд
+    пишутся в лог вместе с параметрами и идентификатором запроса. Для доли
+    ``explain_sample_rate`` медленных ``SELECT`` план ``EXPLAIN (ANALYZE, BUFFERS)``
+    снимается в фоне на отдельном соединении, не задерживая ответ.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        slow_threshold: float,
+        explain_sample_rate: float = 0.0,
+        log_parameters: bool = True,
+    ):
+        self.engine = engine
+        self.slow_threshold = slow_threshold
+        self.explain_sample_rate = explain_sample_rate
+        self.log_parameters = log_parameters
+        self.slow_queries_total = 0
+        self._explains: set[asyncio.Task] = set()
+
+    def install(self) -> None:
+        sync_engine = self.engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(sync_engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault("trace_started_at", []).append(time.perf_counter())
+
+    def _handle_error(self, exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("trace_started_at"):
+            connection.info["trace_started_at"].pop()
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        elapsed = time.perf_counter() - conn.info["trace_started_at"].pop()
+
+        stats = sql_stats_var.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+        if elapsed < self.slow_threshold:
+            return
+
+        self.slow_queries_total += 1
+        shown_parameters = parameters if self.log_parameters else "<скрыты>"
+        logger.warning(
+            "МЕДЛЕННЫЙ ЗАПРОС %.1f мс (request_id=%s): %s ПАРАМЕТРЫ: %s",
+            elapsed * 1000,
+            request_id_var.get(),
+            statement,
+            shown_parameters,
+        )
+
+        if (
+            not executemany
+            and statement.lstrip()[:6].upper() == "SELECT"
+            and random.random() < self.explain_sample_rate
+        ):
+            task = asyncio.get_running_loop().create_task(
+                self.explain(statement, parameters, request_id_var.get())
+            )
+            self._explains.add(task)
+            task.add_done_callback(self._explains.discard)
+
+    async def explain(self, statement: str, parameters, request_id: str | None) -> str:
+        """
+        Выполняет ``EXPLAIN (ANALYZE, BUFFERS)`` для выражения и пишет план в лог.
+
+        Только для ``SELECT``: ``ANALYZE`` действительно выполняет выражение.
+        """
+        # Сам EXPLAIN не должен попадать в Server-Timing исходного запроса.
+        sql_stats_var.set(None)
+        try:
+            async with self.engine.connect() as connection:
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+                )
+                plan = "\n".join(row[0] for row in result)
+        except Exception as e:
+            logger.warning(
+                "НЕ УДАЛОСЬ ПОЛУЧИТЬ ПЛАН ЗАПРОСА (request_id=%s): %s", request_id, e
+            )
+            return ""
+        logger.warning("ПЛАН МЕДЛЕННОГО ЗАПРОСА (request_id=%s):\n%s", request_id, plan)
+        return plan
+
+    async def close(self) -> None:
+        if self._explains:
+            await asyncio.gather(*self._explains, return_exceptions=True)
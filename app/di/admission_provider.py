@@ -0,0 +1,10 @@
+from dishka import Provider, Scope, provide
+
+from app.core.admission import AdmissionController
+from app.core.config import Settings
+
+
+class AdmissionProvider(Provider):
+    @provide(scope=Scope.APP)
+    def provide_admission_controller(self, settings: Settings) -> AdmissionController:
+        return AdmissionController.from_settings(settings)
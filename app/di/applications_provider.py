@@ -1,12 +1,49 @@
+from collections.abc import AsyncIterable
+
 from dishka import Provider, Scope, provide
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
+    async_sessionmaker,
 )
 
+from app.core.config import Settings
+from app.database.coalescer import ApplicationWriteCoalescer
+from app.database.counting import ApplicationCountCache
+from app.database.replica import ReadSession
 from app.database.repository import ApplicationRepository
 
 
 class RepositoryProvider(Provider):
+    @provide(scope=Scope.APP)
+    def provide_count_cache(self, settings: Settings) -> ApplicationCountCache:
+        return ApplicationCountCache(
+            ttl=settings.applications_count_cache_ttl,
+            max_entries=settings.applications_count_cache_max_entries,
+        )
+
     @provide(scope=Scope.REQUEST)
-    def provide_application_repo(self, session: AsyncSession) -> ApplicationRepository:
-        return ApplicationRepository(session)
+    def provide_application_repo(
+        self,
+        session: AsyncSession,
+        read_session: ReadSession,
+        count_cache: ApplicationCountCache,
+    ) -> ApplicationRepository:
+        return ApplicationRepository(session, count_cache, read_session=read_session)
+
+    @provide(scope=Scope.APP)
+    async def provide_write_coalescer(
+        self,
+        settings: Settings,
+        session_maker: async_sessionmaker[AsyncSession],
+        count_cache: ApplicationCountCache,
+    ) -> AsyncIterable[ApplicationWriteCoalescer]:
+        coalescer = ApplicationWriteCoalescer(
+            session_maker,
+            window=settings.write_coalescing_window_ms / 1000,
+            max_batch_size=settings.write_coalescing_max_batch,
+            max_inflight=settings.write_coalescing_max_inflight,
+            outbox_topic=settings.kafka_topic,
+            count_cache=count_cache,
+        )
+        yield coalescer
+        await coalescer.stop()
@@ -0,0 +1,39 @@
+import logging
+from collections.abc import AsyncIterable
+
+from dishka import Provider, Scope, provide
+
+from app.core.cache import (
+    CacheBackend,
+    CacheStats,
+    InMemoryCacheBackend,
+    NullResponseCache,
+    RedisCacheBackend,
+    ResponseCache,
+)
+from app.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheProvider(Provider):
+    @provide(scope=Scope.APP)
+    async def provide_response_cache(
+        self, settings: Settings
+    ) -> AsyncIterable[ResponseCache]:
+        if settings.response_cache_backend == "none":
+            yield NullResponseCache()
+            return
+
+        stats = CacheStats()
+        backend: CacheBackend
+        if settings.response_cache_backend == "redis":
+            backend = RedisCacheBackend(settings.response_cache_redis_url)
+        else:
+            backend = InMemoryCacheBackend(
+                max_entries=settings.response_cache_max_entries, stats=stats
+            )
+        logger.info("КЭШ ОТВЕТОВ: %s", settings.response_cache_backend)
+
+        yield ResponseCache(backend, ttl=settings.response_cache_ttl, stats=stats)
+        await backend.close()
@@ -1,7 +1,16 @@
 import logging
 from collections.abc import AsyncIterable
 
-from dishka import Provider, Scope, provide, make_async_container
+from dishka import (
+    AsyncContainer,
+    Provider,
+    Scope,
+    from_context,
+    make_async_container,
+    provide,
+)
+from dishka.integrations.fastapi import FastapiProvider
+from fastapi import Request
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
@@ -9,28 +18,76 @@ from sqlalchemy.ext.asyncio import (
     AsyncSession,
 )
 
-from app.core.config import settings
+from app.core.cache import ResponseCache
+from app.core.config import Settings
+from app.core.metrics import instrument_engine
+from app.database.partitions import PartitionMaintenance
+from app.database.pool import engine_options
+from app.database.replica import (
+    LAST_WRITE_COOKIE,
+    ReadSession,
+    ReplicaRouter,
+    parse_last_write,
+)
+from app.database.tracing import SqlTracer
+from app.di.admission_provider import AdmissionProvider
 from app.di.applications_provider import RepositoryProvider
+from app.di.cache_provider import CacheProvider
 from app.di.kafka_provider import KafkaPublisherProvider
 
 logger = logging.getLogger(__name__)
 
 
+def install_tracer(engine: AsyncEngine, settings: Settings) -> SqlTracer | None:
+    if not settings.sql_trace_enabled:
+        return None
+    tracer = SqlTracer(
+        engine,
+        slow_threshold=settings.sql_slow_query_ms / 1000,
+        explain_sample_rate=settings.sql_explain_sample_rate,
+        log_parameters=settings.sql_trace_log_parameters,
+    )
+    tracer.install()
+    return tracer
+
+
+class SettingsProvider(Provider):
+    settings = from_context(provides=Settings, scope=Scope.APP)
+
+
 class DatabaseProvider(Provider):
     @provide(scope=Scope.APP)
-    def engine(self) -> AsyncEngine:
+    async def engine(self, settings: Settings) -> AsyncIterable[AsyncEngine]:
         engine = create_async_engine(
-            settings.async_database_url, echo=False, pool_pre_ping=True
+            settings.async_database_url, echo=False, **engine_options(settings)
         )
-        logger.info(f"СОЗДАН ДВИЖОК БАЗЫ ДАННЫХ: {engine}")
-        return engine
+        instrument_engine(engine.sync_engine)
+        tracer = install_tracer(engine, settings)
+        logger.info("СОЗДАН ДВИЖОК БАЗЫ ДАННЫХ: %s", engine)
+        yield engine
+        if tracer is not None:
+            await tracer.close()
+        await engine.dispose()
 
     @provide(scope=Scope.APP)
     def session_maker(self, engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
         session = async_sessionmaker(engine, expire_on_commit=False)
-        logger.info(f"СОЗДАНА СЕССИЯ: {session}")
+        logger.info("СОЗДАНА СЕССИЯ: %s", session)
         return session
 
+    @provide(scope=Scope.APP)
+    def partition_maintenance(
+        self, settings: Settings, engine: AsyncEngine, response_cache: ResponseCache
+    ) -> PartitionMaintenance:
+        return PartitionMaintenance(
+            engine,
+            premake_months=settings.partition_premake_months,
+            retention_months=settings.partition_retention_months,
+            retention_action=settings.partition_retention_action,
+            interval=settings.partition_maintenance_interval,
+            on_retire=response_cache.invalidate,
+        )
+
     @provide(scope=Scope.REQUEST)
     async def session(
         self, session_maker: async_sessionmaker[AsyncSession]
@@ -38,7 +95,53 @@ class DatabaseProvider(Provider):
         async with session_maker() as session:
             yield session
 
+    @provide(scope=Scope.APP)
+    async def replica_router(self, settings: Settings) -> AsyncIterable[ReplicaRouter]:
+        engine = None
+        tracer = None
+        if settings.async_replica_database_url is not None:
+            engine = create_async_engine(
+                settings.async_replica_database_url,
+                echo=False,
+                **engine_options(settings),
+            )
+            instrument_engine(engine.sync_engine)
+            tracer = install_tracer(engine, settings)
+            logger.info("СОЗДАН ДВИЖОК РЕПЛИКИ: %s", engine)
+        router = ReplicaRouter(
+            engine,
+            max_lag=settings.db_replica_max_lag_seconds,
+            check_interval=settings.db_replica_lag_check_interval,
+        )
+        yield router
+        if tracer is not None:
+            await tracer.close()
+        await router.close()
 
-container = make_async_container(
-    DatabaseProvider(), RepositoryProvider(), KafkaPublisherProvider()
-)
+    @provide(scope=Scope.REQUEST)
+    async def read_session(
+        self, request: Request, session: AsyncSession, router: ReplicaRouter
+    ) -> AsyncIterable[ReadSession]:
+        read_session = ReadSession(
+            router, session, parse_last_write(request.cookies.get(LAST_WRITE_COOKIE))
+        )
+        try:
+            yield read_session
+        finally:
+            await read_session.close()
+
+
+def create_container(settings: Settings) -> AsyncContainer:
+    """
+    Создаёт контейнер; движок БД, брокер и кэш создаются при первом запросе.
+    """
+    return make_async_container(
+        SettingsProvider(),
+        DatabaseProvider(),
+        RepositoryProvider(),
+        KafkaPublisherProvider(),
+        CacheProvider(),
+        AdmissionProvider(),
+        FastapiProvider(),
+        context={Settings: settings},
+    )
@@ -1,8 +1,12 @@
 import logging
+from collections.abc import AsyncIterable
 
 from dishka import Provider, provide, Scope
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.kafka.applications.fs_broker import broker
+from app.core.config import Settings
+from app.kafka.applications.connection import KafkaConnection
+from app.kafka.applications.outbox_relay import OutboxRelay
 from app.kafka.applications.publisher import KafkaPublisher
 
 logger = logging.getLogger(__name__)
@@ -10,6 +14,46 @@ logger = logging.getLogger(__name__)
 
 class KafkaPublisherProvider(Provider):
     @provide(scope=Scope.APP)
-    def provide_kafka_publisher(self) -> KafkaPublisher:
+    async def provide_kafka_connection(
+        self, settings: Settings
+    ) -> AsyncIterable[KafkaConnection]:
+        def broker_factory():
+            # faststream.kafka импортируется только при первом обращении к брокеру.
+            from app.kafka.applications.fs_broker import create_broker
+
+            return create_broker(settings)
+
+        async def probe():
+            from app.kafka.applications.fs_broker import probe_kafka
+
+            await probe_kafka(settings.kafka_bootstrap_servers)
+
+        connection = KafkaConnection(
+            broker_factory,
+            retry_initial=settings.kafka_connect_retry_initial,
+            retry_max=settings.kafka_connect_retry_max,
+            probe=probe,
+        )
+        yield connection
+        await connection.stop()
+
+    @provide(scope=Scope.APP)
+    def provide_kafka_publisher(self, connection: KafkaConnection) -> KafkaPublisher:
         logger.info("КАФКА ПУБЛИЩЕР ПРОВАЙДЕР")
-        return KafkaPublisher(broker)
+        return KafkaPublisher(connection.broker)
+
+    @provide(scope=Scope.APP)
+    def provide_outbox_relay(
+        self,
+        settings: Settings,
+        session_maker: async_sessionmaker[AsyncSession],
+        publisher: KafkaPublisher,
+    ) -> OutboxRelay:
+        return OutboxRelay(
+            session_maker,
+            publisher,
+            batch_size=settings.outbox_batch_size,
+            poll_interval=settings.outbox_poll_interval,
+            retention=settings.outbox_retention_seconds,
+            cleanup_interval=settings.outbox_cleanup_interval,
+        )
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from faststream.kafka import KafkaBroker
+
+logger = logging.getLogger(__name__)
+
+
+class KafkaConnection:
+    """
+    Брокер Kafka веб-приложения, подключаемый в фоне.
+
+    Брокер создаётся фабрикой при первом обращении к ``broker``, а
+    ``start()`` не ждёт подключения: оно повторяется с экспоненциальной
+    задержкой, пока Kafka не станет доступна. До этого ``ready`` ложно,
+    а события остаются в outbox.
+
+    ``probe`` вызывается перед каждым ``broker.start()``: пока Kafka
+    недоступна, попытки падают на проверке, а не на запуске брокера.
+    """
+
+    def __init__(
+        self,
+        broker_factory: Callable[[], "KafkaBroker"],
+        retry_initial: float = 0.5,
+        retry_max: float = 30.0,
+        probe: Callable[[], Awaitable[None]] | None = None,
+    ):
+        self.broker_factory = broker_factory
+        self.probe = probe
+        self.retry_initial = retry_initial
+        self.retry_max = retry_max
+        self.ready = False
+        self.last_error: str | None = None
+        self._broker: "KafkaBroker | None" = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def broker(self) -> "KafkaBroker":
+        if self._broker is None:
+            self._broker = self.broker_factory()
+        return self._broker
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._connect(), name="kafka-connect")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._broker is not None:
+            await self._broker.stop()
+            if self.ready:
+                logger.info("ВЫХОД FASTSTREAM KAFKA БРОКЕРА...")
+        self.ready = False
+
+    async def _connect(self) -> None:
+        delay = self.retry_initial
+        while True:
+            try:
+                if self.probe is not None:
+                    await self.probe()
+                await self.broker.start()
+            except Exception as e:
+                self.last_error = str(e) or e.__class__.__name__
+                logger.warning(
+                    "НЕ УДАЛОСЬ ПОДКЛЮЧИТЬСЯ К KAFKA: %s, ПОВТОР ЧЕРЕЗ %.1f С",
+                    self.last_error,
+                    delay,
+                )
+                await self.broker.stop()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.retry_max)
+                continue
+            self.ready = True
+            self.last_error = None
+            logger.info("ЗАПУСК FASTSTREAM KAFKA БРОКЕРА...")
+            return
@@ -1,5 +1,30 @@
+from aiokafka.admin import AIOKafkaAdminClient
 from faststream.kafka import KafkaBroker
 
-from app.core.config import settings
+from app.core.config import Settings
 
-broker = KafkaBroker(settings.kafka_bootstrap_servers)
+
+def create_broker(settings: Settings) -> KafkaBroker:
+    return KafkaBroker(
+        settings.kafka_bootstrap_servers,
+        acks=settings.kafka_producer_acks,
+        linger_ms=settings.kafka_linger_ms,
+        max_batch_size=settings.kafka_max_batch_size,
+        compression_type=settings.kafka_compression_type,
+    )
+
+
+async def probe_kafka(bootstrap_servers: str) -> None:
+    """
+    Проверяет доступность Kafka отдельным клиентом, который всегда закрывается.
+
+    Если ``broker.start()`` падает при запуске продюсера, FastStream не
+    сохраняет продюсер и ``broker.stop()`` его не закрывает; проверка перед
+    запуском брокера оставляет такой сбой только для случая, когда Kafka
+    пропала между проверкой и запуском.
+    """
+    admin = AIOKafkaAdminClient(bootstrap_servers=bootstrap_servers)
+    try:
+        await admin.start()
+    finally:
+        await admin.close()
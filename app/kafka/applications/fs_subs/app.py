@@ -1,17 +1,101 @@
-import logging
-
 from faststream import FastStream
+from faststream.asgi import AsgiResponse
 
-from app.kafka.applications.fs_broker import broker
-from app.kafka.applications.fs_subs.consumers import router as app_router
+from app.core.config import get_settings
+from app.core.email_utils import close_smtp_pool, init_smtp_pool
+from app.core.log_config import dropped_records, setup_logging, shutdown_logging
+from app.core.metrics import CONTENT_TYPE, registry
+from app.kafka.applications.fs_broker import create_broker
+from app.kafka.applications.fs_subs.consumers import (
+    ApplicationConsumer,
+    create_router,
+)
 
-app = FastStream(broker)
+settings = get_settings()
+broker = create_broker(settings)
 
-broker.include_router(app_router)
 
+async def publish_dead_letter(message: dict, error: str) -> None:
+    await broker.publish(
+        {"message": message, "error": error}, topic=settings.kafka_dead_letter_topic
+    )
 
-@app.after_startup
-async def configure_logging() -> None:
-    logging.basicConfig(
-        level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+consumer = ApplicationConsumer(
+    settings,
+    dead_letter=publish_dead_letter if settings.kafka_dead_letter_topic else None,
+)
+
+
+async def metrics(scope, receive, send) -> None:
+    response = AsgiResponse(
+        registry.render().encode(),
+        status_code=200,
+        headers={"content-type": CONTENT_TYPE},
     )
+    await response(scope, receive, send)
+
+
+registry.counter_callback(
+    "consumer_messages_total",
+    "Обработанные сообщения о заявках",
+    lambda: consumer.stats.messages_total,
+)
+registry.counter_callback(
+    "consumer_failed_total",
+    "Сообщения, по которым не удалось отправить письмо",
+    lambda: consumer.stats.failed_total,
+)
+registry.counter_callback(
+    "consumer_send_retries_total",
+    "Повторные попытки отправки писем после ошибок SMTP",
+    lambda: consumer.stats.retries_total,
+)
+registry.counter_callback(
+    "consumer_batches_total", "Обработанные пачки", lambda: consumer.stats.batches_total
+)
+registry.gauge_callback(
+    "consumer_last_batch_seconds",
+    "Длительность обработки последней пачки",
+    lambda: consumer.stats.last_batch_seconds,
+)
+registry.gauge_callback(
+    "consumer_message_age_seconds",
+    "Время от создания последней заявки до её обработки (не отставание смещений)",
+    lambda: consumer.stats.message_age_seconds,
+)
+registry.counter_callback(
+    "log_records_dropped_total",
+    "Записи лога, отброшенные при переполнении очереди",
+    dropped_records,
+)
+
+# Запуск: faststream run app.kafka.applications.fs_subs.app:app --host 0.0.0.0 --port 8081
+app = FastStream(broker).as_asgi(asgi_routes=[("/metrics", metrics)])
+
+broker.include_router(create_router(consumer))
+
+
+@app.on_startup
+async def configure_logging() -> None:
+    setup_logging(settings)
+
+
+@app.on_startup
+async def start_smtp_pool() -> None:
+    init_smtp_pool(settings)
+
+
+@app.on_shutdown
+async def flush_notification_digest() -> None:
+    await consumer.digest.flush_all()
+
+
+@app.after_shutdown
+async def stop_smtp_pool() -> None:
+    await close_smtp_pool()
+
+
+@app.after_shutdown
+async def stop_logging() -> None:
+    shutdown_logging()
@@ -1,40 +1,252 @@
+import asyncio
 import logging
+import time
+from dataclasses import dataclass, field
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from functools import partial
 
+import aiosmtplib
+from aiokafka import TopicPartition
+from faststream import AckPolicy
 from faststream.kafka import KafkaRouter
+from faststream.kafka.annotations import KafkaMessage
+from pydantic import ValidationError
 
-from app.core.config import settings
+from app.core.config import Settings
 from app.core.email_utils import send_email
+from app.kafka.applications.fs_subs.digest import NotificationDigest, SendEmail
+from app.kafka.applications.fs_subs.templates import render
+from app.schemas.applications.schemas import KafkaApplicationMessage
 
-router = KafkaRouter()
 logger = logging.getLogger(__name__)
 
+GROUP_ID = "new_application_subscribers"
 
-@router.subscriber(settings.kafka_topic, group_id="new_application_subscribers")
-async def handle_new_application(message: dict):
+# Ошибки SMTP и сети повторяются с задержкой; остальные — нет.
+RETRYABLE_ERRORS = (aiosmtplib.SMTPException, OSError)
+
+DeadLetter = Callable[[dict, str], Awaitable[None]]
+
+
+@dataclass
+class ConsumerStats:
+    """
+    Счётчики потребителя для подбора размера consumer group.
+
+    ``message_age_seconds`` — время от создания последней обработанной
+    заявки до окончания её обработки. Это не отставание смещений Kafka:
+    оно включает и время в outbox до публикации.
+    """
+
+    messages_total: int = 0
+    failed_total: int = 0
+    retries_total: int = 0
+    batches_total: int = 0
+    last_batch_size: int = 0
+    last_batch_seconds: float = 0.0
+    message_age_seconds: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def messages_per_second(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        return self.messages_total / elapsed if elapsed > 0 else 0.0
+
+
+class ApplicationConsumer:
+    """
+    Потребитель событий о новых заявках: отправляет письма по одной
+    или сводками и ведёт ``stats``.
+
+    ``send`` по умолчанию — ``send_email`` с настройками потребителя.
+    Ошибки SMTP повторяются до ``KAFKA_CONSUMER_SEND_ATTEMPTS`` раз с
+    удваивающейся задержкой. Некорректное сообщение или письмо, которое
+    так и не ушло, передаётся в ``dead_letter`` и считается обработанным,
+    чтобы не блокировать партицию; если ``dead_letter`` не задан, заявка
+    только записывается в лог.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        send: SendEmail | None = None,
+        dead_letter: DeadLetter | None = None,
+    ):
+        self.settings = settings
+        self.send = send or partial(send_email, settings=settings)
+        self.dead_letter = dead_letter
+        self.stats = ConsumerStats()
+        self._email_concurrency = asyncio.Semaphore(settings.kafka_consumer_concurrency)
+        self.digest = NotificationDigest(
+            send=self.send_with_retries,
+            window=settings.notification_digest_window_seconds,
+            max_items=settings.notification_digest_max_items,
+        )
+
+    async def send_with_retries(self, recipient: str, subject: str, body: str) -> None:
+        attempts = self.settings.kafka_consumer_send_attempts
+        delay = self.settings.kafka_consumer_retry_backoff
+        for attempt in range(1, attempts + 1):
+            try:
+                await self.send(recipient, subject, body)
+                return
+            except RETRYABLE_ERRORS as e:
+                if attempt == attempts:
+                    raise
+                self.stats.retries_total += 1
+                logger.warning(
+                    "ОШИБКА ОТПРАВКИ ПИСЬМА (ПОПЫТКА %d ИЗ %d): %s, ПОВТОР ЧЕРЕЗ %.1f С",
+                    attempt,
+                    attempts,
+                    e,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    async def process_application(self, message: dict) -> None:
+        try:
+            KafkaApplicationMessage.model_validate(message)
+        except ValidationError as e:
+            await self._reject(message, f"НЕКОРРЕКТНОЕ СООБЩЕНИЕ: {e}")
+            return
+
+        try:
+            if self.settings.notification_digest_enabled:
+                await self.digest.add(self.settings.notification_recipient, message)
+            else:
+                async with self._email_concurrency:
+                    await self.send_with_retries(
+                        self.settings.notification_recipient,
+                        render("application_subject", **message),
+                        render("application_body", **message),
+                    )
+            logger.info("Письмо отправлено для заявки %s", message["id"])
+        except Exception as e:
+            await self._reject(message, str(e) or e.__class__.__name__)
+        finally:
+            self.stats.messages_total += 1
+            self._record_age(message)
+
+    async def _reject(self, message: dict, error: str) -> None:
+        """
+        Ошибка публикации в ``dead_letter`` пробрасывается: тогда сообщение
+        не подтверждается и будет прочитано снова.
+        """
+        self.stats.failed_total += 1
+        logger.error(
+            "Не удалось отправить письмо для заявки %s: %s", message.get("id"), error
+        )
+        if self.dead_letter is not None:
+            await self.dead_letter(message, error)
+
+    def _record_age(self, message: dict) -> None:
+        try:
+            created_at = datetime.fromisoformat(message["created_at"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        self.stats.message_age_seconds = (
+            datetime.now(timezone.utc) - created_at
+        ).total_seconds()
+
+    async def handle_new_application(self, message: dict):
+        """
+        Обработчик события получения новой заявки из Kafka.
+
+        Parameters
+        ----------
+        message : dict
+            Словарь с данными новой заявки. Ожидаемая структура:
+            {
+                "id": int,               # уникальный идентификатор заявки
+                "user_name": str,        # имя пользователя, создавшего заявку
+                "description": str,      # описание заявки
+                "created_at": str        # дата и время создания заявки в ISO формате
+            }
+        """
+        logger.info("[📥 ПОЛУЧЕНО ИЗ KAFKA] НОВАЯ ЗАЯВКА ПОЛУЧЕНА: %s", message)
+        await self.process_application(message)
+
+    async def handle_new_applications(self, messages: list[dict]):
+        """
+        Пакетный обработчик новых заявок из Kafka.
+
+        Письма по заявкам пачки отправляются параллельно, не более
+        ``KAFKA_CONSUMER_CONCURRENCY`` одновременно. Смещения фиксируются
+        одним коммитом только после обработки всей пачки. В режиме сводки
+        пачка считается обработанной, когда отправлены все сводки с её заявками.
+
+        Заявки, письма по которым не удалось отправить, уходят в dead letter.
+        Если не удалось и это, пачка не подтверждается, и каждая её партиция
+        возвращается к первому смещению пачки (см. ``rewind_batch``); уже
+        отправленные письма при этом уйдут повторно.
+
+        Parameters
+        ----------
+        messages : list[dict]
+            Заявки в формате, описанном в ``handle_new_application``.
+        """
+        logger.info("[📥 ПОЛУЧЕНО ИЗ KAFKA] ПАЧКА ИЗ %d ЗАЯВОК", len(messages))
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(self.process_application(message) for message in messages),
+            return_exceptions=True,
+        )
+        self.stats.batches_total += 1
+        self.stats.last_batch_size = len(messages)
+        self.stats.last_batch_seconds = time.perf_counter() - started
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+
+def rewind_batch(message: KafkaMessage) -> None:
     """
-    Обработчик события получения новой заявки из Kafka.
-
-    Parameters
-    ----------
-    message : dict
-        Словарь с данными новой заявки. Ожидаемая структура:
-        {
-            "id": int,               # уникальный идентификатор заявки
-            "user_name": str,        # имя пользователя, создавшего заявку
-            "description": str,      # описание заявки
-            "created_at": str        # дата и время создания заявки в ISO формате
-        }
+    Возвращает каждую партицию пачки к её наименьшему смещению в пачке.
+
+    ``nack()`` FastStream сдвигает только партицию первой записи, и записи
+    остальных партиций пачки были бы пропущены.
     """
-    logger.info(f"[📥 ПОЛУЧЕНО ИЗ KAFKA] НОВАЯ ЗАЯВКА ПОЛУЧЕНА: {message}")
-
-    subject = f"Новая заявка #{message['id']}"
-    body = f"""
-      Пользователь: {message['user_name']}
-      Описание: {message['description']}
-      Дата создания: {message['created_at']}
-      """
-    try:
-        await send_email("recipient@example.com", subject, body)
-        logger.info(f"Письмо отправлено для заявки {message['id']}")
-    except Exception as e:
-        logger.error(f"Не удалось отправить письмо для заявки {message['id']}: {e}")
+    offsets: dict[TopicPartition, int] = {}
+    for record in message.raw_message:
+        partition = TopicPartition(record.topic, record.partition)
+        offsets[partition] = min(record.offset, offsets.get(partition, record.offset))
+    for partition, offset in offsets.items():
+        message.consumer.seek(partition, offset)
+
+
+def create_router(consumer: ApplicationConsumer) -> KafkaRouter:
+    settings = consumer.settings
+    router = KafkaRouter()
+    # Если сообщение не удалось ни обработать, ни передать в dead letter,
+    # смещение не фиксируется: nack возвращает потребителя к началу
+    # сообщения или пачки.
+    # Сводки требуют пакетного режима: смещение фиксируется только после
+    # отправки сводки, а одиночный обработчик ждал бы окно на каждом сообщении.
+    if settings.kafka_consumer_batch or settings.notification_digest_enabled:
+
+        async def handle_batch(messages: list[dict], message: KafkaMessage) -> None:
+            try:
+                await consumer.handle_new_applications(messages)
+            except Exception:
+                rewind_batch(message)
+                raise
+
+        router.subscriber(
+            settings.kafka_topic,
+            group_id=GROUP_ID,
+            batch=True,
+            max_records=settings.kafka_consumer_max_records,
+            batch_timeout_ms=settings.kafka_consumer_batch_timeout_ms,
+            ack_policy=AckPolicy.NACK_ON_ERROR,
+        )(handle_batch)
+    else:
+        router.subscriber(
+            settings.kafka_topic,
+            group_id=GROUP_ID,
+            ack_policy=AckPolicy.NACK_ON_ERROR,
+        )(consumer.handle_new_application)
+    return router
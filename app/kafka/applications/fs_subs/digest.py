@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from app.kafka.applications.fs_subs.templates import render
+
+logger = logging.getLogger(__name__)
+
+SendEmail = Callable[[str, str, str], Awaitable[None]]
+
+
+@dataclass
+class _DigestBuffer:
+    items: list[tuple[dict, asyncio.Future]] = field(default_factory=list)
+    timer: asyncio.TimerHandle | None = None
+
+
+class NotificationDigest:
+    """
+    Собирает заявки по получателю и отправляет одно сводное письмо.
+
+    Письмо уходит, когда в буфере набралось ``max_items`` заявок или
+    прошло ``window`` секунд с первой из них. ``add`` возвращает управление
+    только после отправки письма, в которое попала заявка, поэтому
+    обработчик Kafka не фиксирует смещение раньше времени.
+    """
+
+    def __init__(self, send: SendEmail, window: float, max_items: int):
+        self.send = send
+        self.window = window
+        self.max_items = max_items
+        self.digests_sent = 0
+        self._buffers: dict[str, _DigestBuffer] = {}
+        self._flushes: set[asyncio.Task] = set()
+
+    async def add(self, recipient: str, message: dict) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        buffer = self._buffers.setdefault(recipient, _DigestBuffer())
+        buffer.items.append((message, future))
+
+        if len(buffer.items) >= self.max_items:
+            self._schedule_flush(recipient)
+        elif buffer.timer is None:
+            buffer.timer = loop.call_later(self.window, self._schedule_flush, recipient)
+
+        await future
+
+    def _schedule_flush(self, recipient: str) -> None:
+        task = asyncio.create_task(self.flush(recipient))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def flush(self, recipient: str) -> None:
+        buffer = self._buffers.pop(recipient, None)
+        if buffer is None or not buffer.items:
+            return
+        if buffer.timer is not None:
+            buffer.timer.cancel()
+
+        messages = [message for message, _ in buffer.items]
+        items = "\n".join(render("digest_item", **message) for message in messages)
+        try:
+            await self.send(
+                recipient,
+                render("digest_subject", count=len(messages)),
+                render("digest_body", count=len(messages), items=items),
+            )
+        except Exception as e:
+            logger.error(
+                "НЕ УДАЛОСЬ ОТПРАВИТЬ СВОДКУ ИЗ %d ЗАЯВОК: %s", len(messages), e
+            )
+            for _, future in buffer.items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.digests_sent += 1
+        logger.info("СВОДКА ИЗ %d ЗАЯВОК ОТПРАВЛЕНА НА %s", len(messages), recipient)
+        for _, future in buffer.items:
+            if not future.done():
+                future.set_result(None)
+
+    async def flush_all(self) -> None:
+        for recipient in list(self._buffers):
+            await self.flush(recipient)
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
@@ -0,0 +1,29 @@
+from functools import lru_cache
+from string import Template
+
+_TEMPLATES = {
+    "application_subject": "Новая заявка #$id",
+    "application_body": """
+      Пользователь: $user_name
+      Описание: $description
+      Дата создания: $created_at
+      """,
+    "digest_subject": "Новые заявки: $count",
+    "digest_body": """
+      Поступило заявок: $count
+$items
+      """,
+    "digest_item": "      #$id — $user_name ($created_at): $description",
+}
+
+
+@lru_cache(maxsize=None)
+def get_template(name: str) -> Template:
+    """
+    Возвращает шаблон письма; каждый шаблон разбирается один раз за время жизни процесса.
+    """
+    return Template(_TEMPLATES[name])
+
+
+def render(name: str, **values) -> str:
+    return get_template(name).safe_substitute(values)
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.kafka.applications.publisher import KafkaPublisher
+from app.models.applications.models import ApplicationOutbox
+from app.schemas.applications.schemas import KafkaApplicationMessage
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """
+    Фоновая задача, переносящая события из ``applications_outbox`` в Kafka.
+
+    Строки выбираются пачками через ``FOR UPDATE SKIP LOCKED``, поэтому
+    несколько экземпляров сервиса могут работать одновременно. Строка
+    помечается отправленной только после успешной публикации, то есть
+    доставка выполняется как минимум один раз.
+
+    Раз в ``cleanup_interval`` секунд удаляются строки, отправленные
+    раньше чем ``retention`` секунд назад, не более ``CLEANUP_BATCH_SIZE``
+    за проход.
+    """
+
+    CLEANUP_BATCH_SIZE = 1000
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        publisher: KafkaPublisher,
+        batch_size: int,
+        poll_interval: float,
+        retention: float = 86400.0,
+        cleanup_interval: float = 300.0,
+    ):
+        self.session_maker = session_maker
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.cleanup_interval = cleanup_interval
+        self.lag_seconds = 0.0
+        self.published_total = 0
+        self.failed_total = 0
+        self.purged_total = 0
+        self._next_cleanup = 0.0
+        self._stopped = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopped.clear()
+            self._task = asyncio.create_task(self._run(), name="outbox-relay")
+            logger.info("ЗАПУСК OUTBOX РЕЛЕ...")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopped.set()
+        await self._task
+        self._task = None
+        logger.info("ОСТАНОВКА OUTBOX РЕЛЕ...")
+
+    async def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                published = await self.relay_batch()
+            except Exception:
+                logger.exception("ОШИБКА OUTBOX РЕЛЕ")
+                published = 0
+
+            if time.monotonic() >= self._next_cleanup:
+                try:
+                    purged = await self.purge_sent()
+                except Exception:
+                    logger.exception("ОШИБКА ОЧИСТКИ OUTBOX")
+                    purged = 0
+                # Если удалена полная пачка, очистка продолжится на следующем проходе.
+                if purged < self.CLEANUP_BATCH_SIZE:
+                    self._next_cleanup = time.monotonic() + self.cleanup_interval
+
+            if published < self.batch_size:
+                try:
+                    await asyncio.wait_for(
+                        self._stopped.wait(), timeout=self.poll_interval
+                    )
+                except TimeoutError:
+                    pass
+
+    async def relay_batch(self) -> int:
+        """
+        Публикует одну пачку неотправленных событий и возвращает число отправленных.
+
+        События одной темы отправляются одним вызовом ``publish_batch``.
+        Если пачка не подтверждена, строки остаются неотправленными и будут
+        выбраны снова; часть сообщений при этом может быть доставлена повторно.
+        """
+        async with self.session_maker() as session, session.begin():
+            query = (
+                select(ApplicationOutbox)
+                .where(ApplicationOutbox.sent_at.is_(None))
+                .order_by(ApplicationOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = (await session.execute(query)).scalars().all()
+            if not rows:
+                self.lag_seconds = 0.0
+                return 0
+
+            self.lag_seconds = (
+                datetime.now(timezone.utc) - rows[0].created_at
+            ).total_seconds()
+
+            rows_by_topic: dict[str, list[ApplicationOutbox]] = defaultdict(list)
+            for row in rows:
+                rows_by_topic[row.topic].append(row)
+
+            sent_ids = []
+            for topic, topic_rows in rows_by_topic.items():
+                try:
+                    await self.publisher.publish_batch(
+                        topic=topic,
+                        kafka_messages=[
+                            KafkaApplicationMessage.model_validate(row.payload)
+                            for row in topic_rows
+                        ],
+                    )
+                except Exception as e:
+                    for row in topic_rows:
+                        row.attempts += 1
+                        row.last_error = str(e)
+                    self.failed_total += len(topic_rows)
+                    logger.error(
+                        "НЕ УДАЛОСЬ ОТПРАВИТЬ %d СОБЫТИЙ OUTBOX В ТЕМУ '%s': %s",
+                        len(topic_rows),
+                        topic,
+                        e,
+                    )
+                    continue
+                sent_ids.extend(row.id for row in topic_rows)
+
+            if sent_ids:
+                await session.execute(
+                    update(ApplicationOutbox)
+                    .where(ApplicationOutbox.id.in_(sent_ids))
+                    .values(sent_at=func.now())
+                )
+                self.published_total += len(sent_ids)
+                logger.info(
+                    "OUTBOX: ОТПРАВЛЕНО %d СОБЫТИЙ (ЗАДЕРЖКА=%.3fс)",
+                    len(sent_ids),
+                    self.lag_seconds,
+                )
+
+            return len(sent_ids)
+
+    async def purge_sent(self) -> int:
+        """
+        Удаляет пачку отправленных строк старше ``retention`` и возвращает их число.
+        """
+        expired = (
+            select(ApplicationOutbox.id)
+            .where(
+                ApplicationOutbox.sent_at
+                < func.now() - timedelta(seconds=self.retention)
+            )
+            .order_by(ApplicationOutbox.id)
+            .limit(self.CLEANUP_BATCH_SIZE)
+        )
+        async with self.session_maker() as session, session.begin():
+            result = await session.execute(
+                delete(ApplicationOutbox).where(ApplicationOutbox.id.in_(expired))
+            )
+        purged = result.rowcount
+        if purged:
+            self.purged_total += purged
+            logger.info("OUTBOX: УДАЛЕНО %d ОТПРАВЛЕННЫХ СОБЫТИЙ", purged)
+        return purged
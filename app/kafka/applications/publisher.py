@@ -1,25 +1,95 @@
+import asyncio
 import logging
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
 
-from faststream.kafka import KafkaBroker
-
+from app.core.metrics import KAFKA_PUBLISH_ERRORS, KAFKA_PUBLISH_SECONDS
 from app.schemas.applications.schemas import KafkaApplicationMessage
 
+if TYPE_CHECKING:
+    from faststream.kafka import KafkaBroker
+    from faststream.kafka.publisher.usecase import DefaultPublisher
+
 
 class KafkaPublisher:
-    def __init__(self, broker: KafkaBroker):
+    """
+    Публикация событий о заявках в Kafka.
+
+    Объекты-публикаторы FastStream создаются один раз на тему и переиспользуются.
+    Сообщения отправляются с ключом ``user_name``, поэтому все заявки одного
+    пользователя попадают в одну партицию и читаются в порядке создания.
+    """
+
+    def __init__(self, broker: "KafkaBroker"):
         self.broker = broker
         self.logger = logging.getLogger(self.__class__.__name__)
+        self._publishers: dict[str, "DefaultPublisher"] = {}
+
+    def _get_publisher(self, topic: str) -> "DefaultPublisher":
+        publisher = self._publishers.get(topic)
+        if publisher is None:
+            publisher = self._publishers[topic] = self.broker.publisher(topic)
+        return publisher
 
     async def publish(self, topic: str, kafka_message: KafkaApplicationMessage):
-        # await self.broker.connect()
-        publisher = self.broker.publisher(topic)
+        publisher = self._get_publisher(topic)
+        try:
+            with KAFKA_PUBLISH_SECONDS.time(topic=topic, mode="single"):
+                await publisher.publish(
+                    kafka_message.model_dump(mode="json"),
+                    key=kafka_message.user_name.encode(),
+                )
+            self.logger.info(
+                "ОПУБЛИКОВАНО СООБЩЕНИЕ ID=%d В ТЕМУ KAFKA '%s'",
+                kafka_message.id,
+                topic,
+            )
+        except Exception as e:
+            KAFKA_PUBLISH_ERRORS.inc(topic=topic, mode="single")
+            self.logger.error(
+                "НЕ УДАЛОСЬ ОПУБЛИКОВАТЬ СООБЩЕНИЕ ID=%d В ТЕМУ '%s': %s",
+                kafka_message.id,
+                topic,
+                e,
+            )
+            raise
+
+    async def publish_batch(
+        self, topic: str, kafka_messages: Sequence[KafkaApplicationMessage]
+    ):
+        """
+        Публикует пачку сообщений, не дожидаясь подтверждения каждого по отдельности.
+
+        Все сообщения сначала передаются продюсеру, который собирает их в батчи
+        по ``linger_ms``/``max_batch_size``, затем ожидаются подтверждения.
+        Если хотя бы одно сообщение не подтверждено, выбрасывается исключение.
+        """
+        publisher = self._get_publisher(topic)
         try:
-            await publisher.publish(kafka_message.model_dump(mode="json"))
+            with KAFKA_PUBLISH_SECONDS.time(topic=topic, mode="batch"):
+                confirmations = [
+                    await publisher.publish(
+                        kafka_message.model_dump(mode="json"),
+                        key=kafka_message.user_name.encode(),
+                        no_confirm=True,
+                    )
+                    for kafka_message in kafka_messages
+                ]
+                # TestKafkaBroker доставляет сообщение сразу и возвращает None.
+                await asyncio.gather(
+                    *(confirmation for confirmation in confirmations if confirmation)
+                )
             self.logger.info(
-                f"ОПУБЛИКОВАНО СООБЩЕНИЕ ID={kafka_message.id} В ТЕМУ KAFKA '{topic}'"
+                "ОПУБЛИКОВАНО %d СООБЩЕНИЙ В ТЕМУ KAFKA '%s'",
+                len(kafka_messages),
+                topic,
             )
         except Exception as e:
+            KAFKA_PUBLISH_ERRORS.inc(topic=topic, mode="batch")
             self.logger.error(
-                f"НЕ УДАЛОСЬ ОПУБЛИКОВАТЬ СООБЩЕНИЕ ID={kafka_message.id} В ТЕМУ '{topic}': {e}"
+                "НЕ УДАЛОСЬ ОПУБЛИКОВАТЬ ПАЧКУ ИЗ %d СООБЩЕНИЙ В ТЕМУ '%s': %s",
+                len(kafka_messages),
+                topic,
+                e,
             )
             raise
@@ -1,54 +1,302 @@
 import logging
+import os
 from contextlib import asynccontextmanager
 
-from dishka.integrations.fastapi import setup_dishka
-from fastapi import FastAPI
+from dishka import AsyncContainer
+from dishka.integrations.fastapi import FromDishka, inject, setup_dishka
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 from app.api.applications import router as router_applications
-from app.di.container import container
-from app.kafka.applications.fs_broker import broker
-
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+from app.api.health import router as router_health
+from app.core.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    admission_rejected_handler,
+)
+from app.core.cache import ResponseCache
+from app.core.compression import CompressionMiddleware
+from app.core.config import Settings, get_settings
+from app.core.log_config import dropped_records, setup_logging, shutdown_logging
+from app.core.metrics import (
+    CONTENT_TYPE,
+    MetricsMiddleware,
+    MultiprocessMetrics,
+    registry,
 )
+from app.core.request_context import RequestContextMiddleware
+from app.database.coalescer import ApplicationWriteCoalescer
+from app.database.partitions import PartitionMaintenance
+from app.database.pool import InstrumentedAsyncPool
+from app.database.replica import ReplicaRouter
+from app.di.container import create_container
+from app.kafka.applications.connection import KafkaConnection
+from app.kafka.applications.outbox_relay import OutboxRelay
 
 logger = logging.getLogger(__name__)
+router_service = APIRouter()
+
+
+async def register_runtime_metrics(container: AsyncContainer) -> None:
+    """
+    Публикует в /metrics счётчики уже существующих объектов статистики.
+    """
+    kafka = await container.get(KafkaConnection)
+    admission = await container.get(AdmissionController)
+    engine = await container.get(AsyncEngine)
+    response_cache = await container.get(ResponseCache)
+    outbox_relay = await container.get(OutboxRelay)
+    write_coalescer = await container.get(ApplicationWriteCoalescer)
+    replica_router = await container.get(ReplicaRouter)
+
+    def pool_stat(name: str):
+        def read() -> float:
+            pool = engine.pool
+            if isinstance(pool, InstrumentedAsyncPool):
+                return pool.snapshot()[name]
+            return 0
+
+        return read
+
+    registry.gauge_callback(
+        "db_pool_checked_out", "Выданные соединения пула", pool_stat("checked_out")
+    )
+    registry.gauge_callback(
+        "db_pool_overflow", "Соединения сверх pool_size", pool_stat("overflow")
+    )
+    registry.counter_callback(
+        "db_pool_checkouts_total",
+        "Получения соединения из пула",
+        pool_stat("checkouts_total"),
+    )
+    registry.counter_callback(
+        "db_pool_timeouts_total",
+        "Тайм-ауты ожидания соединения",
+        pool_stat("timeouts_total"),
+    )
+    registry.gauge_callback(
+        "db_pool_max_wait_seconds",
+        "Максимальное ожидание соединения",
+        pool_stat("max_wait_seconds"),
+    )
+    registry.gauge_callback(
+        "db_replica_lag_seconds",
+        "Последнее измеренное отставание реплики",
+        lambda: replica_router.lag_seconds
+        if replica_router.lag_seconds is not None
+        else float("nan"),
+    )
+    registry.counter_callback(
+        "db_replica_reads_total",
+        "Чтения с реплики",
+        lambda: replica_router.replica_reads_total,
+    )
+    registry.counter_callback(
+        "db_replica_fallbacks_total",
+        "Чтения, перенаправленные в основную БД",
+        lambda: replica_router.primary_fallbacks_total,
+    )
+    registry.counter_callback(
+        "response_cache_hits_total",
+        "Попадания в кэш ответов",
+        lambda: response_cache.stats.hits,
+    )
+    registry.counter_callback(
+        "response_cache_misses_total",
+        "Промахи кэша ответов",
+        lambda: response_cache.stats.misses,
+    )
+    registry.gauge_callback(
+        "outbox_lag_seconds",
+        "Возраст старейшего неотправленного события",
+        lambda: outbox_relay.lag_seconds,
+    )
+    registry.counter_callback(
+        "outbox_published_total",
+        "События outbox, отправленные в Kafka",
+        lambda: outbox_relay.published_total,
+    )
+    registry.counter_callback(
+        "outbox_failed_total",
+        "Неудачные отправки событий outbox",
+        lambda: outbox_relay.failed_total,
+    )
+    registry.counter_callback(
+        "outbox_purged_total",
+        "Отправленные события outbox, удалённые по сроку хранения",
+        lambda: outbox_relay.purged_total,
+    )
+    registry.counter_callback(
+        "write_coalescer_batches_total",
+        "Пачки объединённых вставок",
+        lambda: write_coalescer.stats.batches_total,
+    )
+    registry.counter_callback(
+        "write_coalescer_items_total",
+        "Заявки в объединённых вставках",
+        lambda: write_coalescer.stats.items_total,
+    )
+    registry.gauge_callback(
+        "admission_in_flight",
+        "Запросы, обрабатываемые в бюджете допуска",
+        lambda: {
+            (name,): limiter.in_flight for name, limiter in admission.limiters.items()
+        },
+        ("budget",),
+    )
+    registry.gauge_callback(
+        "admission_queue_depth",
+        "Запросы, ожидающие в очереди бюджета допуска",
+        lambda: {
+            (name,): limiter.queue_depth for name, limiter in admission.limiters.items()
+        },
+        ("budget",),
+    )
+    registry.counter_callback(
+        "admission_admitted_total",
+        "Запросы, допущенные к обработке",
+        lambda: {
+            (name,): limiter.admitted_total
+            for name, limiter in admission.limiters.items()
+        },
+        ("budget",),
+    )
+    registry.gauge_callback(
+        "kafka_ready", "Подключение к Kafka установлено", lambda: float(kafka.ready)
+    )
+    registry.counter_callback(
+        "log_records_dropped_total",
+        "Записи лога, отброшенные при переполнении очереди",
+        dropped_records,
+    )
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    logger.info("ЗАПУСК ПРИЛОЖЕНИЯ...")
-    await broker.start()
-    logger.info("ЗАПУСК FASTSTREAM KAFKA БРОКЕРА...")
+    settings: Settings = app.state.settings
+    setup_logging(settings)
+    logger.info("ЗАПУСК ПРИЛОЖЕНИЯ (PID=%d)...", os.getpid())
+    container: AsyncContainer = app.state.dishka_container
+    # Подключение к Kafka идёт в фоне и не задерживает готовность приложения.
+    kafka = await container.get(KafkaConnection)
+    kafka.start()
+    outbox_relay = await container.get(OutboxRelay)
+    outbox_relay.start()
+    partition_maintenance = await container.get(PartitionMaintenance)
+    if settings.partition_maintenance_enabled:
+        partition_maintenance.start()
+    await register_runtime_metrics(container)
+    multiproc_metrics = None
+    if settings.metrics_multiproc_dir:
+        multiproc_metrics = MultiprocessMetrics(
+            registry, settings.metrics_multiproc_dir, settings.metrics_write_interval
+        )
+        multiproc_metrics.start()
+    app.state.multiproc_metrics = multiproc_metrics
     yield
-    await broker.stop()
-    logger.info("ВЫХОД FASTSTREAM KAFKA БРОКЕРА...")
-
-
-app = FastAPI(
-    title="СЕРВИС ОБРАБОТКИ ЗАЯВОК",
-    description="СЕРВИС ДЛЯ ОБРАБОТКИ ЗАПРОСОВ ПОЛЬЗОВАТЕЛЕЙ",
-    version="1.0.0",
-    lifespan=lifespan,
-    openapi_tags=[
-        {
-            "name": "Заявки",
-            "description": "Операции, связанные с заявками пользователей: создание, получение списка.",
-        }
-    ],
-)
+    if multiproc_metrics is not None:
+        await multiproc_metrics.stop()
+    await partition_maintenance.stop()
+    await outbox_relay.stop()
+    await container.close()
+    shutdown_logging()
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """
+    Собирает приложение; соединения с БД и Kafka создаются только в ``lifespan``.
+
+    Без ``settings`` настройки читаются из окружения через ``get_settings()``.
+    """
+    settings = settings or get_settings()
+    setup_logging(settings)
+    app = FastAPI(
+        title="СЕРВИС ОБРАБОТКИ ЗАЯВОК",
+        description="СЕРВИС ДЛЯ ОБРАБОТКИ ЗАПРОСОВ ПОЛЬЗОВАТЕЛЕЙ",
+        version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
+        openapi_tags=[
+            {
+                "name": "Заявки",
+                "description": "Операции, связанные с заявками пользователей: создание, получение списка.",
+            }
+        ],
+    )
+    app.state.settings = settings
 
-app.include_router(router=router_applications)
+    app.include_router(router=router_applications)
+    app.include_router(router=router_health)
+    app.include_router(router=router_service)
+    app.add_exception_handler(AdmissionRejected, admission_rejected_handler)
+    if settings.compression_enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_minimum_size,
+            gzip_level=settings.compression_gzip_level,
+            brotli_quality=settings.compression_brotli_quality,
+        )
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(
+        RequestContextMiddleware, server_timing=settings.sql_trace_enabled
+    )
 
-setup_dishka(container, app=app)
+    setup_dishka(create_container(settings), app=app)
+    return app
 
 
-@app.get("/")
+_app: FastAPI | None = None
+
+
+def __getattr__(name: str) -> FastAPI:
+    # ``app.main:app`` создаётся при первом обращении, а не при импорте модуля.
+    global _app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _app is None:
+        _app = create_app()
+    return _app
+
+
+@router_service.get("/")
 async def root():
     return {"message": "СЕРВИС ОБРАБОТКИ ЗАЯВОК"}
 
 
+@router_service.get("/cache/stats")
+@inject
+async def cache_stats(response_cache: FromDishka[ResponseCache]):
+    stats = response_cache.stats
+    return {
+        "hits": stats.hits,
+        "misses": stats.misses,
+        "evictions": stats.evictions,
+        "invalidations": stats.invalidations,
+        "hit_ratio": stats.hit_ratio,
+    }
+
+
+@router_service.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    # При нескольких worker отдаются метрики всех процессов, а не только
+    # ответившего на запрос.
+    multiproc_metrics = getattr(request.app.state, "multiproc_metrics", None)
+    if multiproc_metrics is not None:
+        return Response(content=multiproc_metrics.render(), media_type=CONTENT_TYPE)
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
+
+@router_service.get("/db/pool/stats")
+@inject
+async def db_pool_stats(engine: FromDishka[AsyncEngine]):
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedAsyncPool):
+        return {"pool": pool.status()}
+    return pool.snapshot()
+
+
 if __name__ == "__main__":
-    import uvicorn
+    from app.server import main
 
-    uvicorn.run("app.main:app", host="127.0.0.1", port=8000, reload=True)
+    main()
@@ -1,6 +1,7 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, func
+from sqlalchemy import DateTime, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -10,9 +11,72 @@ class Base(DeclarativeBase):
 
 class Application(Base):
     __tablename__ = "applications"
-    id: Mapped[int] = mapped_column(primary_key=True)
-    user_name: Mapped[str] = mapped_column(nullable=False, index=True)
+    __table_args__ = (
+        Index(
+            "ix_applications_user_name_trgm",
+            "user_name",
+            postgresql_using="gin",
+            postgresql_ops={"user_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_applications_user_name_pattern",
+            "user_name",
+            postgresql_ops={"user_name": "varchar_pattern_ops"},
+        ),
+        # Помесячные партиции обслуживает app.database.partitions;
+        # ключ партиционирования обязан входить в первичный ключ.
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_name: Mapped[str] = mapped_column(nullable=False)
     description: Mapped[str] = mapped_column(nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        primary_key=True,
+        nullable=False,
+    )
+
+
+# Индексы под сортировку списков: ORDER BY created_at DESC, id DESC
+# без фильтра и с фильтром user_name = :x читаются без узла Sort.
+Index(
+    "ix_applications_created_at_id",
+    Application.created_at.desc(),
+    Application.id.desc(),
+)
+Index(
+    "ix_applications_user_name_created_at_id",
+    Application.user_name,
+    Application.created_at.desc(),
+    Application.id.desc(),
+)
+
+
+class ApplicationOutbox(Base):
+    """
+    Исходящие события о заявках, ожидающие публикации в Kafka.
+
+    Строка пишется в той же транзакции, что и заявка, и отправляется
+    фоновым ``OutboxRelay``; после публикации заполняется ``sent_at``.
+    """
+
+    __tablename__ = "applications_outbox"
+    __table_args__ = (
+        Index(
+            "ix_applications_outbox_unsent",
+            "id",
+            postgresql_where=text("sent_at IS NULL"),
+        ),
+    )
+    id: Mapped[int] = mapped_column(primary_key=True)
+    topic: Mapped[str] = mapped_column(nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+    sent_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    attempts: Mapped[int] = mapped_column(server_default="0", nullable=False)
+    last_error: Mapped[str | None] = mapped_column(nullable=True)
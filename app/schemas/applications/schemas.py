@@ -1,6 +1,15 @@
 from datetime import datetime
+from typing import Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_serializer
+
+UserNameMatch = Literal["contains", "prefix", "exact"]
+
+DATETIME_FORMAT = "%d-%m-%Y %H:%M:%S"
+
+
+def format_datetime(value: datetime) -> str:
+    return value.strftime(DATETIME_FORMAT)
 
 
 class ApplicationCreate(BaseModel):
@@ -37,12 +46,11 @@ class ApplicationResponse(BaseModel):
         description="Дата и время создания заявки в формате ISO 8601, отображается как DD-MM-YYYY HH:MM:SS.",
     )
 
-    model_config = {
-        "from_attributes": True,
-        "json_encoders": {
-            datetime: lambda v: v.strftime("%d-%m-%Y %H:%M:%S"),
-        },
-    }
+    model_config = {"from_attributes": True}
+
+    @field_serializer("created_at", when_used="json")
+    def serialize_created_at(self, created_at: datetime) -> str:
+        return format_datetime(created_at)
 
 
 class ApplicationListResponse(BaseModel):
@@ -54,16 +62,60 @@ class ApplicationListResponse(BaseModel):
         ...,
         description="Список заявок, соответствующих запросу на текущей странице.",
     )
-    total: int = Field(..., description="Общее количество заявок в системе.")
-    page: int = Field(..., description="Номер текущей страницы (начинается с 1).")
+    total: int | None = Field(
+        ...,
+        description="Общее количество заявок в системе. Не вычисляется в режиме курсора "
+        "и при стратегии подсчёта `none`.",
+    )
+    page: int | None = Field(
+        ...,
+        description="Номер текущей страницы (начинается с 1). Не заполняется в режиме курсора.",
+    )
     size: int = Field(..., description="Количество заявок на одной странице.")
-    pages: int = Field(
-        ..., description="Общее количество страниц, доступных для просмотра."
+    pages: int | None = Field(
+        ...,
+        description="Общее количество страниц, доступных для просмотра. Не вычисляется, "
+        "если не вычисляется `total`.",
+    )
+    total_estimated: bool = Field(
+        False,
+        description="Признак того, что `total` и `pages` приблизительные "
+        "(взяты из кэша или из оценки планировщика).",
+    )
+    next_cursor: str | None = Field(
+        None,
+        description="Курсор следующей страницы. Отсутствует, если страница последняя.",
     )
 
     model_config = {"from_attributes": True}
 
 
+class ApplicationBulkItemResult(BaseModel):
+    """
+    Результат обработки одного элемента пакетной загрузки.
+    """
+
+    index: int = Field(..., description="Позиция элемента во входном списке (с 0).")
+    id: int | None = Field(
+        None, description="ID созданной заявки, если элемент сохранён."
+    )
+    error: str | None = Field(
+        None, description="Причина отказа, если элемент отклонён."
+    )
+
+
+class ApplicationBulkResponse(BaseModel):
+    """
+    Ответ на пакетную загрузку заявок.
+    """
+
+    created: int = Field(..., description="Количество сохранённых заявок.")
+    failed: int = Field(..., description="Количество отклонённых элементов.")
+    items: list[ApplicationBulkItemResult] = Field(
+        ..., description="Результаты по каждому элементу в порядке входного списка."
+    )
+
+
 class ApplicationFilter(BaseModel):
     """
     Параметры фильтрации и пагинации для запроса списка заявок.
@@ -74,6 +126,11 @@ class ApplicationFilter(BaseModel):
         description="Фильтр по имени пользователя (частичное совпадение). Необязательный параметр.",
         example="ivanov",
     )
+    user_name_match: UserNameMatch = Field(
+        "contains",
+        description="Способ сравнения `user_name`: `contains` — подстрока без учёта регистра, "
+        "`prefix` — начало имени, `exact` — точное совпадение.",
+    )
     page: int = Field(
         1,
         ge=1,
@@ -85,6 +142,17 @@ class ApplicationFilter(BaseModel):
         le=100,
         description="Количество элементов на странице. Максимум — 100.",
     )
+    created_from: datetime | None = Field(
+        None, description="Нижняя граница даты создания (включительно)."
+    )
+    created_to: datetime | None = Field(
+        None, description="Верхняя граница даты создания (не включительно)."
+    )
+    cursor: str | None = Field(
+        None,
+        description="Курсор, полученный в поле `next_cursor` предыдущего ответа. "
+        "Если задан, `page` игнорируется.",
+    )
 
 
 class KafkaApplicationMessage(BaseModel):
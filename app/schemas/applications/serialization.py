@@ -0,0 +1,50 @@
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import orjson
+
+from app.schemas.applications.schemas import format_datetime
+
+
+def dump_application_rows(rows: Sequence[Mapping[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Преобразует строки БД в элементы ``ApplicationResponse`` без валидации Pydantic.
+
+    Строки приходят из ``ApplicationRepository`` и уже соответствуют схеме,
+    поэтому проверка каждой строки моделью только тратит процессор.
+    """
+    return [
+        {
+            "id": row["id"],
+            "user_name": row["user_name"],
+            "description": row["description"],
+            "created_at": format_datetime(row["created_at"]),
+        }
+        for row in rows
+    ]
+
+
+def dump_application_list(
+    rows: Sequence[Mapping[str, Any]],
+    *,
+    total: int | None,
+    page: int | None,
+    size: int,
+    pages: int | None,
+    total_estimated: bool = False,
+    next_cursor: str | None = None,
+) -> bytes:
+    """
+    Сериализует ответ ``ApplicationListResponse`` сразу в JSON через orjson.
+    """
+    return orjson.dumps(
+        {
+            "items": dump_application_rows(rows),
+            "total": total,
+            "page": page,
+            "size": size,
+            "pages": pages,
+            "total_estimated": total_estimated,
+            "next_cursor": next_cursor,
+        }
+    )
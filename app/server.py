@@ -0,0 +1,164 @@
+"""
+Запуск веб-приложения в продакшене: несколько процессов uvicorn.
+
+Каждый worker — отдельный процесс, который сам импортирует приложение
+(uvicorn запускает их через ``spawn``), поэтому движок БД из
+``DatabaseProvider``, пул SMTP и подключение ``broker`` к Kafka создаются
+в ``lifespan`` каждого процесса и между процессами не разделяются.
+Пул соединений БД тоже свой у каждого worker, всего до
+``SERVER_WORKERS * (DB_POOL_SIZE + DB_MAX_OVERFLOW)`` соединений.
+
+Так же по процессам разделены ``ApplicationCountCache`` и бюджеты
+``AdmissionController``: лимиты ``ADMISSION_*`` действуют в каждом worker.
+Кэш ответов в памяти при нескольких worker отключается — сброс после
+записи виден только обработавшему её процессу; общий кэш даёт
+``RESPONSE_CACHE_BACKEND=redis``.
+
+Метрики тоже собираются в каждом процессе. Чтобы ``/metrics`` не отдавал
+значения случайного worker (и счётчики не скакали назад), при нескольких
+worker процессы записывают метрики в ``METRICS_MULTIPROC_DIR``, а ответ
+``/metrics`` их суммирует (см. ``MultiprocessMetrics``). Если каталог не
+задан, он создаётся во временной папке на время работы сервера.
+
+Запуск::
+
+    python -m app.server
+    python -m app.server --workers 4 --port 8000
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+import shutil
+import tempfile
+
+import uvicorn
+
+from app.core.config import Settings, get_settings
+from app.core.log_config import setup_logging, shutdown_logging
+
+logger = logging.getLogger(__name__)
+
+APP = "app.main:app"
+
+
+def default_workers() -> int:
+    # sched_getaffinity учитывает ограничение CPU через taskset/cpuset.
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def resolve_loop() -> str:
+    if importlib.util.find_spec("uvloop") is None:
+        logger.warning("UVLOOP НЕ УСТАНОВЛЕН, ИСПОЛЬЗУЕТСЯ ASYNCIO")
+        return "asyncio"
+    return "uvloop"
+
+
+def resolve_http() -> str:
+    if importlib.util.find_spec("httptools") is None:
+        logger.warning("HTTPTOOLS НЕ УСТАНОВЛЕН, ИСПОЛЬЗУЕТСЯ H11")
+        return "h11"
+    return "httptools"
+
+
+def disable_local_response_cache(settings: Settings, workers: int) -> None:
+    if workers > 1 and settings.response_cache_backend == "memory":
+        logger.warning(
+            "КЭШ ОТВЕТОВ В ПАМЯТИ НЕ ОБЩИЙ ДЛЯ %d WORKERS И ОТКЛЮЧЁН, "
+            "ДЛЯ КЭША НУЖЕН RESPONSE_CACHE_BACKEND=redis",
+            workers,
+        )
+        # Процессы-worker читают настройки из окружения заново.
+        os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+
+
+def prepare_metrics_dir(settings: Settings, workers: int) -> str | None:
+    """
+    Готовит каталог общих метрик и возвращает его, если сервер должен удалить
+    каталог после остановки.
+    """
+    if workers <= 1:
+        return None
+    directory = settings.metrics_multiproc_dir
+    if directory is None:
+        directory = tempfile.mkdtemp(prefix="metrics-")
+        os.environ["METRICS_MULTIPROC_DIR"] = directory
+        return directory
+    os.makedirs(directory, exist_ok=True)
+    # Счётчики прошлого запуска иначе прибавились бы к новым.
+    for name in os.listdir(directory):
+        if name.endswith((".prom", ".tmp")):
+            os.remove(os.path.join(directory, name))
+    return None
+
+
+def run(
+    app: str = APP,
+    host: str | None = None,
+    port: int | None = None,
+    workers: int | None = None,
+    factory: bool = False,
+    settings: Settings | None = None,
+) -> None:
+    """
+    Запускает uvicorn с ``workers`` процессами (по умолчанию — по числу CPU).
+
+    Приложение передаётся строкой импорта: объект приложения нельзя
+    создавать в родительском процессе, иначе его состояние попадёт
+    во все процессы.
+    """
+    settings = settings or get_settings()
+    setup_logging(settings)
+    workers = workers or settings.server_workers or default_workers()
+    host = host or settings.server_host
+    port = port or settings.server_port
+    disable_local_response_cache(settings, workers)
+    metrics_dir = prepare_metrics_dir(settings, workers)
+    logger.info(
+        "ЗАПУСК %s НА %s:%d, WORKERS=%d, СОЕДИНЕНИЙ С БД ДО %d",
+        app,
+        host,
+        port,
+        workers,
+        workers * (settings.db_pool_size + settings.db_max_overflow),
+    )
+    try:
+        uvicorn.run(
+            app,
+            host=host,
+            port=port,
+            workers=workers,
+            factory=factory,
+            loop=resolve_loop(),
+            http=resolve_http(),
+            backlog=settings.server_backlog,
+            timeout_keep_alive=settings.server_keep_alive_timeout,
+            timeout_graceful_shutdown=settings.server_graceful_shutdown_timeout,
+            # Логирование настраивает setup_logging в каждом процессе.
+            log_config=None,
+            access_log=settings.server_access_log,
+            proxy_headers=True,
+            forwarded_allow_ips=settings.server_forwarded_allow_ips,
+        )
+    finally:
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+        shutdown_logging()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--app", default=APP)
+    parser.add_argument("--factory", action="store_true")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+    run(args.app, args.host, args.port, args.workers, args.factory)
+
+
+if __name__ == "__main__":
+    main()
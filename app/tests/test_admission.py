@@ -0,0 +1,138 @@
+import asyncio
+import pickle
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import status
+from httpx import ASGITransport, AsyncClient
+
+from app.core.admission import AdmissionController, AdmissionLimiter, AdmissionRejected
+from app.core.metrics import ADMISSION_SHED
+from app.database.counting import TotalCount
+from app.main import app
+
+container = app.state.dishka_container
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_admitted_in_order():
+    limiter = AdmissionLimiter("test", max_concurrency=1, max_queue=2, queue_timeout=1)
+    first = await limiter.acquire()
+    admitted: list[int] = []
+
+    async def wait(index: int) -> None:
+        ticket = await limiter.acquire()
+        admitted.append(index)
+        ticket.release()
+
+    waiters = [asyncio.create_task(wait(index)) for index in range(2)]
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 2
+
+    first.release()
+    await asyncio.gather(*waiters)
+
+    assert admitted == [0, 1]
+    assert limiter.in_flight == 0
+    assert limiter.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_shed_immediately():
+    limiter = AdmissionLimiter(
+        "test_full", max_concurrency=1, max_queue=0, queue_timeout=1
+    )
+    ticket = await limiter.acquire()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await limiter.acquire()
+
+    assert rejected.value.reason == "queue_full"
+    assert rejected.value.retry_after >= 1
+    assert ADMISSION_SHED.value(budget="test_full", reason="queue_full") == 1
+    ticket.release()
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_waiter_is_shed_after_queue_timeout():
+    limiter = AdmissionLimiter(
+        "test", max_concurrency=1, max_queue=1, queue_timeout=0.01
+    )
+    ticket = await limiter.acquire()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await limiter.acquire()
+
+    assert rejected.value.reason == "timeout"
+    assert limiter.queue_depth == 0
+    ticket.release()
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_request_that_would_miss_deadline_is_shed_early():
+    limiter = AdmissionLimiter("test", max_concurrency=1, max_queue=10, queue_timeout=1)
+    limiter.service_seconds = 2.0
+    ticket = await limiter.acquire()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await limiter.acquire()
+
+    assert rejected.value.reason == "deadline"
+    assert rejected.value.retry_after == 2
+    ticket.release()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot():
+    limiter = AdmissionLimiter("test", max_concurrency=1, max_queue=1, queue_timeout=1)
+    ticket = await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    ticket.release()
+
+    assert limiter.in_flight == 0
+    assert limiter.queue_depth == 0
+    (await limiter.acquire()).release()
+
+
+@pytest.mark.asyncio
+async def test_filtered_list_uses_separate_budget():
+    admission = await container.get(AdmissionController)
+    filtered = admission.limiters["list_filtered"]
+    with (
+        patch.object(admission, "enabled", True),
+        patch.object(filtered, "in_flight", filtered.max_concurrency),
+        patch.object(filtered, "max_queue", 0),
+        patch(
+            "app.core.cache.ResponseCache.get",
+            new_callable=AsyncMock,
+            return_value=None,
+        ),
+        patch(
+            "app.database.repository.ApplicationRepository.get_applications",
+            new_callable=AsyncMock,
+            return_value=([], TotalCount(0)),
+        ),
+    ):
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as ac:
+            shed = await ac.get("/applications/?user_name=ivanov")
+            unfiltered = await ac.get("/applications/")
+
+    assert shed.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert int(shed.headers["retry-after"]) >= 1
+    assert unfiltered.status_code == status.HTTP_200_OK
+
+
+def test_admission_rejected_survives_pickle():
+    error = pickle.loads(pickle.dumps(AdmissionRejected("list", "timeout", 3)))
+
+    assert (error.budget, error.reason, error.retry_after) == ("list", "timeout", 3)
+    assert str(error) == "list: timeout"
@@ -1,12 +1,27 @@
-from datetime import datetime
+import asyncio
+import json
+from datetime import datetime, timezone
 from types import SimpleNamespace
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from fastapi import status
 from httpx import AsyncClient, ASGITransport
 
+from app.core.cache import InMemoryCacheBackend, ResponseCache
+from app.core.pagination import decode_cursor, encode_cursor
+from app.database.counting import ApplicationCountCache, TotalCount
+from app.kafka.applications.publisher import KafkaPublisher
 from app.main import app
+from app.schemas.applications.schemas import ApplicationFilter, KafkaApplicationMessage
+
+container = app.state.dishka_container
+
+
+@pytest.fixture(autouse=True)
+async def reset_response_cache():
+    response_cache = await container.get(ResponseCache)
+    await response_cache.invalidate()
 
 
 @pytest.mark.asyncio
@@ -25,7 +40,7 @@ async def test_get_applications_success():
         "app.database.repository.ApplicationRepository.get_applications",
         new_callable=AsyncMock,
     ) as mock_get:
-        mock_get.return_value = (mock_applications, total)
+        mock_get.return_value = (mock_applications, TotalCount(total))
 
         async with AsyncClient(
             transport=ASGITransport(app=app), base_url="http://test"
@@ -38,6 +53,7 @@ async def test_get_applications_success():
         assert data["page"] == 1
         assert data["size"] == 10
         assert data["items"][0]["user_name"] == "ivanov"
+        assert data["total_estimated"] is False
 
 
 @pytest.mark.asyncio
@@ -91,10 +107,15 @@ async def test_create_application_success():
         data = response.json()
         assert data["user_name"] == "petrov"
         assert data["description"] == "Нужен доступ к базе данных"
+        assert (
+            mock_create.await_args.kwargs["outbox_topic"]
+            == app.state.settings.kafka_topic
+        )
+        mock_publish.assert_not_awaited()
 
 
 @pytest.mark.asyncio
-async def test_create_application_kafka_failure():
+async def test_create_application_writes_outbox_instead_of_publishing():
     from types import SimpleNamespace
     from datetime import datetime
 
@@ -127,3 +148,242 @@ async def test_create_application_kafka_failure():
         data = response.json()
         assert data["user_name"] == "sidorov"
         assert data["description"] == "Тестовая заявка"
+        # Событие пишется в outbox той же транзакцией, что и заявка;
+        # в Kafka его отправляет реле, а не обработчик запроса.
+        assert (
+            mock_create.await_args.kwargs["outbox_topic"]
+            == app.state.settings.kafka_topic
+        )
+        mock_publish.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_applications_cursor_mode():
+    mock_applications = [
+        {
+            "id": 5,
+            "user_name": "ivanov",
+            "description": "Test description",
+            "created_at": datetime(2025, 11, 17, 10, 30, 0),
+        }
+    ]
+    next_cursor = encode_cursor(datetime(2025, 11, 17, 10, 30, 0), 5)
+
+    with patch(
+        "app.database.repository.ApplicationRepository.get_applications_by_cursor",
+        new_callable=AsyncMock,
+    ) as mock_get:
+        mock_get.return_value = (mock_applications, next_cursor)
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as ac:
+            response = await ac.get("/applications/?pagination=cursor&size=1")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["next_cursor"] == next_cursor
+        assert data["total"] is None
+        assert data["pages"] is None
+        assert data["items"][0]["id"] == 5
+
+
+@pytest.mark.asyncio
+async def test_get_applications_invalid_cursor():
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        response = await ac.get("/applications/?cursor=not-a-cursor")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "КУРСОР" in response.json()["detail"]
+
+
+def test_cursor_roundtrip():
+    created_at = datetime(2025, 11, 17, 10, 30, 0, 123456, tzinfo=timezone.utc)
+
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+def test_count_cache_record_insert():
+    cache = ApplicationCountCache(ttl=60)
+    unfiltered = ApplicationFilter()
+    contains = ApplicationFilter(user_name="iva")
+    exact = ApplicationFilter(user_name="iva", user_name_match="exact")
+    cache.set(unfiltered, 10)
+    cache.set(contains, 3)
+    cache.set(exact, 2)
+
+    cache.record_insert("Ivanov")
+
+    assert cache.get(unfiltered) == 11
+    assert cache.get(contains) is None
+    assert cache.get(exact) == 2
+
+
+@pytest.mark.asyncio
+async def test_create_applications_bulk_partial():
+    created = [
+        SimpleNamespace(id=10, user_name="petrov", description="Первая"),
+        SimpleNamespace(id=11, user_name="sidorov", description="Вторая"),
+    ]
+
+    with patch(
+        "app.database.repository.ApplicationRepository.create_applications",
+        new_callable=AsyncMock,
+    ) as mock_create:
+        mock_create.return_value = created
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as ac:
+            response = await ac.post(
+                "/applications/bulk",
+                content=(
+                    '{"user_name": "petrov", "description": "Первая"}\n'
+                    '{"user_name": "", "description": "Пустое имя"}\n'
+                    '{"user_name": "sidorov", "description": "Вторая"}\n'
+                ).encode(),
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["created"] == 2
+        assert data["failed"] == 1
+        assert [item["id"] for item in data["items"]] == [10, None, 11]
+        assert "user_name" in data["items"][1]["error"]
+        assert len(mock_create.await_args.args[0]) == 2
+
+
+@pytest.mark.asyncio
+async def test_kafka_publisher_caches_publishers_and_keys_by_user():
+    confirmation = asyncio.get_running_loop().create_future()
+    confirmation.set_result(None)
+    topic_publisher = SimpleNamespace(publish=AsyncMock(return_value=confirmation))
+    broker = SimpleNamespace(publisher=Mock(return_value=topic_publisher))
+    publisher = KafkaPublisher(broker)
+    messages = [
+        KafkaApplicationMessage(
+            id=i,
+            user_name="ivanov",
+            description="Тест",
+            created_at=datetime(2025, 11, 17, 12, 0, 0),
+        )
+        for i in range(3)
+    ]
+
+    await publisher.publish("applications", messages[0])
+    await publisher.publish_batch("applications", messages[1:])
+
+    broker.publisher.assert_called_once_with("applications")
+    assert topic_publisher.publish.await_count == 3
+    assert all(
+        call.kwargs["key"] == b"ivanov"
+        for call in topic_publisher.publish.await_args_list
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_applications_served_from_cache_until_create():
+    mock_applications = [
+        {
+            "id": 1,
+            "user_name": "ivanov",
+            "description": "Test description",
+            "created_at": datetime(2025, 11, 17, 10, 30, 0),
+        }
+    ]
+    new_app = SimpleNamespace(
+        id=2,
+        user_name="petrov",
+        description="Нужен доступ к базе данных",
+        created_at=datetime(2025, 11, 17, 12, 0, 0),
+    )
+
+    with patch(
+        "app.database.repository.ApplicationRepository.get_applications",
+        new_callable=AsyncMock,
+    ) as mock_get, patch(
+        "app.database.repository.ApplicationRepository.create_application",
+        new_callable=AsyncMock,
+    ) as mock_create:
+        mock_get.return_value = (mock_applications, TotalCount(1))
+        mock_create.return_value = new_app
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as ac:
+            first = await ac.get("/applications/?user_name=iva")
+            second = await ac.get("/applications/?user_name=iva")
+            await ac.post(
+                "/applications/",
+                json={"user_name": "petrov", "description": "Нужен доступ"},
+            )
+            third = await ac.get("/applications/?user_name=iva")
+
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.json() == first.json()
+        assert third.headers["X-Cache"] == "MISS"
+        assert mock_get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_backend_invalidates_across_instances():
+    backend = InMemoryCacheBackend(max_entries=1)
+    worker_a = ResponseCache(backend, ttl=60)
+    worker_b = ResponseCache(backend, ttl=60)
+
+    await worker_a.set("page-1", b"payload")
+    assert await worker_b.get("page-1") == b"payload"
+
+    await worker_b.invalidate()
+    assert await worker_a.get("page-1") is None
+
+    await worker_a.set("page-1", b"new")
+    await worker_a.set("page-2", b"other")
+    assert backend.stats.evictions == 2
+    assert worker_a.stats.misses == 1
+
+
+def fake_export_stream(*partitions):
+    async def stream_applications(self, filters, chunk_size):
+        for rows in partitions:
+            yield rows
+
+    return stream_applications
+
+
+@pytest.mark.asyncio
+async def test_export_applications_ndjson_and_csv():
+    rows = [
+        {
+            "id": i,
+            "user_name": "ivanov",
+            "description": f"Заявка {i}",
+            "created_at": datetime(2025, 11, 17, 10, 30, i),
+        }
+        for i in range(3)
+    ]
+
+    with patch(
+        "app.database.repository.ApplicationRepository.stream_applications",
+        new=fake_export_stream(rows[:2], rows[2:]),
+    ):
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as ac:
+            ndjson = await ac.get("/applications/export?user_name=iva")
+            csv_response = await ac.get("/applications/export?format=csv")
+
+    assert ndjson.status_code == status.HTTP_200_OK
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [line["id"] for line in lines] == [0, 1, 2]
+    assert lines[0]["created_at"] == "17-11-2025 10:30:00"
+
+    assert csv_response.headers["content-type"].startswith("text/csv")
+    csv_lines = csv_response.text.splitlines()
+    assert csv_lines[0] == "id,user_name,description,created_at"
+    assert len(csv_lines) == 4
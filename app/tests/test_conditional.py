@@ -0,0 +1,247 @@
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import status
+from httpx import ASGITransport, AsyncClient
+
+from app.core.cache import InMemoryCacheBackend, NullResponseCache, ResponseCache
+from app.core.compression import choose_encoding
+from app.core.conditional import etag_matches
+from app.database.counting import TotalCount
+from app.database.repository import ApplicationsVersion
+from app.main import app
+
+container = app.state.dishka_container
+
+CREATED_AT = datetime(2025, 11, 17, 10, 30, 0, tzinfo=timezone.utc)
+VERSION = ApplicationsVersion(42, 42, CREATED_AT, CREATED_AT)
+
+
+def make_rows(count: int, description: str = "Заявка") -> list[dict]:
+    return [
+        {
+            "id": i,
+            "user_name": "ivanov",
+            "description": f"{description} {i}",
+            "created_at": CREATED_AT,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+@pytest.fixture(autouse=True)
+async def reset_response_cache():
+    response_cache = await container.get(ResponseCache)
+    await response_cache.invalidate()
+
+
+@pytest.fixture
+def repository():
+    with (
+        patch(
+            "app.database.repository.ApplicationRepository.get_applications_version",
+            new_callable=AsyncMock,
+            return_value=VERSION,
+        ) as get_version,
+        patch(
+            "app.database.repository.ApplicationRepository.get_applications",
+            new_callable=AsyncMock,
+            return_value=(make_rows(1), TotalCount(1)),
+        ) as get_applications,
+        patch(
+            "app.database.repository.ApplicationRepository.get_application",
+            new_callable=AsyncMock,
+            return_value=make_rows(1)[0],
+        ) as get_application,
+    ):
+        yield get_version, get_applications, get_application
+
+
+async def get(path: str, **headers: str):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        return await client.get(path, headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_list_returns_304_without_reading_page(repository):
+    get_version, get_applications, _ = repository
+    first = await get("/applications/")
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    assert "last-modified" not in first.headers
+
+    with patch(
+        "app.core.cache.ResponseCache.get", new_callable=AsyncMock, return_value=None
+    ):
+        revalidated = await get("/applications/", **{"if-none-match": etag})
+
+    assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert get_applications.await_count == 1
+    # Валидатор — поколение кэша ответов, версия таблицы из БД не читается.
+    get_version.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_list_revalidated_from_cache_without_database(repository):
+    get_version, get_applications, _ = repository
+    etag = (await get("/applications/")).headers["etag"]
+
+    cached = await get("/applications/", **{"if-none-match": etag})
+
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.headers["x-cache"] == "HIT"
+    assert get_applications.await_count == 1
+    get_version.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_list_validator_falls_back_to_version_without_cache(repository):
+    get_version, _, _ = repository
+    with (
+        patch(
+            "app.core.cache.ResponseCache.generation",
+            new_callable=AsyncMock,
+            return_value=None,
+        ),
+        patch(
+            "app.core.cache.ResponseCache.get",
+            new_callable=AsyncMock,
+            return_value=None,
+        ),
+    ):
+        first = await get("/applications/?size=3")
+        again = await get(
+            "/applications/?size=3", **{"if-none-match": first.headers["etag"]}
+        )
+        since = await get(
+            "/applications/?size=3",
+            **{"if-modified-since": "Mon, 17 Nov 2025 10:30:00 GMT"},
+        )
+
+    assert "last-modified" not in first.headers
+    assert again.status_code == status.HTTP_304_NOT_MODIFIED
+    # Без ETag список не считается неизменным по одной дате.
+    assert since.status_code == status.HTTP_200_OK
+    assert get_version.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_list_etag_changes_with_generation_and_query(repository):
+    etag = (await get("/applications/")).headers["etag"]
+    other_query = (await get("/applications/?size=5")).headers["etag"]
+
+    await (await container.get(ResponseCache)).invalidate()
+    changed = await get("/applications/", **{"if-none-match": etag})
+
+    assert other_query != etag
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_generation_is_shared_through_backend():
+    backend = InMemoryCacheBackend(max_entries=10)
+    writer, reader = ResponseCache(backend, ttl=5), ResponseCache(backend, ttl=5)
+    before = await reader.generation()
+
+    await writer.invalidate()
+
+    assert await reader.generation() == before + 1
+    assert await NullResponseCache().generation() is None
+
+
+@pytest.mark.asyncio
+async def test_get_application_has_strong_etag(repository):
+    response = await get("/applications/1")
+    etag = response.headers["etag"]
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["created_at"] == "17-11-2025 10:30:00"
+    assert etag.startswith('"')
+
+    assert (
+        await get("/applications/1", **{"if-none-match": etag})
+    ).status_code == status.HTTP_304_NOT_MODIFIED
+    assert (
+        await get("/applications/1", **{"if-none-match": '"other"'})
+    ).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_get_application_not_found(repository):
+    _, _, get_application = repository
+    get_application.return_value = None
+
+    response = await get("/applications/7")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert (await get("/applications/0")).status_code == (
+        status.HTTP_422_UNPROCESSABLE_CONTENT
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "accept_encoding, encoding", [("gzip", "gzip"), ("gzip, br", "br")]
+)
+async def test_large_list_is_compressed(repository, accept_encoding, encoding):
+    _, get_applications, _ = repository
+    get_applications.return_value = (make_rows(50, "Длинное описание"), TotalCount(50))
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get(
+            "/applications/?size=50", headers={"accept-encoding": accept_encoding}
+        )
+        raw = await client.get(
+            "/applications/?size=50", headers={"accept-encoding": "identity"}
+        )
+
+    assert response.headers["content-encoding"] == encoding
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) < len(raw.content)
+    assert response.json() == raw.json()
+    assert "content-encoding" not in raw.headers
+
+
+@pytest.mark.asyncio
+async def test_compressed_strong_etag_gets_encoding_suffix(repository):
+    _, _, get_application = repository
+    get_application.return_value = make_rows(1, "x" * 2000)[0]
+
+    plain = await get("/applications/1", **{"accept-encoding": "identity"})
+    compressed = await get("/applications/1", **{"accept-encoding": "gzip"})
+    revalidated = await get(
+        "/applications/1",
+        **{"accept-encoding": "gzip", "if-none-match": compressed.headers["etag"]},
+    )
+
+    assert compressed.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+    assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.asyncio
+async def test_small_response_is_not_compressed(repository):
+    response = await get("/applications/1", **{"accept-encoding": "gzip, br"})
+
+    assert "content-encoding" not in response.headers
+
+
+def test_choose_encoding_respects_quality():
+    assert choose_encoding("gzip, br", ("br", "gzip")) == "br"
+    assert choose_encoding("br;q=0.5, gzip", ("br", "gzip")) == "gzip"
+    assert choose_encoding("br;q=0, *", ("br", "gzip")) == "gzip"
+    assert choose_encoding("identity", ("br", "gzip")) is None
+
+
+def test_etag_matches_is_weak_and_ignores_encoding():
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", "abc-br"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
@@ -0,0 +1,165 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, call
+
+import pytest
+from aiokafka import TopicPartition
+from faststream import AckPolicy
+
+from app.core.config import get_settings
+from app.kafka.applications.fs_subs.consumers import (
+    ApplicationConsumer,
+    create_router,
+    rewind_batch,
+)
+from app.kafka.applications.fs_subs.digest import NotificationDigest
+
+
+def make_message(application_id: int) -> dict:
+    return {
+        "id": application_id,
+        "user_name": "ivanov",
+        "description": "Тестовая заявка",
+        "created_at": "2025-11-17T12:00:00+00:00",
+    }
+
+
+@pytest.mark.asyncio
+async def test_failed_email_is_dead_lettered_and_batch_acked():
+    settings = get_settings().model_copy(
+        update={
+            "notification_digest_enabled": False,
+            "kafka_consumer_send_attempts": 1,
+        }
+    )
+    send = AsyncMock(side_effect=[None, Exception("SMTP error"), None])
+    dead_letter = AsyncMock()
+    consumer = ApplicationConsumer(settings, send=send, dead_letter=dead_letter)
+
+    await consumer.handle_new_applications([make_message(i) for i in range(3)])
+
+    assert send.await_count == 3
+    dead_letter.assert_awaited_once_with(make_message(1), "SMTP error")
+    assert consumer.stats.messages_total == 3
+    assert consumer.stats.failed_total == 1
+    assert consumer.stats.batches_total == 1
+    assert consumer.stats.last_batch_size == 3
+    assert consumer.stats.message_age_seconds > 0
+
+
+@pytest.mark.asyncio
+async def test_malformed_message_is_dead_lettered_without_sending():
+    settings = get_settings().model_copy(update={"notification_digest_enabled": False})
+    send = AsyncMock()
+    dead_letter = AsyncMock()
+    consumer = ApplicationConsumer(settings, send=send, dead_letter=dead_letter)
+    message = make_message(1)
+    del message["id"]
+
+    await consumer.handle_new_application(message)
+
+    send.assert_not_awaited()
+    dead_letter.assert_awaited_once()
+    assert consumer.stats.failed_total == 1
+
+
+@pytest.mark.asyncio
+async def test_smtp_errors_are_retried_with_backoff():
+    settings = get_settings().model_copy(
+        update={
+            "notification_digest_enabled": False,
+            "kafka_consumer_send_attempts": 3,
+            "kafka_consumer_retry_backoff": 0.01,
+        }
+    )
+    send = AsyncMock(side_effect=[ConnectionError("SMTP down"), TimeoutError(), None])
+    dead_letter = AsyncMock()
+    consumer = ApplicationConsumer(settings, send=send, dead_letter=dead_letter)
+
+    await consumer.handle_new_application(make_message(1))
+
+    assert send.await_count == 3
+    assert consumer.stats.retries_total == 2
+    dead_letter.assert_not_awaited()
+    assert consumer.stats.failed_total == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_dead_letter_fails_batch():
+    settings = get_settings().model_copy(
+        update={
+            "notification_digest_enabled": True,
+            "notification_digest_max_items": 2,
+            "kafka_consumer_send_attempts": 2,
+            "kafka_consumer_retry_backoff": 0.01,
+        }
+    )
+    send = AsyncMock(side_effect=ConnectionError("SMTP down"))
+    dead_letter = AsyncMock(side_effect=ConnectionError("Kafka down"))
+    consumer = ApplicationConsumer(settings, send=send, dead_letter=dead_letter)
+
+    with pytest.raises(ConnectionError, match="Kafka down"):
+        await consumer.handle_new_applications([make_message(i) for i in range(2)])
+
+    assert send.await_count == 2
+    assert consumer.stats.failed_total == 2
+
+
+@pytest.mark.parametrize("batch", [True, False])
+def test_subscriber_nacks_on_error(batch):
+    settings = get_settings().model_copy(
+        update={"kafka_consumer_batch": batch, "notification_digest_enabled": False}
+    )
+    router = create_router(ApplicationConsumer(settings, send=AsyncMock()))
+
+    (subscriber,) = router.subscribers
+    assert subscriber.ack_policy is AckPolicy.NACK_ON_ERROR
+
+
+def test_rewind_batch_seeks_every_partition_to_its_first_offset():
+    records = [
+        SimpleNamespace(topic="t", partition=partition, offset=offset)
+        for partition, offset in [(0, 10), (1, 5), (0, 11), (1, 6), (2, 7)]
+    ]
+    message = SimpleNamespace(raw_message=tuple(records), consumer=Mock())
+
+    rewind_batch(message)
+
+    assert message.consumer.seek.call_args_list == [
+        call(TopicPartition("t", 0), 10),
+        call(TopicPartition("t", 1), 5),
+        call(TopicPartition("t", 2), 7),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_digest_sends_one_email_per_threshold_and_window():
+    send = AsyncMock()
+    digest = NotificationDigest(send=send, window=0.05, max_items=3)
+
+    await asyncio.gather(
+        *(digest.add("ops@example.com", make_message(i)) for i in range(3))
+    )
+    await asyncio.gather(
+        *(digest.add("ops@example.com", make_message(i)) for i in range(3, 5))
+    )
+
+    assert send.await_count == 2
+    recipient, subject, body = send.await_args_list[0].args
+    assert recipient == "ops@example.com"
+    assert subject == "Новые заявки: 3"
+    assert "#2 — ivanov" in body
+    assert send.await_args_list[1].args[1] == "Новые заявки: 2"
+
+
+@pytest.mark.asyncio
+async def test_digest_flush_all_releases_pending_messages():
+    send = AsyncMock()
+    digest = NotificationDigest(send=send, window=60, max_items=100)
+
+    pending = asyncio.create_task(digest.add("ops@example.com", make_message(1)))
+    await asyncio.sleep(0)
+    await digest.flush_all()
+    await pending
+
+    send.assert_awaited_once()
@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from app.core.config import Settings
+from app.database.pool import InstrumentedAsyncPool, engine_options
+
+
+class FakeConnection:
+    def close(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def make_pool(**kwargs) -> InstrumentedAsyncPool:
+    return InstrumentedAsyncPool(FakeConnection, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_pool_records_checkouts_and_overflow():
+    pool = make_pool(pool_size=1, max_overflow=1, timeout=0.01)
+
+    first = await greenlet_spawn(pool.connect)
+    second = await greenlet_spawn(pool.connect)
+    snapshot = pool.snapshot()
+
+    assert snapshot["checked_out"] == 2
+    assert snapshot["overflow"] == 1
+    assert snapshot["checkouts_total"] == 2
+
+    with pytest.raises(exc.TimeoutError):
+        await greenlet_spawn(pool.connect)
+    assert pool.stats.timeouts_total == 1
+    assert pool.stats.wait_seconds_max >= 0.01
+
+    await greenlet_spawn(first.close)
+    await greenlet_spawn(second.close)
+    assert pool.snapshot()["checked_out"] == 0
+
+
+def test_engine_options_pgbouncer_mode_disables_statement_cache():
+    base = dict(
+        db_host="h",
+        db_port=5432,
+        db_user="u",
+        db_password="p",
+        db_name="d",
+        kafka_bootstrap_servers="k",
+        kafka_topic="t",
+    )
+
+    options = engine_options(Settings(**base, db_statement_cache_size=500))
+    assert options["connect_args"]["statement_cache_size"] == 500
+    assert options["poolclass"] is InstrumentedAsyncPool
+
+    options = engine_options(Settings(**base, db_pgbouncer_mode=True))
+    connect_args = options["connect_args"]
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
@@ -0,0 +1,77 @@
+from email.message import EmailMessage
+from unittest.mock import patch
+
+import aiosmtplib
+import pytest
+
+from app.core.email_utils import SMTPConnectionPool
+
+
+class FakeSMTP:
+    instances: list["FakeSMTP"] = []
+
+    def __init__(self, **kwargs):
+        self.is_connected = False
+        self.sent: list[EmailMessage] = []
+        FakeSMTP.instances.append(self)
+
+    async def connect(self):
+        self.is_connected = True
+
+    async def send_message(self, message):
+        if not self.is_connected:
+            raise aiosmtplib.SMTPServerDisconnected("connection lost")
+        self.sent.append(message)
+
+    async def noop(self):
+        if not self.is_connected:
+            raise aiosmtplib.SMTPServerDisconnected("connection lost")
+
+    async def quit(self):
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+def make_pool(**overrides) -> SMTPConnectionPool:
+    options = dict(
+        hostname="maildev",
+        port=1025,
+        size=2,
+        timeout=1,
+        idle_check_seconds=30,
+        max_messages_per_connection=100,
+    )
+    options.update(overrides)
+    return SMTPConnectionPool(**options)
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_connection_for_several_messages():
+    FakeSMTP.instances = []
+    pool = make_pool()
+
+    with patch("app.core.email_utils.aiosmtplib.SMTP", FakeSMTP):
+        for _ in range(3):
+            await pool.send(EmailMessage())
+        await pool.close()
+
+    assert len(FakeSMTP.instances) == 1
+    assert len(FakeSMTP.instances[0].sent) == 3
+    assert not FakeSMTP.instances[0].is_connected
+
+
+@pytest.mark.asyncio
+async def test_pool_reconnects_dropped_and_exhausted_connections():
+    FakeSMTP.instances = []
+    pool = make_pool(idle_check_seconds=0, max_messages_per_connection=2)
+
+    with patch("app.core.email_utils.aiosmtplib.SMTP", FakeSMTP):
+        await pool.send(EmailMessage())
+        FakeSMTP.instances[0].is_connected = False
+        await pool.send(EmailMessage())
+        await pool.send(EmailMessage())
+        await pool.send(EmailMessage())
+
+    assert [len(client.sent) for client in FakeSMTP.instances] == [1, 2, 1]
@@ -0,0 +1,135 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import status
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import Settings, get_settings
+from app.kafka.applications.connection import KafkaConnection
+from app.kafka.applications.fs_broker import probe_kafka
+from app.main import create_app
+
+
+class FlakyBroker:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.start_calls = 0
+        self.stop = AsyncMock()
+
+    async def start(self) -> None:
+        self.start_calls += 1
+        if self.start_calls <= self.failures:
+            raise ConnectionError("kafka недоступна")
+
+
+async def get(app, path: str):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        return await client.get(path)
+
+
+@pytest.mark.asyncio
+async def test_live_does_not_touch_dependencies():
+    app = create_app(get_settings())
+    with patch("app.api.health.check_database", new_callable=AsyncMock) as check:
+        response = await get(app, "/health/live")
+
+    assert response.status_code == status.HTTP_200_OK
+    check.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ready_reports_database_and_kafka_separately():
+    app = create_app(
+        get_settings().model_copy(update={"health_ready_requires_kafka": False})
+    )
+    with patch(
+        "app.api.health.check_database",
+        new_callable=AsyncMock,
+        return_value={"ready": True},
+    ):
+        response = await get(app, "/health/ready")
+
+    assert response.status_code == status.HTTP_200_OK
+    checks = response.json()["checks"]
+    assert checks["database"] == {"ready": True}
+    assert checks["kafka"]["ready"] is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "database, requires_kafka",
+    [({"ready": False, "error": "нет соединения"}, False), ({"ready": True}, True)],
+    ids=["database-down", "kafka-required"],
+)
+async def test_ready_returns_503_when_required_check_fails(database, requires_kafka):
+    app = create_app(
+        get_settings().model_copy(
+            update={"health_ready_requires_kafka": requires_kafka}
+        )
+    )
+    with patch(
+        "app.api.health.check_database", new_callable=AsyncMock, return_value=database
+    ):
+        response = await get(app, "/health/ready")
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()["status"] == "not_ready"
+
+
+@pytest.mark.asyncio
+async def test_create_app_passes_settings_to_container():
+    custom = get_settings().model_copy(update={"outbox_batch_size": 7})
+    app = create_app(custom)
+
+    assert await app.state.dishka_container.get(Settings) is custom
+
+
+@pytest.mark.asyncio
+async def test_kafka_connection_retries_in_background():
+    broker = FlakyBroker(failures=2)
+    connection = KafkaConnection(lambda: broker, retry_initial=0, retry_max=0)
+
+    connection.start()
+    assert connection.ready is False
+    await asyncio.wait_for(connection._task, timeout=1)
+
+    assert connection.ready is True
+    assert connection.last_error is None
+    assert broker.start_calls == 3
+
+    await connection.stop()
+    assert connection.ready is False
+    broker.stop.assert_awaited()
+
+
+@pytest.mark.asyncio
+async def test_broker_is_not_started_while_probe_fails():
+    broker = FlakyBroker(failures=0)
+    probe = AsyncMock(side_effect=[ConnectionError("kafka недоступна"), None])
+    connection = KafkaConnection(
+        lambda: broker, retry_initial=0, retry_max=0, probe=probe
+    )
+
+    connection.start()
+    await asyncio.wait_for(connection._task, timeout=1)
+
+    assert probe.await_count == 2
+    assert broker.start_calls == 1
+    assert connection.ready is True
+    await connection.stop()
+
+
+@pytest.mark.asyncio
+async def test_probe_closes_its_client_when_kafka_is_down():
+    with patch("app.kafka.applications.fs_broker.AIOKafkaAdminClient") as admin_class:
+        admin = admin_class.return_value
+        admin.start = AsyncMock(side_effect=ConnectionError("kafka недоступна"))
+        admin.close = AsyncMock()
+
+        with pytest.raises(ConnectionError):
+            await probe_kafka("localhost:9092")
+
+    admin.close.assert_awaited_once()
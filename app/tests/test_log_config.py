@@ -0,0 +1,93 @@
+import io
+import json
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from app.core import log_config
+from app.core.log_config import (
+    RateLimitFilter,
+    SamplingFilter,
+    setup_logging,
+    shutdown_logging,
+)
+from app.core.request_context import request_id_var
+
+
+def make_record(name: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, "ЗАЯВКА %d", (1,), None)
+
+
+@pytest.fixture
+def isolated_logging():
+    """
+    Снимает логирование, настроенное при импорте приложения, и возвращает его после теста.
+    """
+    root = logging.getLogger()
+    level = root.level
+    was_active = log_config._listener is not None
+    shutdown_logging()
+    yield
+    shutdown_logging()
+    root.setLevel(level)
+    if was_active:
+        setup_logging()
+
+
+def test_sampling_filter_applies_to_prefix_below_warning():
+    sampling = SamplingFilter({"app.api": 0.0})
+
+    assert not sampling.filter(make_record("app.api.applications"))
+    assert sampling.filter(make_record("app.api.applications", logging.WARNING))
+    assert sampling.filter(make_record("app.apiary"))
+    assert sampling.filter(make_record("app.database.repository"))
+
+
+def test_rate_limit_filter_refills_per_second():
+    limiter = RateLimitFilter({"app.database": 2})
+
+    with patch("app.core.log_config.time.monotonic", return_value=100.0):
+        allowed = [
+            limiter.filter(make_record("app.database.repository")) for _ in range(5)
+        ]
+    assert allowed == [True, True, False, False, False]
+    assert limiter.filter(make_record("app.database.repository", logging.ERROR))
+
+    with patch("app.core.log_config.time.monotonic", return_value=100.5):
+        assert limiter.filter(make_record("app.database.repository"))
+        assert not limiter.filter(make_record("app.database.repository"))
+
+
+def test_json_output_is_flushed_on_shutdown(isolated_logging):
+    stream = io.StringIO()
+    setup_logging(level="INFO", log_format="json", stream=stream)
+    token = request_id_var.set("req-1")
+    try:
+        logging.getLogger("app.tests.logging").info("СОЗДАНО %d ЗАЯВОК", 3)
+    finally:
+        request_id_var.reset(token)
+    shutdown_logging()
+
+    entry = json.loads(stream.getvalue().splitlines()[-1])
+    assert entry["message"] == "СОЗДАНО 3 ЗАЯВОК"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.tests.logging"
+    assert entry["request_id"] == "req-1"
+
+
+def test_full_queue_drops_records(isolated_logging):
+    stream = io.StringIO()
+    setup_logging(level="INFO", log_format="text", queue_size=1, stream=stream)
+    # Слушатель остановлен, поэтому очередь не разбирается.
+    log_config._listener.stop()
+    logger = logging.getLogger("app.tests.logging")
+    logger.info("первая")
+    logger.info("вторая")
+
+    assert log_config.dropped_records() == 1
+
+    log_config._listener.start()
+    shutdown_logging()
+    assert "первая" in stream.getvalue()
+    assert "вторая" not in stream.getvalue()
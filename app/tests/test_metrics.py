@@ -0,0 +1,111 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi import status
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.metrics import (
+    DB_STATEMENT_SECONDS,
+    HTTP_REQUEST_SECONDS,
+    MetricsRegistry,
+    MultiprocessMetrics,
+    instrument_engine,
+)
+from app.main import app
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram(
+        "test_seconds", "Тест", ("route",), buckets=(0.1, 1.0)
+    )
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5, route="/a")
+    registry.gauge_callback("test_gauge", "Тест", lambda: 3)
+
+    rendered = registry.render().splitlines()
+
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in rendered
+    assert 'test_seconds_bucket{route="/a",le="1.0"} 2' in rendered
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 3' in rendered
+    assert 'test_seconds_count{route="/a"} 3' in rendered
+    assert "test_gauge 3" in rendered
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_route_templates():
+    before = HTTP_REQUEST_SECONDS.count(method="GET", route="/", status="200")
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        await ac.get("/")
+        response = await ac.get("/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "http_request_duration_seconds_bucket" in response.text
+    assert (
+        HTTP_REQUEST_SECONDS.count(method="GET", route="/", status="200") == before + 1
+    )
+
+
+def test_engine_statements_are_timed():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    before = DB_STATEMENT_SECONDS.count(operation="SELECT")
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with pytest.raises(OperationalError, match="no such table"):
+            connection.execute(text("SELECT * FROM missing_table"))
+
+    assert DB_STATEMENT_SECONDS.count(operation="SELECT") == before + 1
+
+
+def test_labeled_callback_metric_renders_each_series():
+    metrics = MetricsRegistry()
+    metrics.gauge_callback(
+        "queue_depth",
+        "Глубина очереди",
+        lambda: {("list",): 3, ("write",): 0},
+        ("budget",),
+    )
+
+    assert metrics.render().splitlines()[2:] == [
+        'queue_depth{budget="list"} 3',
+        'queue_depth{budget="write"} 0',
+    ]
+
+
+def test_multiprocess_metrics_sum_counters_and_label_gauges(tmp_path):
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "Тест", ("route",))
+    histogram = registry.histogram("test_seconds", "Тест", buckets=(1.0,))
+    registry.gauge_callback("test_gauge", "Тест", lambda: 3)
+    counter.inc(2, route="/a")
+    histogram.observe(0.5)
+
+    # Файл уже завершившегося worker: его счётчики остаются в сумме, gauge — нет.
+    finished = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"],
+        capture_output=True,
+        text=True,
+    )
+    other = registry.render()
+    (tmp_path / f"{int(finished.stdout)}.prom").write_text(other)
+
+    counter.inc(1, route="/a")
+    rendered = MultiprocessMetrics(registry, str(tmp_path), 5).render().splitlines()
+
+    assert rendered.count("# TYPE test_total counter") == 1
+    assert 'test_total{route="/a"} 5' in rendered
+    assert 'test_seconds_bucket{le="1.0"} 2' in rendered
+    assert "test_seconds_count 2" in rendered
+    assert f'test_gauge{{pid="{os.getpid()}"}} 3' in rendered
+    assert len([line for line in rendered if line.startswith("test_gauge{")]) == 1
@@ -0,0 +1,121 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.kafka.applications.outbox_relay import OutboxRelay
+from app.models.applications.models import ApplicationOutbox
+
+CREATED_AT = datetime(2025, 11, 17, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def make_row(row_id: int, topic: str = "new_applications") -> ApplicationOutbox:
+    return ApplicationOutbox(
+        id=row_id,
+        topic=topic,
+        payload={
+            "id": row_id,
+            "user_name": "ivanov",
+            "description": "Заявка",
+            "created_at": CREATED_AT.isoformat(),
+        },
+        created_at=CREATED_AT,
+        attempts=0,
+    )
+
+
+class FakeSession:
+    def __init__(self, *results):
+        self.execute = AsyncMock(side_effect=results)
+
+    @asynccontextmanager
+    async def begin(self):
+        yield self
+
+
+def make_relay(session: FakeSession, publisher=None) -> OutboxRelay:
+    @asynccontextmanager
+    async def session_maker():
+        yield session
+
+    return OutboxRelay(
+        session_maker, publisher or AsyncMock(), batch_size=10, poll_interval=1.0
+    )
+
+
+def rows_result(rows: list[ApplicationOutbox]) -> Mock:
+    result = Mock()
+    result.scalars.return_value.all.return_value = rows
+    return result
+
+
+def compile_statement(session: FakeSession, call: int):
+    statement = session.execute.await_args_list[call].args[0]
+    return statement.compile(dialect=postgresql.dialect())
+
+
+@pytest.mark.asyncio
+async def test_batch_is_selected_with_skip_locked():
+    session = FakeSession(rows_result([]))
+
+    assert await make_relay(session).relay_batch() == 0
+
+    sql = str(compile_statement(session, 0))
+    assert "WHERE applications_outbox.sent_at IS NULL" in sql
+    assert "ORDER BY applications_outbox.id" in sql
+    assert sql.endswith("FOR UPDATE SKIP LOCKED")
+
+
+@pytest.mark.asyncio
+async def test_sent_at_is_set_after_successful_publish():
+    rows = [make_row(1), make_row(2)]
+    session = FakeSession(rows_result(rows), Mock())
+    publisher = AsyncMock()
+    relay = make_relay(session, publisher)
+
+    assert await relay.relay_batch() == 2
+
+    publisher.publish_batch.assert_awaited_once()
+    assert [
+        m.id for m in publisher.publish_batch.await_args.kwargs["kafka_messages"]
+    ] == [1, 2]
+    compiled = compile_statement(session, 1)
+    assert str(compiled).startswith("UPDATE applications_outbox SET sent_at=now()")
+    assert compiled.params["id_1"] == [1, 2]
+    assert relay.published_total == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_publish_records_attempt_and_keeps_row_unsent():
+    rows = [make_row(1), make_row(2, topic="other")]
+    session = FakeSession(rows_result(rows), Mock())
+    publisher = AsyncMock()
+    publisher.publish_batch.side_effect = [ConnectionError("kafka недоступна"), None]
+    relay = make_relay(session, publisher)
+
+    assert await relay.relay_batch() == 1
+
+    assert rows[0].attempts == 1
+    assert rows[0].last_error == "kafka недоступна"
+    assert rows[1].attempts == 0
+    assert compile_statement(session, 1).params["id_1"] == [2]
+    assert relay.failed_total == 1
+
+
+@pytest.mark.asyncio
+async def test_purge_deletes_sent_rows_older_than_retention():
+    session = FakeSession(Mock(rowcount=3))
+    relay = make_relay(session)
+
+    assert await relay.purge_sent() == 3
+
+    compiled = compile_statement(session, 0)
+    sql = str(compiled)
+    assert sql.startswith(
+        "DELETE FROM applications_outbox WHERE applications_outbox.id IN"
+    )
+    assert "applications_outbox.sent_at < now() - %(now_1)s" in sql
+    assert compiled.params["now_1"].total_seconds() == relay.retention
+    assert relay.purged_total == 3
@@ -0,0 +1,55 @@
+from datetime import date
+
+from app.database.partitions import (
+    add_months,
+    attach_month_sql,
+    create_partition_sql,
+    parse_partition_name,
+    partition_name,
+    plan_partitions,
+)
+
+
+def test_month_arithmetic_and_names():
+    assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert partition_name(date(2026, 2, 1)) == "applications_p202602"
+    assert parse_partition_name("applications_p202602") == date(2026, 2, 1)
+    assert parse_partition_name("applications_default") is None
+    assert create_partition_sql(date(2025, 12, 1)).endswith(
+        "FOR VALUES FROM ('2025-12-01 00:00:00+00') TO ('2026-01-01 00:00:00+00')"
+    )
+
+
+def test_new_partition_takes_its_rows_from_default_partition():
+    statements = attach_month_sql(date(2025, 12, 1))
+
+    assert statements[0].startswith("CREATE TEMP TABLE applications_p202512_pending")
+    assert "DELETE FROM applications_default" in statements[1]
+    assert "created_at < '2026-01-01 00:00:00+00'" in statements[1]
+    assert statements[2] == create_partition_sql(date(2025, 12, 1))
+    assert statements[3] == (
+        "INSERT INTO applications SELECT * FROM applications_p202512_pending"
+    )
+
+
+def test_plan_creates_missing_future_partitions():
+    existing = [date(2025, 10, 1), date(2025, 11, 1)]
+
+    plan = plan_partitions(
+        existing, date(2025, 11, 20), premake_months=2, retention_months=None
+    )
+
+    assert plan.create == [date(2025, 12, 1), date(2026, 1, 1)]
+    assert plan.retire == []
+
+
+def test_plan_retires_months_older_than_retention():
+    existing = [date(2025, month, 1) for month in range(1, 12)]
+
+    plan = plan_partitions(
+        existing, date(2025, 11, 20), premake_months=0, retention_months=3
+    )
+
+    assert plan.create == []
+    assert plan.retire == [date(2025, month, 1) for month in range(1, 8)]
@@ -0,0 +1,165 @@
+"""
+Регрессионные тесты планов запросов списка заявок.
+
+Запросы репозитория выполняются на реальном Postgres в отдельной схеме
+с ``PLAN_TEST_ROWS`` строками, перехватываются и проверяются через
+``EXPLAIN``: сортировка должна идти по индексу, без узла Sort.
+Без доступного Postgres тесты пропускаются.
+"""
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import get_settings
+from app.core.pagination import encode_cursor
+from app.database.partitions import add_months, create_partition_sql, month_start
+from app.database.repository import ApplicationRepository, VERSION_RECENT_WINDOW
+from app.models.applications.models import Base
+from app.schemas.applications.schemas import ApplicationFilter
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+SCHEMA = "query_plan_tests"
+PLAN_TEST_ROWS = int(os.getenv("PLAN_TEST_ROWS", "100000"))
+USER_NAMES = 1000
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def plan_engine():
+    engine = create_async_engine(
+        get_settings().async_database_url,
+        connect_args={
+            "timeout": 3,
+            "server_settings": {"search_path": f"{SCHEMA},public"},
+        },
+    )
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    except Exception as e:
+        await engine.dispose()
+        pytest.skip(f"Postgres недоступен: {e}")
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        current = month_start(datetime.now(timezone.utc).date())
+        for offset in (-1, 0, 1):
+            await connection.exec_driver_sql(
+                create_partition_sql(add_months(current, offset))
+            )
+        await connection.execute(
+            text(
+                "INSERT INTO applications (user_name, description, created_at) "
+                "SELECT 'user_' || (g % :users), 'Заявка ' || g, "
+                "now() - g * interval '1 second' "
+                "FROM generate_series(1, :rows) AS g"
+            ),
+            {"users": USER_NAMES, "rows": PLAN_TEST_ROWS},
+        )
+        await connection.execute(text("ANALYZE applications"))
+
+    yield engine
+
+    async with engine.begin() as connection:
+        await connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await engine.dispose()
+
+
+async def explain_ordered_queries(engine, call) -> list[dict]:
+    """
+    Выполняет ``call(repository)`` и возвращает планы его запросов с ORDER BY.
+    """
+    captured: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "ORDER BY" in statement and not statement.startswith("EXPLAIN"):
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with AsyncSession(engine) as session:
+            await call(ApplicationRepository(session))
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    plans = []
+    async with engine.connect() as connection:
+        for statement, parameters in captured:
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {statement}", parameters
+            )
+            plan = result.scalar_one()
+            plans.append((json.loads(plan) if isinstance(plan, str) else plan)[0])
+    assert plans, "репозиторий не выполнил ни одного запроса с ORDER BY"
+    return plans
+
+
+def node_types(plan: dict) -> list[str]:
+    types = [plan["Node Type"]]
+    for child in plan.get("Plans", []):
+        types.extend(node_types(child))
+    return types
+
+
+def assert_index_ordered(plans: list[dict]) -> None:
+    for plan in plans:
+        types = node_types(plan["Plan"])
+        assert "Sort" not in types and "Incremental Sort" not in types, types
+        assert {"Index Scan", "Index Only Scan"} & set(types), types
+
+
+CURSOR = encode_cursor(datetime.now(timezone.utc) - timedelta(hours=5), 2**31 - 1)
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        ApplicationFilter(page=1, size=10),
+        ApplicationFilter(page=500, size=10),
+        ApplicationFilter(user_name="user_7", user_name_match="exact", page=1),
+        ApplicationFilter(user_name="user_7", user_name_match="exact", page=5),
+        ApplicationFilter(
+            created_from=datetime.now(timezone.utc) - timedelta(hours=1), page=2
+        ),
+    ],
+    ids=["first-page", "deep-page", "exact-user", "exact-user-deep", "created-range"],
+)
+async def test_offset_pages_use_index_order(plan_engine, filters):
+    plans = await explain_ordered_queries(
+        plan_engine, lambda repository: repository.get_applications(filters)
+    )
+    assert_index_ordered(plans)
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        ApplicationFilter(size=10, cursor=CURSOR),
+        ApplicationFilter(
+            user_name="user_7", user_name_match="exact", size=10, cursor=CURSOR
+        ),
+    ],
+    ids=["cursor", "cursor-exact-user"],
+)
+async def test_cursor_pages_use_index_order(plan_engine, filters):
+    plans = await explain_ordered_queries(
+        plan_engine, lambda repository: repository.get_applications_by_cursor(filters)
+    )
+    assert_index_ordered(plans)
+
+
+async def test_applications_version_covers_recent_window(plan_engine):
+    async with AsyncSession(plan_engine) as session:
+        version = await ApplicationRepository(session).get_applications_version()
+
+    assert version.max_id == PLAN_TEST_ROWS
+    assert version.recent_count == min(PLAN_TEST_ROWS, VERSION_RECENT_WINDOW)
+    assert version.oldest_created_at < version.last_modified
@@ -0,0 +1,184 @@
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database.counting import TotalCount
+from app.database.replica import (
+    LAST_WRITE_COOKIE,
+    REPLICA_LAG_QUERY,
+    ReadSession,
+    ReplicaRouter,
+)
+from app.main import app
+
+container = app.state.dishka_container
+
+
+class FakeLagRouter(ReplicaRouter):
+    def __init__(self, lag: float | Exception, **kwargs):
+        engine = create_async_engine("postgresql+asyncpg://u:p@replica/d")
+        super().__init__(engine, **kwargs)
+        self.lag = lag
+        self.measurements = 0
+
+    async def measure_lag(self) -> float:
+        self.measurements += 1
+        if isinstance(self.lag, Exception):
+            raise self.lag
+        return self.lag
+
+
+@pytest.mark.asyncio
+async def test_replica_used_only_within_max_lag():
+    router = FakeLagRouter(0.5, max_lag=1.0, check_interval=60)
+    assert await router.use_replica() is True
+
+    router = FakeLagRouter(3.0, max_lag=1.0, check_interval=60)
+    assert await router.use_replica() is False
+
+    router = FakeLagRouter(
+        ConnectionError("replica down"), max_lag=1.0, check_interval=60
+    )
+    assert await router.use_replica() is False
+    assert router.primary_fallbacks_total == 1
+
+
+@pytest.mark.asyncio
+async def test_replica_lag_measured_once_per_interval():
+    router = FakeLagRouter(0.1, max_lag=1.0, check_interval=60)
+    for _ in range(5):
+        await router.use_replica()
+    assert router.measurements == 1
+    assert router.replica_reads_total == 5
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_goes_to_primary_until_replica_catches_up():
+    router = FakeLagRouter(0.5, max_lag=1.0, check_interval=60)
+
+    assert await router.use_replica(last_write_at=time.time()) is False
+    assert await router.use_replica(last_write_at=time.time() - 2) is True
+
+
+@pytest.mark.asyncio
+async def test_no_replica_configured_reads_from_primary():
+    router = ReplicaRouter(None, max_lag=1.0, check_interval=1.0)
+    assert await router.use_replica() is False
+
+
+@pytest.mark.asyncio
+async def test_create_sets_last_write_cookie_and_list_skips_cache(monkeypatch):
+    # Роутер создаётся до подмены настроек, чтобы чтения шли в основную БД.
+    await container.get(ReplicaRouter)
+    monkeypatch.setattr(app.state.settings, "db_replica_host", "replica")
+    new_app = SimpleNamespace(
+        id=7,
+        user_name="petrov",
+        description="Заявка",
+        created_at=datetime(2025, 11, 17, 12, 0, 0),
+    )
+
+    with patch(
+        "app.database.repository.ApplicationRepository.create_application",
+        new_callable=AsyncMock,
+        return_value=new_app,
+    ), patch(
+        "app.core.cache.ResponseCache.get", new_callable=AsyncMock, return_value=None
+    ) as mock_cache_get, patch(
+        "app.database.repository.ApplicationRepository.get_applications",
+        new_callable=AsyncMock,
+        return_value=([], TotalCount(0)),
+    ):
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as ac:
+            created = await ac.post(
+                "/applications/", json={"user_name": "petrov", "description": "Заявка"}
+            )
+            assert LAST_WRITE_COOKIE in created.cookies
+            await ac.get("/applications/")
+
+    mock_cache_get.assert_not_awaited()
+
+
+def test_lag_is_zero_when_replica_replayed_all_received_wal():
+    # Иначе при простое основной БД отставание растёт без новых записей.
+    sql = str(REPLICA_LAG_QUERY)
+    assert "pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0" in sql
+    assert sql.index("pg_last_wal_replay_lsn()") < sql.index(
+        "pg_last_xact_replay_timestamp()"
+    )
+
+
+@pytest.mark.asyncio
+async def test_read_session_routes_only_on_first_query():
+    router = FakeLagRouter(0.1, max_lag=1.0, check_interval=60)
+    primary = Mock()
+    replica = Mock()
+    replica.execute = AsyncMock(return_value="rows")
+    replica.close = AsyncMock()
+    router.session_maker = Mock(return_value=replica)
+
+    unused = ReadSession(router, primary)
+    await unused.close()
+    assert router.replica_reads_total == router.primary_fallbacks_total == 0
+
+    read_session = ReadSession(router, primary)
+    assert await read_session.execute("SELECT 1") == "rows"
+    await read_session.execute("SELECT 2")
+    await read_session.close()
+
+    assert router.replica_reads_total == 1
+    router.session_maker.assert_called_once()
+    replica.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_write_request_does_not_route_reads():
+    new_app = SimpleNamespace(
+        id=8,
+        user_name="petrov",
+        description="Заявка",
+        created_at=datetime(2025, 11, 17, 12, 0, 0),
+    )
+
+    with patch(
+        "app.database.repository.ApplicationRepository.create_application",
+        new_callable=AsyncMock,
+        return_value=new_app,
+    ), patch(
+        "app.database.replica.ReplicaRouter.use_replica", new_callable=AsyncMock
+    ) as use_replica:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as ac:
+            await ac.post(
+                "/applications/", json={"user_name": "petrov", "description": "Заявка"}
+            )
+
+    use_replica.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_replica_engine_is_traced():
+    from app.core.config import get_settings
+    from app.di.container import create_container
+
+    settings = get_settings().model_copy(
+        update={"db_replica_host": "replica", "sql_trace_enabled": True}
+    )
+    replica_container = create_container(settings)
+    with patch("app.di.container.SqlTracer") as tracer_class:
+        tracer_class.return_value.close = AsyncMock()
+        router = await replica_container.get(ReplicaRouter)
+        await replica_container.close()
+
+    tracer_class.assert_called_once()
+    assert tracer_class.call_args.args[0] is router.engine
+    tracer_class.return_value.install.assert_called_once()
+    tracer_class.return_value.close.assert_awaited_once()
@@ -0,0 +1,173 @@
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.database.counting import ApplicationCountCache, TotalCount
+from app.database.repository import ApplicationRepository, ExplainJson, _escape_like
+from app.models.applications.models import Application
+from app.schemas.applications.schemas import ApplicationFilter
+
+
+def compile_conditions(filters: ApplicationFilter) -> tuple[str, dict]:
+    compiled = (
+        select(Application.id)
+        .where(*ApplicationRepository._filter_conditions(filters))
+        .compile(dialect=postgresql.dialect())
+    )
+    return str(compiled).splitlines()[-1], compiled.params
+
+
+@pytest.mark.parametrize(
+    "match, where, pattern",
+    [
+        ("exact", "applications.user_name = %(user_name_1)s", "ivanov"),
+        (
+            "prefix",
+            r"applications.user_name LIKE %(user_name_1)s ESCAPE '\\'",
+            "ivanov%",
+        ),
+        (
+            "contains",
+            r"applications.user_name ILIKE %(user_name_1)s ESCAPE '\\'",
+            "%ivanov%",
+        ),
+    ],
+)
+def test_user_name_match_selects_query_form(match, where, pattern):
+    sql, params = compile_conditions(
+        ApplicationFilter(user_name="ivanov", user_name_match=match)
+    )
+
+    assert sql == f"WHERE {where}"
+    assert params == {"user_name_1": pattern}
+
+
+@pytest.mark.parametrize(
+    "match, pattern",
+    [
+        ("exact", "50%_off\\"),
+        ("prefix", "50\\%\\_off\\\\%"),
+        ("contains", "%50\\%\\_off\\\\%"),
+    ],
+)
+def test_like_wildcards_in_user_name_are_escaped(match, pattern):
+    _, params = compile_conditions(
+        ApplicationFilter(user_name="50%_off\\", user_name_match=match)
+    )
+
+    assert params == {"user_name_1": pattern}
+
+
+def test_escape_like_escapes_backslash_first():
+    assert _escape_like("a\\%") == "a\\\\\\%"
+    assert _escape_like("plain") == "plain"
+
+
+def test_created_range_and_no_filters():
+    assert ApplicationRepository._filter_conditions(ApplicationFilter()) == []
+    sql, params = compile_conditions(
+        ApplicationFilter(
+            created_from=datetime(2025, 11, 1, tzinfo=timezone.utc),
+            created_to=datetime(2025, 12, 1, tzinfo=timezone.utc),
+        )
+    )
+
+    assert "applications.created_at >= %(created_at_1)s" in sql
+    assert "applications.created_at < %(created_at_2)s" in sql
+    assert set(params) == {"created_at_1", "created_at_2"}
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+def fake_session(*values) -> Mock:
+    session = Mock()
+    session.execute = AsyncMock(side_effect=[FakeResult(value) for value in values])
+    return session
+
+
+@pytest.mark.asyncio
+async def test_none_strategy_does_not_query():
+    session = fake_session()
+    repository = ApplicationRepository(session)
+
+    total = await repository.count_applications(ApplicationFilter(), "none")
+
+    assert total == TotalCount(None)
+    session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_estimate_strategy_uses_table_statistics_without_filter():
+    repository = ApplicationRepository(fake_session(125_000))
+
+    total = await repository.count_applications(ApplicationFilter(), "estimate")
+
+    assert total == TotalCount(125_000, estimated=True)
+
+
+@pytest.mark.asyncio
+async def test_estimate_strategy_explains_filter_with_bound_parameters():
+    session = fake_session([{"Plan": {"Plan Rows": 37}}])
+    repository = ApplicationRepository(session)
+
+    total = await repository.count_applications(
+        ApplicationFilter(user_name="x'; DROP TABLE applications; --"), "estimate"
+    )
+
+    assert total == TotalCount(37, estimated=True)
+    statement = session.execute.await_args.args[0]
+    assert isinstance(statement, ExplainJson)
+    compiled = statement.compile(dialect=postgresql.dialect())
+    assert str(compiled).startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "DROP TABLE" not in str(compiled)
+    assert compiled.params == {"user_name_1": "%x'; DROP TABLE applications; --%"}
+
+
+@pytest.mark.asyncio
+async def test_estimate_strategy_falls_back_to_exact_count():
+    # reltuples = -1: таблица ещё не анализировалась.
+    repository = ApplicationRepository(fake_session(-1, 42))
+
+    total = await repository.count_applications(ApplicationFilter(), "estimate")
+
+    assert total == TotalCount(42)
+
+
+def test_count_cache_is_bounded_lru():
+    cache = ApplicationCountCache(ttl=60, max_entries=2)
+    first, second, third = (
+        ApplicationFilter(user_name=name, user_name_match="exact")
+        for name in ("a", "b", "c")
+    )
+    cache.set(first, 1)
+    cache.set(second, 2)
+    assert cache.get(first) == 1
+
+    cache.set(third, 3)
+
+    assert len(cache) == 2
+    assert cache.get(second) is None
+    assert cache.get(first) == 1
+    assert cache.get(third) == 3
+
+
+def test_count_cache_record_insert_drops_matching_prefixes():
+    cache = ApplicationCountCache(ttl=60)
+    matching = ApplicationFilter(user_name="Iva", user_name_match="prefix")
+    other = ApplicationFilter(user_name="Pet", user_name_match="prefix")
+    cache.set(matching, 5)
+    cache.set(other, 7)
+
+    cache.record_insert("Ivanov")
+
+    assert cache.get(matching) is None
+    assert cache.get(other) == 7
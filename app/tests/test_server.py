@@ -0,0 +1,81 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from app import server
+from app.core.config import get_settings
+
+
+@pytest.fixture(autouse=True)
+def restore_environment(monkeypatch):
+    # run() передаёт настройки процессам-worker через окружение.
+    monkeypatch.delenv("RESPONSE_CACHE_BACKEND", raising=False)
+    monkeypatch.delenv("METRICS_MULTIPROC_DIR", raising=False)
+
+
+def test_run_starts_workers_with_uvloop_and_httptools():
+    settings = get_settings().model_copy(update={"server_workers": None})
+    with (
+        patch("app.server.default_workers", return_value=4),
+        patch("app.server.uvicorn.run") as uvicorn_run,
+    ):
+        server.run(port=9000, settings=settings)
+
+    args, kwargs = uvicorn_run.call_args
+    # Приложение передаётся строкой, чтобы каждый worker импортировал его сам.
+    assert args == ("app.main:app",)
+    assert kwargs["workers"] == 4
+    assert kwargs["port"] == 9000
+    assert kwargs["loop"] == "uvloop"
+    assert kwargs["http"] == "httptools"
+    assert "reload" not in kwargs
+
+
+def test_run_falls_back_without_uvloop_and_httptools():
+    with (
+        patch("app.server.importlib.util.find_spec", return_value=None),
+        patch("app.server.uvicorn.run") as uvicorn_run,
+    ):
+        server.run(workers=2)
+
+    kwargs = uvicorn_run.call_args.kwargs
+    assert kwargs["workers"] == 2
+    assert kwargs["loop"] == "asyncio"
+    assert kwargs["http"] == "h11"
+
+
+def test_memory_response_cache_is_disabled_for_several_workers():
+    settings = get_settings().model_copy(update={"response_cache_backend": "memory"})
+    with patch("app.server.uvicorn.run"):
+        server.run(workers=1, settings=settings)
+        assert "RESPONSE_CACHE_BACKEND" not in os.environ
+
+        server.run(workers=2, settings=settings)
+
+    assert os.environ["RESPONSE_CACHE_BACKEND"] == "none"
+
+
+def test_several_workers_share_a_temporary_metrics_dir():
+    settings = get_settings().model_copy(update={"metrics_multiproc_dir": None})
+
+    def check_dir(*args, **kwargs):
+        assert os.path.isdir(os.environ["METRICS_MULTIPROC_DIR"])
+
+    with patch("app.server.uvicorn.run", side_effect=check_dir) as uvicorn_run:
+        server.run(workers=2, settings=settings)
+
+    uvicorn_run.assert_called_once()
+    assert not os.path.exists(os.environ["METRICS_MULTIPROC_DIR"])
+
+
+def test_stale_metrics_files_are_removed(tmp_path):
+    (tmp_path / "123.prom").write_text("test_total 5\n")
+    settings = get_settings().model_copy(
+        update={"metrics_multiproc_dir": str(tmp_path)}
+    )
+    with patch("app.server.uvicorn.run"):
+        server.run(workers=2, settings=settings)
+
+    assert tmp_path.exists()
+    assert list(tmp_path.iterdir()) == []
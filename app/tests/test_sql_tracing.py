@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.request_context import RequestContextMiddleware
+from app.database.tracing import SqlTracer
+
+
+def make_tracer(**kwargs) -> SqlTracer:
+    engine = create_async_engine("postgresql+asyncpg://u:p@localhost/d")
+    return SqlTracer(engine, **kwargs)
+
+
+def run_statement(tracer: SqlTracer, statement: str, elapsed: float) -> None:
+    conn = SimpleNamespace(info={})
+    with patch("app.database.tracing.time.perf_counter", side_effect=[0.0, elapsed]):
+        tracer._before_cursor_execute(conn, None, statement, ("ivanov",), None, False)
+        tracer._after_cursor_execute(conn, None, statement, ("ivanov",), None, False)
+
+
+@pytest.mark.asyncio
+async def test_server_timing_and_request_id_headers():
+    tracer = make_tracer(slow_threshold=10)
+    app = FastAPI()
+
+    @app.get("/")
+    async def endpoint():
+        run_statement(tracer, "SELECT 1", 0.002)
+        run_statement(tracer, "SELECT 2", 0.003)
+        return {}
+
+    app.add_middleware(RequestContextMiddleware, server_timing=True)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        response = await ac.get("/", headers={"X-Request-ID": "req-1"})
+
+    assert response.headers["x-request-id"] == "req-1"
+    assert response.headers["server-timing"].startswith('db;dur=5.00;desc="2 queries"')
+
+
+@pytest.mark.asyncio
+async def test_slow_select_is_logged_and_explained(caplog):
+    tracer = make_tracer(slow_threshold=0.1, explain_sample_rate=1.0)
+
+    with caplog.at_level(logging.WARNING), patch.object(
+        SqlTracer, "explain", new_callable=AsyncMock
+    ) as mock_explain:
+        run_statement(tracer, "SELECT * FROM applications WHERE user_name = $1", 0.5)
+        run_statement(tracer, "INSERT INTO applications VALUES ($1)", 0.5)
+        run_statement(tracer, "SELECT 1", 0.01)
+        await asyncio.sleep(0)
+        await tracer.close()
+
+    assert tracer.slow_queries_total == 2
+    assert "МЕДЛЕННЫЙ ЗАПРОС 500.0 мс" in caplog.text
+    assert "('ivanov',)" in caplog.text
+    mock_explain.assert_awaited_once()
+    assert mock_explain.await_args.args[0].startswith("SELECT * FROM applications")
@@ -0,0 +1,69 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.core.metrics import (
+    WRITE_COALESCER_BATCH_SIZE,
+    WRITE_COALESCER_QUEUE_WAIT_SECONDS,
+    registry,
+)
+from app.database.coalescer import ApplicationWriteCoalescer
+from app.schemas.applications.schemas import ApplicationCreate
+
+
+def make_items(count: int) -> list[ApplicationCreate]:
+    return [
+        ApplicationCreate(user_name=f"user{i}", description=f"Заявка {i}")
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_share_one_insert():
+    async def fake_insert(items):
+        return [
+            SimpleNamespace(id=i + 1, user_name=item.user_name)
+            for i, item in enumerate(items)
+        ]
+
+    coalescer = ApplicationWriteCoalescer(
+        session_maker=None, window=0.05, max_batch_size=10, max_inflight=1
+    )
+    batches = WRITE_COALESCER_BATCH_SIZE.count()
+    waits = WRITE_COALESCER_QUEUE_WAIT_SECONDS.count()
+    with patch.object(
+        coalescer, "_insert", new=AsyncMock(side_effect=fake_insert)
+    ) as mock_insert:
+        results = await asyncio.gather(*(coalescer.submit(i) for i in make_items(3)))
+        await coalescer.stop()
+
+    assert mock_insert.await_count == 1
+    assert [r.user_name for r in results] == ["user0", "user1", "user2"]
+    assert coalescer.stats.batches_total == 1
+    assert coalescer.stats.max_batch_size == 3
+    assert WRITE_COALESCER_BATCH_SIZE.count() == batches + 1
+    assert WRITE_COALESCER_QUEUE_WAIT_SECONDS.count() == waits + 3
+    assert 'write_coalescer_batch_size_bucket{le="5"}' in registry.render()
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_item_by_item():
+    async def fake_insert(items):
+        if len(items) > 1 or items[0].user_name == "user1":
+            raise RuntimeError("insert failed")
+        return [SimpleNamespace(id=1, user_name=items[0].user_name)]
+
+    coalescer = ApplicationWriteCoalescer(
+        session_maker=None, window=0.05, max_batch_size=10, max_inflight=1
+    )
+    with patch.object(coalescer, "_insert", new=AsyncMock(side_effect=fake_insert)):
+        results = await asyncio.gather(
+            *(coalescer.submit(i) for i in make_items(3)), return_exceptions=True
+        )
+        await coalescer.stop()
+
+    assert results[0].user_name == "user0"
+    assert isinstance(results[1], RuntimeError)
+    assert results[2].user_name == "user2"
@@ -0,0 +1,417 @@
+"""
+Нагрузочный бенчмарк HTTP API заявок.
+
+Прогоняет сценарии через ``httpx.ASGITransport`` (без сети, с lifespan
+приложения) или через отдельный процесс uvicorn и считает RPS и задержки
+p50/p95/p99. Postgres используется настоящий (настройки из ``.env``,
+схема — ``alembic upgrade head``); Kafka и SMTP по умолчанию заменяются
+объектами из ``benchmarks.fakes``.
+
+С ``--transport uvicorn --workers 1 2 4`` сценарии прогоняются для каждого
+числа процессов ``app.server``, чтобы увидеть масштабирование RPS.
+
+Кэш ответов по умолчанию отключён (``RESPONSE_CACHE_BACKEND=none``) при
+любом числе процессов: иначе один процесс отвечал бы из кэша в памяти,
+а несколько — из БД, и соотношения RPS ничего бы не значили. Кэш
+включается явно через ``--response-cache``; кэш в памяти допустим только
+для одного процесса. Сценарии списков с кэшем измеряют попадания в кэш, а
+не запросы к БД, поэтому сохраняются под отдельными именами
+(``list_shallow+cache``) и не сравниваются с прогонами без кэша.
+
+Результаты сохраняются в JSON с хешем коммита; ``--compare`` сравнивает
+прогон с сохранённым и завершается с кодом 1, если p95 какого-либо
+сценария вырос больше чем на ``--max-regression`` процентов.
+
+Запуск::
+
+    python -m benchmarks.bench_http --transport asgi --requests 500 --concurrency 20
+    python -m benchmarks.bench_http --transport uvicorn --workers 1 2 4
+    python -m benchmarks.bench_http --transport uvicorn --compare benchmarks/results/<commit>-uvicorn.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from benchmarks.console import emit
+
+RESULTS_DIR = Path(__file__).parent / "results"
+PAGE_SIZE = 10
+USER_NAMES = 100
+
+# (метод, путь, тело) для i-го запроса сценария.
+RequestFactory = Callable[[int], tuple[str, str, dict | None]]
+
+
+@dataclass
+class ScenarioResult:
+    requests: int
+    errors: int
+    # Ответы 503 контроля допуска; входят и в errors.
+    shed: int
+    concurrency: int
+    seconds: float
+    rps: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def make_scenarios(seed_rows: int) -> dict[str, RequestFactory]:
+    deep_page = max(1, seed_rows // PAGE_SIZE - 1)
+    deep_filtered_page = max(1, seed_rows // USER_NAMES // PAGE_SIZE - 1)
+
+    def create(i: int):
+        return (
+            "POST",
+            "/applications/",
+            {"user_name": f"bench_{i % USER_NAMES}", "description": f"Заявка {i}"},
+        )
+
+    return {
+        "list_shallow": lambda i: (
+            "GET",
+            f"/applications/?page=1&size={PAGE_SIZE}",
+            None,
+        ),
+        "list_deep": lambda i: (
+            "GET",
+            f"/applications/?page={deep_page}&size={PAGE_SIZE}",
+            None,
+        ),
+        "list_filter": lambda i: (
+            "GET",
+            f"/applications/?user_name=bench_{i % USER_NAMES}&user_name_match=exact"
+            f"&page=1&size={PAGE_SIZE}",
+            None,
+        ),
+        "list_filter_deep": lambda i: (
+            "GET",
+            f"/applications/?user_name=bench_{i % USER_NAMES}&user_name_match=exact"
+            f"&page={deep_filtered_page}&size={PAGE_SIZE}",
+            None,
+        ),
+        "create": create,
+        "create_burst": create,
+    }
+
+
+def result_name(name: str, response_cache: str) -> str:
+    # Запись не кэшируется, её результаты от кэша не зависят.
+    if response_cache == "none" or not name.startswith("list_"):
+        return name
+    return f"{name}+cache"
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(
+        len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    make_request: RequestFactory,
+    requests: int,
+    concurrency: int,
+) -> ScenarioResult:
+    latencies: list[float] = []
+    errors = 0
+    shed = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal errors, shed, next_index
+        while next_index < requests:
+            method, url, body = make_request(next_index)
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=body)
+                failed = response.status_code >= 400
+                shed += response.status_code == 503
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+
+    latencies.sort()
+    return ScenarioResult(
+        requests=requests,
+        errors=errors,
+        shed=shed,
+        concurrency=concurrency,
+        seconds=round(seconds, 4),
+        rps=round(requests / seconds, 1),
+        mean_ms=round(sum(latencies) / max(len(latencies), 1) * 1000, 3),
+        p50_ms=round(percentile(latencies, 0.50) * 1000, 3),
+        p95_ms=round(percentile(latencies, 0.95) * 1000, 3),
+        p99_ms=round(percentile(latencies, 0.99) * 1000, 3),
+    )
+
+
+async def seed_applications(rows: int) -> None:
+    """
+    Доводит число заявок в таблице до ``rows`` (без событий outbox).
+    """
+    from sqlalchemy import func, insert, select
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.core.config import get_settings
+    from app.models.applications.models import Application
+
+    engine = create_async_engine(get_settings().async_database_url)
+    try:
+        async with engine.begin() as connection:
+            existing = (
+                await connection.execute(select(func.count()).select_from(Application))
+            ).scalar_one()
+            for start in range(existing, rows, 1000):
+                await connection.execute(
+                    insert(Application),
+                    [
+                        {
+                            "user_name": f"bench_{i % USER_NAMES}",
+                            "description": f"Тестовая заявка {i}",
+                        }
+                        for i in range(start, min(start + 1000, rows))
+                    ],
+                )
+        emit(f"заявок в таблице: {max(existing, rows)}")
+    finally:
+        await engine.dispose()
+
+
+@asynccontextmanager
+async def asgi_client(fake_services: bool):
+    from app.main import create_app
+
+    app = create_app()
+    async with AsyncExitStack() as stack:
+        if fake_services:
+            from benchmarks.fakes import fake_external_services
+
+            await stack.enter_async_context(fake_external_services(app))
+        await stack.enter_async_context(app.router.lifespan_context(app))
+        yield await stack.enter_async_context(
+            httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+                base_url="http://bench",
+            )
+        )
+
+
+@asynccontextmanager
+async def uvicorn_client(
+    fake_services: bool, concurrency: int, port: int, workers: int
+):
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.serve",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+    ]
+    if fake_services:
+        command.append("--fake-services")
+    process = subprocess.Popen(command, env=os.environ.copy())
+    base_url = f"http://127.0.0.1:{port}"
+    # Без ограничения числа соединений, иначе всплеск встанет в очередь клиента.
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    await client.get("/")
+                    break
+                except httpx.TransportError:
+                    if process.poll() is not None or time.monotonic() > deadline:
+                        raise RuntimeError("uvicorn не запустился") from None
+                    await asyncio.sleep(0.2)
+            yield client
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, baseline_path: Path, max_regression: float) -> bool:
+    baseline = json.loads(baseline_path.read_text())
+    emit(f"\nсравнение с {baseline_path} ({baseline['commit'][:10]}):")
+    ok = True
+    for name, current in results["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        rps_change = (current["rps"] / previous["rps"] - 1) * 100
+        p95_change = (current["p95_ms"] / previous["p95_ms"] - 1) * 100
+        regressed = p95_change > max_regression
+        ok &= not regressed
+        emit(
+            f"{name:<18} rps {rps_change:+7.1f}%  p95 {p95_change:+7.1f}%"
+            f"{'  РЕГРЕССИЯ' if regressed else ''}"
+        )
+    return ok
+
+
+def print_scaling(results: dict, scenarios: list[str], workers: list[int]) -> None:
+    """
+    Печатает RPS каждого сценария относительно первого числа процессов.
+    """
+    emit("\nмасштабирование RPS:")
+    for name in scenarios:
+        base = results[f"{name}@{workers[0]}w"]["rps"]
+        ratios = "  ".join(
+            f"{count}w={results[f'{name}@{count}w']['rps'] / base:.2f}x"
+            for count in workers
+        )
+        emit(f"{name:<18} {ratios}")
+
+
+async def run(args: argparse.Namespace) -> dict:
+    if args.seed_rows:
+        await seed_applications(args.seed_rows)
+
+    scenarios = make_scenarios(args.seed_rows)
+    selected = args.scenarios or list(scenarios)
+
+    results: dict[str, dict] = {}
+    emit(f"кэш ответов: {args.response_cache}")
+    for workers in args.workers:
+        if args.transport == "asgi":
+            client_context = asgi_client(args.fake_services)
+        else:
+            client_context = uvicorn_client(
+                args.fake_services, args.concurrency, args.port, workers
+            )
+        if len(args.workers) > 1:
+            emit(f"\nworkers={workers}")
+
+        async with client_context as client:
+            for name in selected:
+                make_request = scenarios[name]
+                # Всплеск: все запросы отправляются одновременно.
+                concurrency = (
+                    args.requests if name == "create_burst" else args.concurrency
+                )
+                await run_scenario(client, make_request, args.warmup, args.concurrency)
+                result = await run_scenario(
+                    client, make_request, args.requests, concurrency
+                )
+                label = result_name(name, args.response_cache)
+                key = label if len(args.workers) == 1 else f"{label}@{workers}w"
+                results[key] = asdict(result)
+                emit(
+                    f"{label:<18} {result.rps:>9,.1f} rps  p50={result.p50_ms:.2f}мс "
+                    f"p95={result.p95_ms:.2f}мс p99={result.p99_ms:.2f}мс "
+                    f"ошибок={result.errors} отклонено={result.shed}"
+                )
+
+    if len(args.workers) > 1:
+        labels = [result_name(name, args.response_cache) for name in selected]
+        print_scaling(results, labels, args.workers)
+
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "transport": args.transport,
+        "fake_services": args.fake_services,
+        "response_cache": args.response_cache,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "workers": args.workers,
+        "seed_rows": args.seed_rows,
+        "scenarios": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed-rows", type=int, default=10000)
+    parser.add_argument("--scenarios", nargs="*", choices=list(make_scenarios(0)))
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1],
+        help="Числа процессов uvicorn для прогона (только --transport uvicorn)",
+    )
+    parser.add_argument(
+        "--real-services",
+        dest="fake_services",
+        action="store_false",
+        help="Использовать настоящие Kafka и SMTP из настроек",
+    )
+    parser.add_argument(
+        "--response-cache",
+        choices=("none", "memory", "redis"),
+        default="none",
+        help="Кэш ответов приложения; по умолчанию отключён, и списки идут в БД",
+    )
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--max-regression", type=float, default=10.0)
+    args = parser.parse_args()
+    if args.transport == "asgi" and args.workers != [1]:
+        parser.error("--workers поддерживается только с --transport uvicorn")
+
+    if args.response_cache == "memory" and max(args.workers) > 1:
+        parser.error(
+            "--response-cache memory не общий для процессов, "
+            "для нескольких --workers нужен redis"
+        )
+
+    # До импорта приложения: настройки читаются при импорте, а процессы
+    # uvicorn наследуют окружение.
+    os.environ["RESPONSE_CACHE_BACKEND"] = args.response_cache
+
+    results = asyncio.run(run(args))
+
+    output = (
+        args.output or RESULTS_DIR / f"{results['commit'][:10]}-{args.transport}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, ensure_ascii=False, indent=2))
+    emit(f"результаты сохранены в {output}")
+
+    if args.compare and not compare(results, args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
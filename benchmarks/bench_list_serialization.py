@@ -0,0 +1,110 @@
+"""
+Микробенчмарк сериализации страницы списка заявок.
+
+Сравнивает строки в секунду для трёх вариантов:
+
+- ``orm+model_validate`` — прежний путь: ORM-сущности, ``model_validate``
+  на каждую строку, ``jsonable_encoder`` и ``json.dumps`` как в FastAPI;
+- ``rows+TypeAdapter`` — строки Core, пакетная валидация ``TypeAdapter``;
+- ``rows+orjson`` — текущий путь: строки Core без валидации, orjson.
+
+Запуск::
+
+    python -m benchmarks.bench_list_serialization --rows 100 --repeat 2000
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from math import ceil
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.schemas.applications.schemas import (
+    ApplicationListResponse,
+    ApplicationResponse,
+)
+from app.schemas.applications.serialization import dump_application_list
+from benchmarks.console import emit
+
+ITEMS_ADAPTER = TypeAdapter(list[ApplicationResponse])
+
+
+def make_rows(count: int) -> list[dict]:
+    started = datetime(2025, 11, 17, 10, 30, tzinfo=timezone.utc)
+    return [
+        {
+            "id": i,
+            "user_name": f"user_{i}",
+            "description": "Нужен доступ к тестовому окружению " * 3,
+            "created_at": started - timedelta(seconds=i),
+        }
+        for i in range(count)
+    ]
+
+
+def orm_model_validate(rows: list[dict]) -> bytes:
+    entities = [SimpleNamespace(**row) for row in rows]
+    response = ApplicationListResponse(
+        items=[ApplicationResponse.model_validate(entity) for entity in entities],
+        total=1000,
+        page=1,
+        size=len(rows),
+        pages=ceil(1000 / len(rows)),
+    )
+    return json.dumps(jsonable_encoder(response)).encode()
+
+
+def rows_type_adapter(rows: list[dict]) -> bytes:
+    response = ApplicationListResponse.model_construct(
+        items=ITEMS_ADAPTER.validate_python(rows),
+        total=1000,
+        page=1,
+        size=len(rows),
+        pages=ceil(1000 / len(rows)),
+        total_estimated=False,
+        next_cursor=None,
+    )
+    return response.model_dump_json().encode()
+
+
+def rows_orjson(rows: list[dict]) -> bytes:
+    return dump_application_list(
+        rows, total=1000, page=1, size=len(rows), pages=ceil(1000 / len(rows))
+    )
+
+
+VARIANTS = {
+    "orm+model_validate": orm_model_validate,
+    "rows+TypeAdapter": rows_type_adapter,
+    "rows+orjson": rows_orjson,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    reference = json.loads(orm_model_validate(rows))
+    baseline = None
+    for name, variant in VARIANTS.items():
+        assert json.loads(variant(rows))["items"] == reference["items"], name
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            variant(rows)
+        elapsed = time.perf_counter() - started
+        rows_per_second = args.rows * args.repeat / elapsed
+        baseline = baseline or rows_per_second
+        emit(
+            f"{name:<20} {rows_per_second:>12,.0f} строк/с  x{rows_per_second / baseline:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Бенчмарк холодного старта веб-приложения: от импорта до первого ответа.
+
+Каждый прогон — новый процесс Python, чтобы импорты не кэшировались.
+В режиме ``asgi`` процесс импортирует ``app.main``, вызывает
+``create_app()``, выполняет ``lifespan`` и первый запрос ``/health/live``
+через ``httpx.ASGITransport``, замеряя каждый этап. В режиме ``uvicorn``
+запускается ``python -m app.server`` с одним worker и замеряется время от
+запуска процесса до первого ответа по сети.
+
+Kafka и Postgres не нужны: подключение к Kafka идёт в фоне, а к БД
+приложение обращается только при запросах.
+
+Запуск::
+
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --transport uvicorn --runs 5
+"""
+
+import time
+
+STARTED = time.perf_counter()
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import statistics  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+from pathlib import Path  # noqa: E402
+
+import httpx  # noqa: E402
+
+from benchmarks.console import emit  # noqa: E402
+
+PROBE_PATH = "/health/live"
+
+
+async def measure_in_process() -> dict[str, float]:
+    """
+    Выполняется в дочернем процессе; время — от начала импорта этого модуля.
+    """
+    from app.main import create_app
+
+    imported = time.perf_counter()
+    app = create_app()
+    created = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            response = await client.get(PROBE_PATH)
+            response.raise_for_status()
+        answered = time.perf_counter()
+    return {
+        "import_ms": (imported - STARTED) * 1000,
+        "create_app_ms": (created - imported) * 1000,
+        "lifespan_ms": (started - created) * 1000,
+        "first_request_ms": (answered - STARTED) * 1000,
+    }
+
+
+def child_env() -> dict[str, str]:
+    # Логи старта не должны влиять на измерения.
+    return {
+        **os.environ,
+        "LOG_LEVEL": "WARNING",
+        "PARTITION_MAINTENANCE_ENABLED": "false",
+    }
+
+
+def run_asgi() -> dict[str, float]:
+    spawned = time.perf_counter()
+    output = subprocess.check_output(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+        env=child_env(),
+        text=True,
+    )
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - spawned) * 1000
+    return result
+
+
+def run_uvicorn(port: int) -> dict[str, float]:
+    command = [
+        sys.executable,
+        "-m",
+        "app.server",
+        "--workers",
+        "1",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+    ]
+    spawned = time.perf_counter()
+    process = subprocess.Popen(command, env=child_env())
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    client.get(PROBE_PATH).raise_for_status()
+                    break
+                except httpx.TransportError:
+                    if process.poll() is not None or time.monotonic() > deadline:
+                        raise RuntimeError("uvicorn не запустился") from None
+                    time.sleep(0.01)
+        return {"first_request_ms": (time.perf_counter() - spawned) * 1000}
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def summarize(runs: list[dict[str, float]]) -> dict[str, dict[str, float]]:
+    return {
+        metric: {
+            "median": round(statistics.median(run[metric] for run in runs), 1),
+            "min": round(min(run[metric] for run in runs), 1),
+            "max": round(max(run[metric] for run in runs), 1),
+        }
+        for metric in runs[0]
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        emit(json.dumps(asyncio.run(measure_in_process())))
+        return
+
+    runs = [
+        run_asgi() if args.transport == "asgi" else run_uvicorn(args.port)
+        for _ in range(args.runs)
+    ]
+    summary = summarize(runs)
+    for metric, values in summary.items():
+        emit(
+            f"{metric:<18} медиана={values['median']:.1f}мс "
+            f"мин={values['min']:.1f}мс макс={values['max']:.1f}мс"
+        )
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(
+            json.dumps(
+                {"transport": args.transport, "runs": runs, "summary": summary},
+                ensure_ascii=False,
+                indent=2,
+            )
+        )
+        emit(f"результаты сохранены в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""
+Вывод отчётов бенчмарков в stdout.
+"""
+
+import sys
+
+
+def emit(line: str = "") -> None:
+    sys.stdout.write(f"{line}\n")
+    sys.stdout.flush()
@@ -0,0 +1,96 @@
+"""
+Замены внешних сервисов для бенчмарков: Kafka в памяти и SMTP-приёмник.
+
+Postgres не подменяется: бенчмарк измеряет реальный путь запроса до БД.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from faststream.kafka import TestKafkaBroker
+
+from app.kafka.applications.connection import KafkaConnection
+
+
+class FakeSMTPServer:
+    """
+    Минимальный SMTP-сервер, принимающий и отбрасывающий письма.
+
+    Поддерживает ровно те команды, которые отправляет aiosmtplib,
+    поэтому клиентская сторона (пул соединений, таймауты) работает как с
+    настоящим сервером, но без задержек сети и диска.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.messages_total = 0
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        writer.write(b"220 fake-smtp ready\r\n")
+        try:
+            while line := await reader.readline():
+                command = line[:4].upper()
+                if command == b"EHLO":
+                    writer.write(b"250-fake-smtp\r\n250 8BITMIME\r\n")
+                elif command == b"DATA":
+                    writer.write(b"354 end data with <CR><LF>.<CR><LF>\r\n")
+                    await writer.drain()
+                    while await reader.readline() not in (b".\r\n", b""):
+                        pass
+                    self.messages_total += 1
+                    writer.write(b"250 OK\r\n")
+                elif command == b"QUIT":
+                    writer.write(b"221 bye\r\n")
+                    await writer.drain()
+                    break
+                else:
+                    writer.write(b"250 OK\r\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+@asynccontextmanager
+async def fake_external_services(app: FastAPI) -> AsyncIterator[FakeSMTPServer]:
+    """
+    Подменяет Kafka брокером FastStream в памяти, а SMTP — ``FakeSMTPServer``.
+
+    Подписчики потребителя регистрируются в брокере приложения ``app``,
+    поэтому каждая опубликованная заявка проходит через потребителя и
+    отправку письма в том же процессе. Вызывается до ``lifespan``.
+    """
+    from app.kafka.applications.fs_subs.consumers import (
+        ApplicationConsumer,
+        create_router,
+    )
+
+    smtp = FakeSMTPServer()
+    await smtp.start()
+    settings = app.state.settings.model_copy(
+        update={"smtp_host": smtp.host, "smtp_port": smtp.port}
+    )
+    kafka = await app.state.dishka_container.get(KafkaConnection)
+    broker = kafka.broker
+    broker.include_router(create_router(ApplicationConsumer(settings)))
+    try:
+        async with TestKafkaBroker(broker, connect_only=False):
+            yield smtp
+    finally:
+        await smtp.stop()
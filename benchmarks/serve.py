@@ -0,0 +1,71 @@
+"""
+Запуск веб-приложения в uvicorn для HTTP-бенчмарков.
+
+Приложение запускается продакшен-лаунчером ``app.server`` с нужным числом
+процессов. С ``--fake-services`` Kafka и SMTP заменяются объектами из
+``benchmarks.fakes`` внутри каждого worker, поэтому нужен только Postgres.
+
+Запуск::
+
+    python -m benchmarks.serve --port 8765 --workers 4 --fake-services
+"""
+
+import argparse
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+# Переменная окружения наследуется процессами-worker.
+FAKE_SERVICES_ENV = "BENCH_FAKE_SERVICES"
+
+
+def create_app() -> FastAPI:
+    """
+    Фабрика приложения для uvicorn; вызывается в каждом worker.
+    """
+    from app.main import create_app as create_service_app
+
+    app = create_service_app()
+    if os.environ.get(FAKE_SERVICES_ENV) != "1":
+        return app
+
+    from benchmarks.fakes import fake_external_services
+
+    app_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        async with fake_external_services(app):
+            async with app_lifespan(app) as state:
+                yield state
+
+    app.router.lifespan_context = lifespan
+    return app
+
+
+def main() -> None:
+    from app.core.config import get_settings
+    from app.server import run
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--fake-services", action="store_true")
+    args = parser.parse_args()
+
+    os.environ[FAKE_SERVICES_ENV] = "1" if args.fake_services else "0"
+    run(
+        "benchmarks.serve:create_app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        factory=True,
+        # Логи запросов не должны влиять на измерения.
+        settings=get_settings().model_copy(update={"server_access_log": False}),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,12 @@ from alembic import context
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
-from app.core.config import settings
+from app.core.config import get_settings
 from app.models.applications.models import Base
 
 config = context.config
 
-config.set_main_option("sqlalchemy.url", settings.sync_database_url)
+config.set_main_option("sqlalchemy.url", get_settings().sync_database_url)
 
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
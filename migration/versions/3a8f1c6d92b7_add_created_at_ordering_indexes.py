@@ -0,0 +1,74 @@
+"""add created_at ordering indexes
+
+Revision ID: 3a8f1c6d92b7
+Revises: d17a4f09c2e5
+Create Date: 2025-11-24 10:05:41.627301
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3a8f1c6d92b7"
+down_revision: str | Sequence[str] | None = "d17a4f09c2e5"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY нельзя выполнять внутри транзакции.
+    with op.get_context().autocommit_block():
+        # ORDER BY created_at DESC, id DESC без фильтра, OFFSET и курсор
+        op.create_index(
+            "ix_applications_created_at_id",
+            "applications",
+            [sa.text("created_at DESC"), sa.text("id DESC")],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # user_name = :x ORDER BY created_at DESC, id DESC (режим exact)
+        op.create_index(
+            "ix_applications_user_name_created_at_id",
+            "applications",
+            ["user_name", sa.text("created_at DESC"), sa.text("id DESC")],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Покрывается ведущей колонкой нового составного индекса.
+        op.drop_index(
+            "ix_applications_user_name",
+            table_name="applications",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_applications_user_name",
+            "applications",
+            ["user_name"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_applications_user_name_created_at_id",
+            table_name="applications",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_applications_created_at_id",
+            table_name="applications",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,157 @@
+"""partition applications by month
+
+Revision ID: 7c2e5b9f4a10
+Revises: 3a8f1c6d92b7
+Create Date: 2025-11-26 14:37:12.480935
+
+"""
+
+from collections.abc import Sequence
+from datetime import date, datetime, timezone
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2e5b9f4a10"
+down_revision: str | Sequence[str] | None = "3a8f1c6d92b7"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Остальные будущие месяцы создаёт обслуживание партиций приложения;
+# заявки месяца без партиции попадают в applications_default.
+PREMAKE_MONTHS = 3
+
+INDEXES = {
+    "ix_applications_user_name_trgm": "USING gin (user_name gin_trgm_ops)",
+    "ix_applications_user_name_pattern": "(user_name varchar_pattern_ops)",
+    "ix_applications_created_at_id": "(created_at DESC, id DESC)",
+    "ix_applications_user_name_created_at_id": "(user_name, created_at DESC, id DESC)",
+}
+
+
+# Копии функций app.database.partitions: миграция не должна меняться
+# вместе с кодом приложения.
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"applications_p{month:%Y%m}"
+
+
+def drop_indexes() -> None:
+    for name in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def create_indexes() -> None:
+    for name, definition in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON applications {definition}")
+
+
+def create_partitions() -> None:
+    """
+    Партиции с месяца самой старой заявки по текущий + PREMAKE_MONTHS
+    и DEFAULT-партиция для остальных дат.
+
+    Месяцы считаются в Python, имена партиций экранируются диалектом,
+    а границы передаются параметрами.
+    """
+    bind = op.get_bind()
+    quote = bind.dialect.identifier_preparer.quote
+    oldest = bind.execute(
+        sa.text("SELECT min(created_at) FROM applications_unpartitioned")
+    ).scalar()
+    today = datetime.now(timezone.utc).date()
+    month = month_start(oldest.astimezone(timezone.utc).date() if oldest else today)
+    last_month = add_months(month_start(today), PREMAKE_MONTHS)
+    while month <= last_month:
+        next_month = add_months(month, 1)
+        op.execute(
+            sa.text(
+                f"CREATE TABLE {quote(partition_name(month))} "
+                "PARTITION OF applications FOR VALUES FROM (:lower) TO (:upper)"
+            ).bindparams(
+                # Границы в UTC, чтобы не зависеть от TimeZone сессии.
+                lower=f"{month:%Y-%m-%d} 00:00:00+00",
+                upper=f"{next_month:%Y-%m-%d} 00:00:00+00",
+            )
+        )
+        month = next_month
+    op.execute("CREATE TABLE applications_default PARTITION OF applications DEFAULT")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Обычную таблицу нельзя сделать партиционированной: создаём новую
+    # и переносим строки. Последовательность id отвязывается от старой
+    # таблицы, чтобы не удалиться вместе с ней.
+    op.execute("ALTER TABLE applications RENAME TO applications_unpartitioned")
+    op.execute(
+        "ALTER TABLE applications_unpartitioned "
+        "RENAME CONSTRAINT applications_pkey TO applications_unpartitioned_pkey"
+    )
+    op.execute("ALTER SEQUENCE applications_id_seq OWNED BY NONE")
+    drop_indexes()
+
+    op.execute(
+        """
+        CREATE TABLE applications (
+            id INTEGER NOT NULL DEFAULT nextval('applications_id_seq'),
+            user_name VARCHAR NOT NULL,
+            description VARCHAR NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("ALTER SEQUENCE applications_id_seq OWNED BY applications.id")
+
+    create_partitions()
+
+    op.execute(
+        "INSERT INTO applications (id, user_name, description, created_at) "
+        "SELECT id, user_name, description, created_at FROM applications_unpartitioned"
+    )
+    op.execute("DROP TABLE applications_unpartitioned")
+    # Индексы на родительской таблице создаются и на всех партициях.
+    create_indexes()
+    op.execute("ANALYZE applications")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE applications RENAME TO applications_partitioned")
+    op.execute(
+        "ALTER TABLE applications_partitioned "
+        "RENAME CONSTRAINT applications_pkey TO applications_partitioned_pkey"
+    )
+    op.execute("ALTER SEQUENCE applications_id_seq OWNED BY NONE")
+    drop_indexes()
+
+    op.execute(
+        """
+        CREATE TABLE applications (
+            id INTEGER NOT NULL DEFAULT nextval('applications_id_seq'),
+            user_name VARCHAR NOT NULL,
+            description VARCHAR NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute("ALTER SEQUENCE applications_id_seq OWNED BY applications.id")
+    op.execute(
+        "INSERT INTO applications (id, user_name, description, created_at) "
+        "SELECT id, user_name, description, created_at FROM applications_partitioned"
+    )
+    # Партиции удаляются вместе с родительской таблицей; архивные
+    # партиции в схеме archive не затрагиваются.
+    op.execute("DROP TABLE applications_partitioned")
+    create_indexes()
@@ -0,0 +1,64 @@
+"""add user_name search indexes
+
+Revision ID: 9b2e7c41d8a3
+Revises: 5f69acef376c
+Create Date: 2025-11-20 11:42:08.314207
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9b2e7c41d8a3"
+down_revision: str | Sequence[str] | None = "5f69acef376c"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # CONCURRENTLY нельзя выполнять внутри транзакции.
+    with op.get_context().autocommit_block():
+        # ILIKE '%...%' (режим contains)
+        op.create_index(
+            "ix_applications_user_name_trgm",
+            "applications",
+            ["user_name"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"user_name": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # LIKE '...%' (режим prefix) при любой collation базы
+        op.create_index(
+            "ix_applications_user_name_pattern",
+            "applications",
+            ["user_name"],
+            unique=False,
+            postgresql_ops={"user_name": "varchar_pattern_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_applications_user_name_pattern",
+            table_name="applications",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_applications_user_name_trgm",
+            table_name="applications",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    # Расширение pg_trgm не удаляется: им могут пользоваться другие объекты базы.